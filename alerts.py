@@ -0,0 +1,392 @@
+"""موتور هشدار افزایشی روی snapshotهای prices و analysis
+
+مقادیر snapshot با همان مسیرهای live_server خوانده می‌شوند (مثلاً prices/usd یا
+analysis/all_funds/طلا/bubble). هر قاعده در یک index بر اساس مسیرهایی که
+دنبال می‌کند ثبت می‌شود، پس در هر tick فقط قواعد مسیرهای تغییرکرده بررسی
+می‌شوند. در مسیر قواعد، '*' به جای یک بخش مسیر می‌آید (مثلاً همه صندوق‌ها) و
+برای هر مسیر جدید یک بار به یک قاعده مستقل تبدیل می‌شود.
+
+فایل قواعد (JSON) لیستی از دیکشنری‌هاست، مثلاً:
+    [{"type": "threshold", "path": "analysis/all_funds/*/bubble", "op": ">", "value": 5,
+      "hysteresis": 0.5, "message": "Caution: {instrument} has high bubble ({value:.1f}%)"},
+     {"type": "spread", "paths": ["prices/paxg", "prices/xaut"], "op": ">", "value": 1}]
+"""
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import chrome_config
+import live_server
+
+DEFAULT_ALERT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'alerts.jsonl')
+
+# یک هشدار ارسال‌شده
+Alert = namedtuple('Alert', ['ts', 'rule', 'path', 'value', 'message'])
+
+log = logging.getLogger(__name__)
+
+_OPS = {
+    '>': lambda value, limit: value > limit,
+    '<': lambda value, limit: value < limit,
+    '>=': lambda value, limit: value >= limit,
+    '<=': lambda value, limit: value <= limit
+}
+
+
+class Rule:
+    """پایه همه قواعد: شرط آستانه با debounce، cooldown و hysteresis
+
+    هشدار فقط هنگام فعال شدن شرط فرستاده می‌شود. قاعده فعال وقتی دوباره آماده
+    می‌شود که مقدار به اندازه ``hysteresis`` از آستانه برگردد.
+
+    Args:
+        op: یکی از '>'، '<'، '>=' یا '<='
+        value: آستانه
+        hysteresis: فاصله برگشت از آستانه برای آماده شدن دوباره
+        debounce: تعداد tickهای پشت سر هم که شرط باید برقرار باشد
+        cooldown: حداقل فاصله دو هشدار همین قاعده (ثانیه)
+        message: قالب پیام با فیلدهای name، path، instrument، value و threshold
+    """
+
+    __slots__ = ('name', 'paths', 'op', 'threshold', 'hysteresis', 'debounce', 'cooldown', 'message',
+                 'instrument', '_check', '_active', '_armed', '_streak', '_last_fired')
+
+    armed_at_start = True
+
+    def __init__(self, paths, op, value, hysteresis=0.0, debounce=1, cooldown=0.0, message=None, name=None):
+        if op not in _OPS:
+            raise ValueError(f"Unknown operator {op!r}")
+        self.paths = tuple(paths)
+        self.op = op
+        self.threshold = float(value)
+        self.hysteresis = float(hysteresis)
+        self.debounce = max(1, int(debounce))
+        self.cooldown = float(cooldown)
+        self.message = message or '{name}: {path} = {value:.4g} ({op} {threshold:g})'
+        self.name = name or f"{type(self).__name__.lower()}:{','.join(self.paths)}{op}{value}"
+        self.instrument = None
+        self._check = _OPS[op]
+        self._active = False
+        self._armed = self.armed_at_start
+        self._streak = 0
+        self._last_fired = None
+
+    def measure(self, values, ts):
+        """مقداری که با آستانه مقایسه می‌شود؛ None یعنی فعلاً قابل محاسبه نیست"""
+        raise NotImplementedError
+
+    @property
+    def pending(self):
+        """شرط برقرار است ولی هشدار هنوز (به خاطر debounce یا cooldown) ارسال نشده"""
+        return self._streak > 0 and self._armed and not self._active
+
+    def _released(self, metric):
+        if self.op in ('>', '>='):
+            return metric < self.threshold - self.hysteresis
+        return metric > self.threshold + self.hysteresis
+
+    def update(self, values, ts):
+        """ارزیابی قاعده با مقادیر فعلی؛ اگر هشدار لازم باشد Alert برمی‌گرداند"""
+        metric = self.measure(values, ts)
+        if metric is None:
+            return None
+
+        if self._active:
+            if self._released(metric):
+                self._active = False
+                self._streak = 0
+            return None
+
+        if not self._check(metric, self.threshold):
+            self._streak = 0
+            self._armed = True
+            return None
+
+        self._streak += 1
+        if not self._armed or self._streak < self.debounce:
+            return None
+        if self._last_fired is not None and ts - self._last_fired < self.cooldown:
+            return None
+
+        self._active = True
+        self._last_fired = ts
+        message = self.message.format(
+            name=self.name, path=self.paths[0], instrument=self.instrument or self.paths[0],
+            value=metric, threshold=self.threshold, op=self.op
+        )
+        return Alert(ts, self.name, self.paths[0], metric, message)
+
+    def expand(self, path, instrument):
+        """نسخه مستقل این قاعده برای یک مسیر مشخص (برای قواعد دارای '*')"""
+        raise TypeError(f"{type(self).__name__} rules cannot use wildcards")
+
+
+class Threshold(Rule):
+    """مقدار یک مسیر از آستانه بگذرد (از اولین snapshot)"""
+
+    __slots__ = ()
+
+    def __init__(self, path, op, value, **kwargs):
+        super().__init__((path,), op, value, **kwargs)
+
+    def measure(self, values, ts):
+        return values.get(self.paths[0])
+
+    def expand(self, path, instrument):
+        rule = type(self)(
+            path, self.op, self.threshold, hysteresis=self.hysteresis, debounce=self.debounce,
+            cooldown=self.cooldown, message=self.message, name=f'{self.name}[{instrument}]'
+        )
+        rule.instrument = instrument
+        return rule
+
+
+class Crossing(Threshold):
+    """مقدار از یک سطح عبور کند؛ اول باید طرف دیگر سطح دیده شده باشد"""
+
+    __slots__ = ()
+
+    armed_at_start = False
+
+
+class RateOfChange(Threshold):
+    """تغییر درصدی مقدار در ``window`` ثانیه اخیر (با op و value روی درصد تغییر)
+
+    با absolute=True اندازه تغییر بدون جهت سنجیده می‌شود.
+    """
+
+    __slots__ = ('window', 'absolute', '_history')
+
+    def __init__(self, path, op, value, window=3600, absolute=False, **kwargs):
+        super().__init__(path, op, value, **kwargs)
+        self.window = float(window)
+        self.absolute = absolute
+        self._history = deque()
+
+    def measure(self, values, ts):
+        value = values.get(self.paths[0])
+        if value is None:
+            return None
+        history = self._history
+        history.append((ts, value))
+        # قدیمی‌ترین نقطه‌ای که هنوز در ابتدای پنجره معتبر است نگه داشته می‌شود
+        while len(history) > 1 and history[1][0] <= ts - self.window:
+            history.popleft()
+        base_ts, base = history[0]
+        if base_ts > ts - self.window or not base:
+            return None
+        change = (value - base) / abs(base) * 100
+        return abs(change) if self.absolute else change
+
+    def expand(self, path, instrument):
+        rule = type(self)(
+            path, self.op, self.threshold, window=self.window, absolute=self.absolute,
+            hysteresis=self.hysteresis, debounce=self.debounce, cooldown=self.cooldown,
+            message=self.message, name=f'{self.name}[{instrument}]'
+        )
+        rule.instrument = instrument
+        return rule
+
+
+class Spread(Rule):
+    """اختلاف دو مسیر (مثلاً PAXG و XAUT)؛ با relative=True به درصد نسبت به مسیر دوم"""
+
+    __slots__ = ('relative',)
+
+    def __init__(self, paths, op, value, relative=True, **kwargs):
+        if len(paths) != 2:
+            raise ValueError("Spread rules need exactly two paths")
+        super().__init__(paths, op, value, **kwargs)
+        self.relative = relative
+
+    def measure(self, values, ts):
+        first = values.get(self.paths[0])
+        second = values.get(self.paths[1])
+        if first is None or second is None:
+            return None
+        if not self.relative:
+            return first - second
+        return (first - second) / abs(second) * 100 if second else None
+
+
+RULE_TYPES = {
+    'threshold': Threshold,
+    'crossing': Crossing,
+    'rate_of_change': RateOfChange,
+    'spread': Spread
+}
+
+# هشدارهای معادل توصیه‌های get_recommendations و get_best_investment
+DEFAULT_RULES = [
+    {'type': 'threshold', 'path': 'analysis/all_funds/*/bubble', 'op': '>', 'value': 5, 'hysteresis': 0.5,
+     'message': 'Caution: {instrument} has high bubble ({value:.1f}% > 5%)'},
+    {'type': 'threshold', 'path': 'analysis/all_funds/*/bubble', 'op': '<', 'value': 2, 'hysteresis': 0.5,
+     'message': '{instrument} has minimal bubble ({value:.1f}% < 2%)'},
+    {'type': 'threshold', 'path': 'prices/gold_price_difference', 'op': '<', 'value': -5, 'hysteresis': 0.5,
+     'message': 'Good time to buy! Gold price is below global price ({value:+.1f}%)'},
+    {'type': 'rate_of_change', 'path': 'prices/usd', 'op': '>', 'value': 2, 'window': 3600, 'absolute': True,
+     'message': 'USD/IRR moved {value:.1f}% in the last hour'}
+]
+
+
+def build_rule(spec):
+    """ساخت قاعده از یک دیکشنری (فرمت فایل قواعد)"""
+    spec = dict(spec)
+    rule_type = RULE_TYPES[spec.pop('type')]
+    if rule_type is Spread:
+        return rule_type(spec.pop('paths'), spec.pop('op'), spec.pop('value'), **spec)
+    return rule_type(spec.pop('path'), spec.pop('op'), spec.pop('value'), **spec)
+
+
+def load_rules(path=None):
+    """قواعد فایل JSON؛ اگر path داده نشود DEFAULT_RULES"""
+    if path is None:
+        return [build_rule(spec) for spec in DEFAULT_RULES]
+    with open(path, encoding='utf-8') as f:
+        return [build_rule(spec) for spec in json.load(f)]
+
+
+def _pattern(path):
+    return re.compile('^' + '/'.join('([^/]+)' if part == '*' else re.escape(part) for part in path.split('/')) + '$')
+
+
+class AlertEngine:
+    """ارزیابی افزایشی قواعد و ارسال هشدارها به sinkها
+
+    sink هر callable است که یک Alert می‌گیرد (مثلاً FileSink یا WebhookSink).
+    """
+
+    def __init__(self, rules=(), sinks=()):
+        self.sinks = list(sinks)
+        self._index = {}        # مسیر -> قواعدی که آن را دنبال می‌کنند
+        self._patterns = []     # (regex، قاعده الگو) برای مسیرهای دارای '*'
+        self._values = {}       # آخرین مقدار عددی هر مسیر
+        self._pending = {}      # قواعد در میانه debounce/cooldown که در هر tick دوباره ارزیابی می‌شوند
+        self._flat = {}
+        self._lock = threading.Lock()
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule):
+        with self._lock:
+            if any('*' in path for path in rule.paths):
+                if len(rule.paths) != 1:
+                    raise ValueError("Wildcards are only supported in single-path rules")
+                pattern = _pattern(rule.paths[0])
+                self._patterns.append((pattern, rule))
+                # مسیرهایی که قبلاً دیده شده‌اند
+                for path in list(self._values):
+                    self._expand(path, pattern, rule)
+            else:
+                for path in rule.paths:
+                    self._index.setdefault(path, []).append(rule)
+        return rule
+
+    def _expand(self, path, pattern, rule):
+        match = pattern.match(path)
+        if match:
+            self._index.setdefault(path, []).append(rule.expand(path, '/'.join(match.groups())))
+
+    @property
+    def rule_count(self):
+        return len({id(rule) for rules in self._index.values() for rule in rules})
+
+    def evaluate(self, prices, analysis, ts=None):
+        """ارزیابی یک snapshot کامل (فقط قواعد مسیرهای تغییرکرده)"""
+        flat = live_server.flatten({'prices': prices, 'analysis': analysis})
+        with self._lock:
+            changed, _ = live_server.compute_delta(self._flat, flat)
+            self._flat = flat
+        return self.evaluate_delta(changed, ts)
+
+    def evaluate_delta(self, changed, ts=None):
+        """ارزیابی مقادیر تغییرکرده ({مسیر: مقدار}، مثل delta['set'] در live_server)
+
+        باید در هر tick صدا زده شود (حتی با changed خالی): قواعدی که شرطشان
+        برقرار است ولی هنوز به debounce نرسیده‌اند با مقدار ثابت هم شمرده می‌شوند.
+
+        Returns:
+            لیست Alertهای ارسال‌شده
+        """
+        ts = time.time() if ts is None else ts
+        alerts = []
+        with self._lock:
+            values = self._values
+            affected = {}
+            for path, value in changed.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+                    continue
+                if path not in values:
+                    for pattern, rule in self._patterns:
+                        self._expand(path, pattern, rule)
+                values[path] = value
+                for rule in self._index.get(path, ()):
+                    affected[id(rule)] = rule
+
+            for rule in self._pending.values():
+                affected.setdefault(id(rule), rule)
+
+            for key, rule in affected.items():
+                alert = rule.update(values, ts)
+                if alert is not None:
+                    alerts.append(alert)
+                if rule.pending:
+                    self._pending[key] = rule
+                else:
+                    self._pending.pop(key, None)
+
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception as e:
+                    log.error("Error sending alert to %s: %s", sink, e)
+        return alerts
+
+
+class FileSink:
+    """افزودن هر هشدار به صورت یک خط JSON به فایل"""
+
+    def __init__(self, path=DEFAULT_ALERT_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def __call__(self, alert):
+        line = json.dumps(alert._asdict(), ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class WebhookSink:
+    """ارسال هر هشدار با POST به یک آدرس (در پس‌زمینه تا tick معطل نشود)"""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='alert-webhook')
+
+    def _post(self, payload):
+        try:
+            response = chrome_config.get_http_session().post(self.url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+        except Exception as e:
+            log.warning("Error posting alert to %s: %s", self.url, e)
+
+    def __call__(self, alert):
+        self._executor.submit(self._post, alert._asdict())
+
+
+class LogSink:
+    """ارسال هشدارها به logging"""
+
+    def __init__(self, level=logging.WARNING):
+        self.level = level
+
+    def __call__(self, alert):
+        log.log(self.level, "%s", alert.message)
@@ -0,0 +1,277 @@
+import argparse
+import numpy as np
+import pandas as pd
+import snapshot_store
+
+# قواعد get_recommendations: (فیلد، عملگر، آستانه پیش‌فرض، جهت سیگنال)
+# جهت buy یعنی انتظار بازده مثبت و avoid یعنی انتظار بازده منفی یا صفر
+ETF_RULES = {
+    'low_bubble': ('bubble', '<', 2, 'buy'),
+    'high_bubble': ('bubble', '>', 5, 'avoid'),
+    'high_volume': ('volume', '>', 1000000, 'buy'),
+    'low_volume': ('volume', '<', 100000, 'avoid')
+}
+
+# گزینه‌های get_best_investment و آستانه‌های پیش‌فرض آن
+PRICE_OPTIONS = ['gold_18k', 'full_coin', 'half_coin', 'quarter_coin', 'paxg', 'xaut']
+BEST_PREMIUM_THRESHOLD = 5     # |premium| < 5 برای پیشنهاد بهترین گزینه
+TIMING_THRESHOLD = -5          # gold_price_difference < -5 برای زمان مناسب خرید
+
+DEFAULT_THRESHOLDS = {
+    'bubble': np.arange(-5, 10.5, 0.5),
+    'volume': np.logspace(4, 8, 17),
+    'premium': np.arange(0.5, 20.5, 0.5),
+    'timing': np.arange(-15, 5.5, 0.5)
+}
+
+# حداکثر تعداد عنصر آرایه‌های موقت در شبیه‌سازی (برای محدود کردن حافظه)
+_MAX_CHUNK_ELEMENTS = 5000000
+
+
+def load_history(store=None, start=None, end=None):
+    """بارگذاری تاریخچه از SnapshotStore به صورت ماتریس‌های زمان × ابزار
+
+    Returns:
+        دیکشنری با کلیدهای price، bubble، volume (DataFrame با index زمان) و kinds
+        (نوع هر ابزار)
+    """
+    store = store or snapshot_store.SnapshotStore()
+    frame = store.query_frame(start=start, end=end)
+    return history_from_frame(frame)
+
+
+def history_from_frame(frame):
+    """تبدیل سطرهای Quote (فرمت طولانی) به ماتریس‌های زمان × ابزار"""
+    frame = frame.copy()
+    for column in ('price', 'bubble', 'volume'):
+        frame[column] = pd.to_numeric(frame[column], errors='coerce')
+    # قیمت صفر یعنی داده در دسترس نبوده (مثلاً خطای Mexc)
+    frame.loc[frame['price'] <= 0, 'price'] = np.nan
+
+    history = {
+        column: frame.pivot_table(index='ts', columns='instrument', values=column, aggfunc='last').sort_index()
+        for column in ('price', 'bubble', 'volume')
+    }
+    history['kinds'] = frame.groupby('instrument')['kind'].last()
+    return history
+
+
+def forward_returns(prices, horizon=1):
+    """بازده هر ابزار از هر snapshot تا ``horizon`` snapshot بعد
+
+    Raises:
+        ValueError: اگر horizon عدد صحیح مثبت نباشد
+    """
+    if isinstance(horizon, bool) or not isinstance(horizon, (int, np.integer)) or horizon < 1:
+        raise ValueError(f"horizon must be a positive integer, got {horizon!r}")
+    values = prices.to_numpy(dtype=float)
+    result = np.full_like(values, np.nan)
+    if horizon < len(values):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[:-horizon] = values[horizon:] / values[:-horizon] - 1
+    return result
+
+
+def _compare(values, op, thresholds):
+    return values < thresholds if op == '<' else values > thresholds
+
+
+def sweep_thresholds(values, returns, thresholds, op, direction):
+    """آمار یک قاعده آستانه‌ای برای همه آستانه‌ها با یک مرتب‌سازی
+
+    به جای اجرای قاعده برای هر آستانه، مقادیر یک بار مرتب می‌شوند و تعداد
+    سیگنال‌ها، موفقیت‌ها و مجموع بازده‌ها برای هر آستانه با searchsorted روی
+    جمع تجمعی به دست می‌آید.
+    """
+    values = np.asarray(values, dtype=float).ravel()
+    returns = np.asarray(returns, dtype=float).ravel()
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    valid = np.isfinite(values) & np.isfinite(returns)
+    values = values[valid]
+    returns = returns[valid]
+    order = np.argsort(values, kind='stable')
+    values = values[order]
+    returns = returns[order]
+
+    hits = returns > 0 if direction == 'buy' else returns <= 0
+    cum_hits = np.concatenate(([0], np.cumsum(hits)))
+    cum_returns = np.concatenate(([0.0], np.cumsum(returns)))
+
+    if op == '<':
+        index = np.searchsorted(values, thresholds, side='left')
+        signals = index
+        hit_count = cum_hits[index]
+        return_sum = cum_returns[index]
+    else:
+        index = np.searchsorted(values, thresholds, side='right')
+        signals = len(values) - index
+        hit_count = cum_hits[-1] - cum_hits[index]
+        return_sum = cum_returns[-1] - cum_returns[index]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'threshold': thresholds,
+            'signals': signals,
+            'hit_rate': np.where(signals > 0, hit_count / signals, np.nan),
+            'avg_return': np.where(signals > 0, return_sum / signals, np.nan)
+        })
+
+
+def simulate(values, step_returns, thresholds, op, direction):
+    """شبیه‌سازی خرید و نگهداری برای همه آستانه‌ها به صورت برداری
+
+    در هر snapshot سرمایه به طور مساوی بین ابزارهای دارای سیگنال خرید (یا برای
+    قواعد avoid بین ابزارهای بدون سیگنال) تقسیم و تا snapshot بعد نگه داشته
+    می‌شود؛ اگر هیچ ابزاری انتخاب نشود سرمایه نقد می‌ماند.
+
+    Returns:
+        DataFrame با ستون‌های threshold، strategy_return و exposure
+    """
+    values = np.asarray(values, dtype=float)
+    step_returns = np.asarray(step_returns, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+        step_returns = step_returns[:, None]
+    thresholds = np.asarray(thresholds, dtype=float)
+
+    tradable = np.isfinite(step_returns)
+    known = np.isfinite(values)
+    filled_returns = np.where(tradable, step_returns, 0.0)
+
+    chunk = max(1, _MAX_CHUNK_ELEMENTS // max(1, values.size))
+    strategy_returns = []
+    exposures = []
+    for begin in range(0, len(thresholds), chunk):
+        limits = thresholds[begin:begin + chunk, None, None]
+        signal = _compare(values[None], op, limits)
+        if direction == 'avoid':
+            signal = known[None] & ~signal
+        held = signal & tradable[None]
+
+        count = held.sum(axis=2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            period = np.where(count > 0, (filled_returns[None] * held).sum(axis=2) / count, 0.0)
+        strategy_returns.append(np.prod(1 + period, axis=1) - 1)
+        exposures.append((count > 0).mean(axis=1) if count.shape[1] else np.zeros(len(limits)))
+
+    return pd.DataFrame({
+        'threshold': thresholds,
+        'strategy_return': np.concatenate(strategy_returns) if strategy_returns else [],
+        'exposure': np.concatenate(exposures) if exposures else []
+    })
+
+
+def _rule_report(name, values, returns, step_returns, thresholds, op, direction, default):
+    thresholds = np.union1d(thresholds, [default])
+    stats = sweep_thresholds(values, returns, thresholds, op, direction)
+    simulation = simulate(values, step_returns, thresholds, op, direction)
+    report = stats.merge(simulation, on='threshold')
+    report.insert(0, 'rule', name)
+    report['is_default'] = np.isclose(report['threshold'], default)
+    return report
+
+
+def _best_option(premiums, returns, step_returns):
+    """انتخاب گزینه با کمترین |premium| در هر snapshot (مانند get_best_investment)"""
+    absolute = np.abs(premiums)
+    ranked = np.where(np.isfinite(absolute), absolute, np.inf)
+    best = np.argmin(ranked, axis=1)[:, None]
+    pick = lambda matrix: np.take_along_axis(matrix, best, axis=1)[:, 0]
+    return pick(absolute), pick(returns), pick(step_returns)
+
+
+def run_backtest(history=None, store=None, horizon=1, thresholds=None):
+    """اجرای همه قواعد توصیه روی تاریخچه و گزارش برای هر قاعده و آستانه
+
+    Args:
+        history: خروجی load_history؛ اگر None باشد از store خوانده می‌شود
+        horizon: فاصله ارزیابی بازده (تعداد snapshot، حداقل 1)
+        thresholds: دیکشنری جایگزین برای DEFAULT_THRESHOLDS
+
+    Returns:
+        DataFrame با ستون‌های rule، threshold، signals، hit_rate، avg_return،
+        strategy_return، exposure و is_default
+
+    Raises:
+        ValueError: اگر horizon عدد صحیح مثبت نباشد
+    """
+    if isinstance(horizon, bool) or not isinstance(horizon, (int, np.integer)) or horizon < 1:
+        raise ValueError(f"horizon must be a positive integer, got {horizon!r}")
+    history = history if history is not None else load_history(store)
+    grid = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+    prices = history['price']
+    kinds = history['kinds']
+
+    returns = forward_returns(prices, horizon)
+    step_returns = forward_returns(prices, 1)
+    columns = {instrument: i for i, instrument in enumerate(prices.columns)}
+
+    def select(matrix, instruments):
+        instruments = [instrument for instrument in instruments if instrument in columns]
+        return matrix[:, [columns[instrument] for instrument in instruments]]
+
+    reports = []
+
+    # قواعد صندوق‌ها
+    funds = [instrument for instrument in prices.columns if kinds.get(instrument) == 'etf']
+    if funds:
+        fund_returns = select(returns, funds)
+        fund_steps = select(step_returns, funds)
+        for name, (field, op, default, direction) in ETF_RULES.items():
+            values = history[field].reindex(index=prices.index, columns=funds).to_numpy(dtype=float)
+            reports.append(_rule_report(
+                name, values, fund_returns, fund_steps, grid[field], op, direction, default
+            ))
+
+    # قواعد get_best_investment
+    options = [instrument for instrument in PRICE_OPTIONS if instrument in columns]
+    if options:
+        premiums = history['bubble'].reindex(index=prices.index, columns=options).to_numpy(dtype=float)
+        best_premium, best_return, best_step = _best_option(
+            premiums, select(returns, options), select(step_returns, options)
+        )
+        reports.append(_rule_report(
+            'best_premium', best_premium, best_return, best_step,
+            grid['premium'], '<', 'buy', BEST_PREMIUM_THRESHOLD
+        ))
+
+    if 'gold_18k' in columns:
+        difference = history['bubble']['gold_18k'].reindex(prices.index).to_numpy(dtype=float)
+        reports.append(_rule_report(
+            'timing', difference, returns[:, columns['gold_18k']], step_returns[:, columns['gold_18k']],
+            grid['timing'], '<', 'buy', TIMING_THRESHOLD
+        ))
+
+    if not reports:
+        return pd.DataFrame(columns=[
+            'rule', 'threshold', 'signals', 'hit_rate', 'avg_return', 'strategy_return', 'exposure', 'is_default'
+        ])
+    return pd.concat(reports, ignore_index=True)
+
+
+def positive_int(value):
+    """نوع argparse برای --horizon"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid integer {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest the recommendation rules on stored snapshots")
+    parser.add_argument('--db', default=snapshot_store.DEFAULT_DB_PATH, help="path of the snapshot database")
+    parser.add_argument('--horizon', type=positive_int, default=1, help="snapshots ahead used to score each signal")
+    parser.add_argument('--all', action='store_true', help="show every threshold, not only the defaults")
+    args = parser.parse_args()
+
+    report = run_backtest(store=snapshot_store.SnapshotStore(args.db), horizon=args.horizon)
+    if not args.all:
+        report = report[report['is_default'].astype(bool)]
+    print(report.drop(columns='is_default').to_string(index=False))
+
+if __name__ == "__main__":
+    main()
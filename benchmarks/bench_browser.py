@@ -0,0 +1,188 @@
+"""مقایسه بارگذاری صفحه tradersarena با و بدون پروفایل سبک Chrome (block_resources)
+
+اجرا (نیاز به Chromium و chromedriver):
+    python benchmarks/bench_browser.py [--repeat N] [--latency 0.05] [--output results.json]
+
+صفحه ذخیره‌شده fixtures/tradersarena_industries.html از یک سرور محلی سرو می‌شود.
+منابع جانبی نمونه (تصاویر، فونت، آمارگیر و تبلیغات) به آن اضافه می‌شوند و
+همه hostها با --host-resolver-rules به همین سرور می‌رسند، پس هیچ درخواستی به
+شبکه نمی‌رود. برای هر پروفایل زمان driver.get (تا رویداد load)، آماده شدن
+industriesTable، تعداد درخواست‌ها و بایت‌های ارسال‌شده گزارش می‌شود.
+"""
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+sys.path.insert(0, str(ROOT))
+
+import chrome_config
+
+PAGE_PATH = '/industries/68f'
+
+# منابع جانبی نمونه که به صفحه ذخیره‌شده اضافه می‌شوند (مشابه صفحه واقعی)
+PAGE_ASSETS = (
+    '<link rel="stylesheet" href="/static/css/fonts.css">',
+    '<img src="/static/img/logo.png">',
+    *(f'<img src="/static/img/chart-{i}.png">' for i in range(8)),
+    '<img src="http://cdn.tradersarena.ir/banners/banner.jpg">',
+    '<script async src="http://www.google-analytics.com/analytics.js"></script>',
+    '<script async src="http://static.hotjar.com/c/hotjar.js"></script>',
+    '<script async src="http://cdn.yektanet.com/js/ads.js"></script>'
+)
+
+# اندازه پاسخ هر نوع منبع (بایت)
+ASSET_SIZES = {
+    '.png': 40_000,
+    '.jpg': 120_000,
+    '.woff2': 60_000,
+    '.css': 15_000,
+    '.js': 90_000
+}
+CONTENT_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.woff2': 'font/woff2',
+    '.css': 'text/css',
+    '.js': 'application/javascript'
+}
+
+FONTS_CSS = "@font-face{font-family:Bench;src:url(/static/fonts/bench.woff2) format('woff2')}body{font-family:Bench}"
+
+
+def recorded_page():
+    html = (FIXTURES / 'tradersarena_industries.html').read_text(encoding='utf-8')
+    return html.replace('</body>', '\n'.join(PAGE_ASSETS) + '\n</body>').encode('utf-8')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?', 1)[0]
+        if path == PAGE_PATH:
+            body, content_type = server.page, 'text/html; charset=utf-8'
+        else:
+            # تأخیر شبکه برای منابع جانبی
+            time.sleep(server.latency)
+            suffix = Path(path).suffix
+            size = ASSET_SIZES.get(suffix, 1000)
+            if path.endswith('fonts.css'):
+                body = FONTS_CSS.encode().ljust(size, b' ')
+            elif suffix in ('.js', '.css'):
+                body = b'/*' + b'x' * (size - 4) + b'*/'
+            else:
+                body = b'\0' * size
+            content_type = CONTENT_TYPES.get(suffix, 'application/octet-stream')
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.requests += 1
+            server.bytes_sent += len(body)
+
+
+class RecordedSite(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.page = recorded_page()
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.bytes_sent = 0
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+
+def measure_profile(site, block_resources, repeat):
+    """چند بار بارگذاری صفحه با یک مرورگر (بدون کش مرورگر)"""
+    port = site.server_address[1]
+    user_data_dir = tempfile.mkdtemp(prefix='bench-chrome-')
+    driver = chrome_config.get_chrome_driver(
+        user_data_dir=user_data_dir, block_resources=block_resources,
+        extra_arguments=[f'--host-resolver-rules=MAP * 127.0.0.1:{port}']
+    )
+    try:
+        driver.execute_cdp_cmd('Network.setCacheDisabled', {'cacheDisabled': True})
+        loads, readies, requests, sent = [], [], [], []
+        for _ in range(repeat):
+            driver.get('about:blank')
+            site.reset()
+            started = time.perf_counter()
+            driver.get(f'http://tradersarena.ir{PAGE_PATH}')
+            loads.append(time.perf_counter() - started)
+            ready, _ = chrome_config.wait_for_table_ready(driver, 'industriesTable', cell_index=4, budget=10, stable_for=0)
+            readies.append(time.perf_counter() - started if ready else None)
+            # منابع async ممکن است بعد از load تمام شوند
+            time.sleep(site.latency * 2)
+            requests.append(site.requests)
+            sent.append(site.bytes_sent)
+    finally:
+        driver.quit()
+        shutil.rmtree(user_data_dir, ignore_errors=True)
+
+    valid_readies = [value for value in readies if value is not None]
+    return {
+        'block_resources': block_resources,
+        'loads': repeat,
+        'load_ms_median': statistics.median(loads) * 1000,
+        'load_ms_best': min(loads) * 1000,
+        'table_ready_ms_median': statistics.median(valid_readies) * 1000 if valid_readies else None,
+        'requests': statistics.median(requests),
+        'bytes': statistics.median(sent)
+    }
+
+
+def run(repeat=10, latency=0.05):
+    site = RecordedSite(latency)
+    threading.Thread(target=site.serve_forever, daemon=True).start()
+    try:
+        full = measure_profile(site, False, repeat)
+        blocked = measure_profile(site, True, repeat)
+    finally:
+        site.shutdown()
+        site.server_close()
+
+    return {
+        'python': sys.version.split()[0],
+        'latency_s': latency,
+        'profiles': [full, blocked],
+        'load_time_saved': 1 - blocked['load_ms_median'] / full['load_ms_median'],
+        'bytes_saved': 1 - blocked['bytes'] / full['bytes'] if full['bytes'] else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Page load with and without the resource-blocking Chrome profile")
+    parser.add_argument('--repeat', type=int, default=10, help="page loads per profile")
+    parser.add_argument('--latency', type=float, default=0.05, help="simulated delay of every sub-resource (seconds)")
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.repeat, args.latency), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""آزمون بار سرور SSE: تعداد زیادی بیننده همزمان روی live_server
+
+اجرا:
+    python benchmarks/bench_live.py [--viewers 200] [--deltas 20] [--output results.json]
+
+سرور روی یک پورت آزاد 127.0.0.1 اجرا می‌شود و هر بیننده یک اتصال واقعی
+/events باز می‌کند. بعد از دریافت snapshot اولیه توسط همه، چند delta منتشر
+می‌شود و فاصله زمانی انتشار تا دریافت هر delta در هر بیننده اندازه‌گیری
+می‌شود. گزارش شامل median، p95 و بیشینه تأخیر و تعداد deltaهای
+دریافت‌نشده است (باید صفر باشد).
+"""
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import live_server
+
+RECEIVE_TIMEOUT = 10   # حداکثر انتظار برای هر پیام (ثانیه)
+
+
+def sample_snapshot(funds=16):
+    prices = {'usd': 81300, 'gold_per_gram': 6_500_000, 'global_gold': 2650.5, 'bubbles': {'full_coin': 12.5}}
+    analysis = {'all_funds': {
+        f'F{i}': {'name': f'fund {i}', 'price': 1_000_000 + i, 'gold_value': 990_000, 'bubble': 1.0 + i, 'volume': 10_000}
+        for i in range(funds)
+    }}
+    return prices, analysis
+
+
+class Viewer(threading.Thread):
+    """یک بیننده SSE با socket خام؛ زمان دریافت هر پیام با شماره seq ثبت می‌شود"""
+
+    def __init__(self, port, ready):
+        super().__init__(daemon=True)
+        self.port = port
+        self.ready = ready
+        self.received = {}     # seq -> perf_counter
+        self.error = None
+
+    def run(self):
+        try:
+            with socket.create_connection(('127.0.0.1', self.port), timeout=RECEIVE_TIMEOUT) as sock:
+                sock.sendall(b'GET /events HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n')
+                buffer = b''
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        return
+                    buffer += chunk
+                    *events, buffer = buffer.split(b'\n\n')
+                    now = time.perf_counter()
+                    for event in events:
+                        fields = dict(line.split(b': ', 1) for line in event.split(b'\n') if b': ' in line)
+                        if b'id' not in fields:
+                            continue
+                        if fields.get(b'event') == b'snapshot':
+                            self.ready.release()
+                        elif fields.get(b'event') == b'delta':
+                            self.received[int(fields[b'id'])] = now
+        except OSError as e:
+            self.error = e
+
+
+def run(viewers=200, deltas=20, interval=0.05):
+    hub = live_server.LiveHub()
+    hub.publish(*sample_snapshot())
+    server = live_server.start_server(hub, port=0)
+    port = server.server_address[1]
+
+    ready = threading.Semaphore(0)
+    clients = [Viewer(port, ready) for _ in range(viewers)]
+    started = time.perf_counter()
+    for client in clients:
+        client.start()
+    for _ in clients:
+        if not ready.acquire(timeout=RECEIVE_TIMEOUT):
+            raise RuntimeError(f"only {hub.subscriber_count} of {viewers} viewers connected")
+    connect_s = time.perf_counter() - started
+
+    published = {}
+    prices, analysis = sample_snapshot()
+    try:
+        for i in range(deltas):
+            prices['usd'] += 10
+            analysis['all_funds'][f'F{i % 16}']['bubble'] += 0.1
+            published_at = time.perf_counter()
+            delta = hub.publish(prices, analysis)
+            published[delta['seq']] = published_at
+            time.sleep(interval)
+        time.sleep(min(1.0, RECEIVE_TIMEOUT))
+    finally:
+        server.stop()
+
+    latencies, missing = [], 0
+    for client in clients:
+        for seq, published_at in published.items():
+            if seq in client.received:
+                latencies.append((client.received[seq] - published_at) * 1000)
+            else:
+                missing += 1
+    latencies.sort()
+    return {
+        'python': sys.version.split()[0],
+        'viewers': viewers,
+        'deltas': deltas,
+        'connect_all_s': connect_s,
+        'latency_ms_median': statistics.median(latencies) if latencies else None,
+        'latency_ms_p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else None,
+        'latency_ms_max': latencies[-1] if latencies else None,
+        'missing_deltas': missing,
+        'client_errors': sum(1 for client in clients if client.error)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fan-out latency of the SSE live server with many concurrent viewers")
+    parser.add_argument('--viewers', type=int, default=200, help="concurrent /events connections")
+    parser.add_argument('--deltas', type=int, default=20, help="deltas published after all viewers connected")
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    result = run(args.viewers, args.deltas)
+    report = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+    if result['missing_deltas'] or result['client_errors']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""بنچمارک آفلاین پارسرها و تحلیل کامل روی صفحات و پاسخ‌های ذخیره‌شده
+
+اجرا:
+    python benchmarks/bench_parsers.py [--repeat N] [--output results.json]
+
+خروجی JSON شامل زمان هر عملیات، throughput (سطر یا صفحه در ثانیه) و
+حافظه تخصیص‌یافته (با tracemalloc) برای هر بنچمارک است.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / 'fixtures'
+sys.path.insert(0, str(ROOT))
+
+import alerts
+import chrome_config
+import coin_price_calculator as cpc
+import etf_analyzer as etf
+import http_cache
+import number_parser
+import records
+import source_cache
+
+
+def load_fixture(name):
+    return (FIXTURES / name).read_text(encoding='utf-8')
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200, headers=None):
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.encoding = 'utf-8'
+        self.apparent_encoding = 'utf-8'
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise IOError(f"HTTP {self.status_code}")
+
+
+class FakeSession:
+    """جایگزین session مشترک که پاسخ‌ها را از fixtureها می‌دهد"""
+
+    def __init__(self):
+        self.routes = {
+            'bon-bast.com': load_fixture('bonbast.html'),
+            'PAXG_USDT': load_fixture('mexc_paxg.json'),
+            'XAUT_USDT': load_fixture('mexc_xaut.json'),
+            'tsetmc.com': load_fixture('tsetmc_instrument.json')
+        }
+
+    def get(self, url, headers=None, **kwargs):
+        for marker, body in self.routes.items():
+            if marker in url:
+                # پاسخ 304 به درخواست شرطی، مانند سروری که ETag می‌فرستد
+                etag = f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+                if (headers or {}).get('If-None-Match') == etag:
+                    return FakeResponse('', status_code=304, headers={'ETag': etag})
+                return FakeResponse(body, headers={'ETag': etag})
+        return FakeResponse('', status_code=404)
+
+
+class FakeDriver:
+    """جایگزین WebDriver که صفحه ذخیره‌شده tradersarena را برمی‌گرداند"""
+
+    def __init__(self, page_source):
+        self.page_source = page_source
+
+    def get(self, url):
+        pass
+
+    def execute_script(self, script, *args):
+        return {'rows': 1, 'cell': '1', 'quiet': 60.0}
+
+
+def offline():
+    """قطع کامل شبکه و مرورگر: همه درخواست‌ها از fixtureها پاسخ داده می‌شوند"""
+    driver = FakeDriver(load_fixture('tradersarena_industries.html'))
+    session = FakeSession()
+    stack = contextlib.ExitStack()
+    stack.enter_context(mock.patch.object(chrome_config, 'get_http_session', lambda: session))
+    cache_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='bench-http-cache-'))
+    stack.enter_context(mock.patch.object(http_cache, '_default_cache', http_cache.HttpCache(cache_dir)))
+    stack.enter_context(mock.patch.object(chrome_config, 'lease_driver', lambda *args, **kwargs: contextlib.nullcontext(driver)))
+    return stack
+
+
+# اندازه نمونه بنچمارک برداری number_parser
+NUMBER_BATCH_SIZE = 100000
+
+
+def number_samples(count, seed=0):
+    """متن‌های عددی تصادفی به شکل جدول‌های tradersarena و bon-bast (لاتین و فارسی)"""
+    rng = random.Random(seed)
+    persian = str.maketrans('0123456789,.%', '۰۱۲۳۴۵۶۷۸۹٬٫٪')
+    samples = []
+    for _ in range(count):
+        text = f"{rng.uniform(-1e5, 1e7):,.{rng.randint(0, 2)}f}{rng.choice(['', ' K', ' M', ' B', '%'])}"
+        samples.append(text.translate(persian) if rng.random() < 0.2 else rng.choice([text, text, text, '-']))
+    return samples
+
+
+# تعداد قواعد و صندوق‌ها در بنچمارک موتور هشدار
+ALERT_RULES = 5000
+ALERT_FUNDS = 1000
+
+
+def alert_engine(rule_count=ALERT_RULES, funds=ALERT_FUNDS, seed=0):
+    """موتور هشدار با قواعد تصادفی روی حباب صندوق‌ها و قیمت‌ها، و tickهایی که فقط چند مقدار را عوض می‌کنند"""
+    rng = random.Random(seed)
+    fund_paths = [f'analysis/all_funds/fund{i}/bubble' for i in range(funds)]
+    price_paths = ['prices/usd', 'prices/paxg', 'prices/xaut', 'prices/gold_price_difference']
+    rules = []
+    for i in range(rule_count):
+        kind = i % 4
+        path = rng.choice(fund_paths + price_paths)
+        if kind == 0:
+            rules.append(alerts.Threshold(path, rng.choice('<>'), rng.uniform(-10, 10), hysteresis=0.5))
+        elif kind == 1:
+            rules.append(alerts.Crossing(path, '>', rng.uniform(-10, 10), debounce=2))
+        elif kind == 2:
+            rules.append(alerts.RateOfChange(path, '>', rng.uniform(1, 5), window=600, absolute=True))
+        else:
+            rules.append(alerts.Spread(rng.sample(fund_paths, 2), '>', rng.uniform(0, 5), relative=False))
+    engine = alerts.AlertEngine(rules)
+    engine.evaluate_delta({path: rng.uniform(-10, 10) for path in fund_paths + price_paths}, 0)
+
+    ticks = [
+        {path: rng.uniform(-10, 10) for path in rng.sample(fund_paths + price_paths, 3)}
+        for _ in range(1000)
+    ]
+    return engine, ticks
+
+
+def check_number_parser(samples):
+    """نسخه برداری باید دقیقاً همان خروجی parse_number را بدهد (مقادیر مورد انتظار در tests/)"""
+    expected = np.array([number_parser.parse_number(text, np.nan) for text in samples], dtype=float)
+    actual = number_parser.parse_series(pd.Series(samples)).to_numpy()
+    if not np.array_equal(expected, actual, equal_nan=True):
+        raise AssertionError("parse_series disagrees with parse_number")
+
+
+def measure(name, func, repeat, units_per_call, unit):
+    """اجرای func و گزارش زمان، throughput و حافظه"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        func()  # گرم کردن
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        func()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, 'lineno')
+    return {
+        'name': name,
+        'calls': repeat,
+        'total_s': elapsed,
+        'per_call_us': elapsed / repeat * 1e6,
+        'throughput': units_per_call * repeat / elapsed if elapsed else None,
+        'unit': f'{unit}/s',
+        'alloc_peak_bytes': peak,
+        'alloc_blocks': sum(stat.count_diff for stat in diff if stat.count_diff > 0),
+        'alloc_net_bytes': sum(stat.size_diff for stat in diff)
+    }
+
+
+def run(repeat=200):
+    analyzer = etf.GoldETFAnalyzer()
+
+    industries_html = load_fixture('tradersarena_industries.html')
+    bonbast_html = load_fixture('bonbast.html')
+    with contextlib.redirect_stdout(io.StringIO()):
+        fund_rows = len(analyzer.parse_market_table(industries_html))
+
+    volumes = ['19.4 M', '980.3 K', '2.15 B', '4,812', '-', '']
+    numbers = ['39,410', '1.2 M', '850 K', '3.1 B', '-', '']
+    symbols = list(analyzer.gold_etf_info)
+
+    number_texts = number_samples(NUMBER_BATCH_SIZE)
+    check_number_parser(number_texts)
+    number_series = pd.Series(number_texts)
+
+    engine, ticks = alert_engine()
+    tick_clock = iter(range(1, 10 ** 9))
+
+    def alert_ticks():
+        for changed in ticks:
+            engine.evaluate_delta(changed, next(tick_clock))
+
+    def instrument_snapshots():
+        source_cache.get_default_cache().invalidate()
+        analyzer.get_instrument_snapshots(symbols)
+
+    results = []
+    with offline():
+        results.append(measure(
+            'convert_volume', lambda: [analyzer.convert_volume(v) for v in volumes],
+            repeat, len(volumes), 'values'
+        ))
+        results.append(measure(
+            'clean_number', lambda: [analyzer.clean_number(v) for v in numbers],
+            repeat, len(numbers), 'values'
+        ))
+        results.append(measure(
+            'parse_number', lambda: [number_parser.parse_number(text) for text in number_texts[:1000]],
+            max(1, repeat // 10), 1000, 'values'
+        ))
+        results.append(measure(
+            'parse_series', lambda: number_parser.parse_series(number_series),
+            max(1, repeat // 20), NUMBER_BATCH_SIZE, 'values'
+        ))
+        results.append(measure(
+            'alert_tick', alert_ticks,
+            max(1, repeat // 20), len(ticks), 'ticks'
+        ))
+        results.append(measure(
+            'tradersarena_rows', lambda: analyzer.parse_market_table(industries_html),
+            repeat, fund_rows, 'rows'
+        ))
+        results.append(measure(
+            'bonbast_prices', lambda: cpc.parse_bonbast_prices(bonbast_html),
+            repeat, 1, 'pages'
+        ))
+        results.append(measure(
+            'bonbast_poll', lambda: cpc.get_local_prices(allow_browser_fallback=False),
+            repeat, 1, 'pages'
+        ))
+        results.append(measure(
+            'tsetmc_snapshots', instrument_snapshots,
+            max(1, repeat // 10), len(symbols), 'instruments'
+        ))
+        results.append(measure(
+            'get_analysis', analyzer.get_analysis,
+            max(1, repeat // 10), 1, 'pages'
+        ))
+        quotes = analyzer.parse_market_table(industries_html)
+        results.append(measure(
+            'funds_frame', lambda: records.funds_frame(quotes),
+            repeat, len(quotes), 'rows'
+        ))
+
+    return {
+        'python': sys.version.split()[0],
+        'fund_rows': fund_rows,
+        'alert_rules': engine.rule_count,
+        'benchmarks': results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline parser benchmarks on recorded fixtures")
+    parser.add_argument('--repeat', type=int, default=200, help="calls per benchmark")
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.repeat), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(report + '\n', encoding='utf-8')
+    else:
+        print(report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""اندازه‌گیری و کنترل زمان شروع برنامه‌ها (import و ساخت اشیای اصلی)
+
+اجرا:
+    python benchmarks/bench_startup.py [--repeat N] [--scale X] [--output results.json]
+
+هر هدف در یک پروسه جدید پایتون اجرا می‌شود. اگر زمان آن از بودجه‌اش بیشتر
+شود یا یکی از ماژول‌های سنگین ممنوع (مثلاً selenium) بارگذاری شود، اسکریپت
+با کد خروج 1 تمام می‌شود.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# هر هدف: (ماژول‌هایی که از قبل بارگذاری شده‌اند، کد اندازه‌گیری‌شده، بودجه به ثانیه، ماژول‌های ممنوع)
+STARTUP_TARGETS = {
+    'coin_price_calculator': (
+        (),
+        'import coin_price_calculator, fetch_orchestrator, source_cache, tabulate, colorama',
+        0.5,
+        ('selenium', 'pandas', 'streamlit')
+    ),
+    'etf_analyzer': (
+        (),
+        'import etf_analyzer; etf_analyzer.GoldETFAnalyzer()',
+        0.5,
+        ('selenium', 'pandas', 'streamlit')
+    ),
+    'collector': (
+        (),
+        'import collector',
+        0.5,
+        ('selenium', 'streamlit')
+    ),
+    # سرور streamlit از قبل بارگذاری شده است؛ فقط ماژول‌های خود داشبورد اندازه‌گیری می‌شوند
+    'dashboard': (
+        ('streamlit',),
+        'import plotly.graph_objects, valuation, snapshot_store, source_cache',
+        0.5,
+        ('selenium',)
+    )
+}
+
+_PROBE = """
+import importlib, json, sys, time
+for name in {preload!r}:
+    importlib.import_module(name)
+started = time.perf_counter()
+exec({code!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{'elapsed': elapsed, 'loaded': [name for name in {forbidden!r} if name in sys.modules]}}))
+"""
+
+
+def probe(preload, code, forbidden):
+    """اجرای code در یک پروسه جدید و برگرداندن زمان و ماژول‌های ممنوع بارگذاری‌شده"""
+    script = _PROBE.format(preload=tuple(preload), code=code, forbidden=tuple(forbidden))
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat=5, scale=1.0):
+    results = []
+    for name, (preload, code, budget, forbidden) in STARTUP_TARGETS.items():
+        samples = [probe(preload, code, forbidden) for _ in range(repeat)]
+        best = min(sample['elapsed'] for sample in samples)
+        loaded = sorted({module for sample in samples for module in sample['loaded']})
+        results.append({
+            'name': name,
+            'best_s': best,
+            'median_s': sorted(sample['elapsed'] for sample in samples)[len(samples) // 2],
+            'budget_s': budget * scale,
+            'forbidden_loaded': loaded,
+            'ok': best <= budget * scale and not loaded
+        })
+    return {
+        'python': sys.version.split()[0],
+        'targets': results,
+        'ok': all(result['ok'] for result in results)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and enforce the import-time budget")
+    parser.add_argument('--repeat', type=int, default=5, help="fresh processes per target")
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply every budget (for slow machines)")
+    parser.add_argument('--output', help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.scale)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    else:
+        print(text)
+
+    for result in report['targets']:
+        if not result['ok']:
+            print(
+                f"{result['name']}: {result['best_s']:.3f}s (budget {result['budget_s']:.3f}s), "
+                f"heavy modules loaded: {', '.join(result['forbidden_loaded']) or 'none'}",
+                file=sys.stderr
+            )
+    sys.exit(0 if report['ok'] else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,532 @@
+"""ضبط و پخش دوباره (record/replay) درخواست‌های HTTP و صفحات Selenium
+
+در حالت record پاسخ همه درخواست‌های session مشترک chrome_config و HTML
+صفحاتی که از مرورگرهای استخر خوانده می‌شوند در یک پوشه (cassette) ذخیره
+می‌شوند. در حالت replay همان پاسخ‌ها بدون شبکه و بدون مرورگر از دیسک
+برگردانده می‌شوند، پس کل مسیر get_prices/get_analysis به صورت قطعی و با
+سرعت کامل (یا با تأخیر تزریق‌شده) برای profiling و بنچمارک اجرا می‌شود.
+
+فعال‌سازی برای هر برنامه (collector، داشبورد، خط فرمان) با متغیرهای محیطی:
+    GOLDTRADE_CASSETTE=cassettes/today          پوشه cassette
+    GOLDTRADE_CASSETTE_MODE=record|replay       پیش‌فرض replay
+    GOLDTRADE_REPLAY_LATENCY=0.2|recorded       تأخیر هر درخواست در replay (ثانیه یا زمان ضبط‌شده)
+
+یا مستقیماً:
+    python cassette.py record cassettes/today
+    python cassette.py replay cassettes/today [--repeat 20] [--latency recorded]
+"""
+from contextlib import contextmanager
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+MODES = ('record', 'replay')
+
+# هدرهایی که ذخیره نمی‌شوند چون بدنه به صورت باز شده ذخیره می‌شود
+_SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'set-cookie'}
+
+log = logging.getLogger(__name__)
+
+
+def _key(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class NoSuchElementError(Exception):
+    """معادل NoSuchElementException سلنیوم در ReplayDriver"""
+
+
+class Cassette:
+    """یک پوشه ضبط: http/ برای پاسخ‌های HTTP و pages/ برای HTML صفحات
+
+    Args:
+        directory: پوشه cassette
+        mode: 'record' یا 'replay'
+        latency: تأخیر هر درخواست یا بارگذاری صفحه در replay؛ عدد (ثانیه)،
+            'recorded' برای زمان واقعی ضبط‌شده، یا None برای بدون تأخیر
+    """
+
+    def __init__(self, directory, mode='replay', latency=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self.latency = latency
+        self._session = None
+        self._http_cache = None
+        self._http_cache_dir = None
+        self._lock = threading.Lock()
+
+    # ---- فایل‌ها ----
+
+    def _path(self, kind, key, suffix):
+        return os.path.join(self.directory, kind, f'{key}.{suffix}')
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        if isinstance(data, bytes):
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+        else:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+        os.replace(temp_path, path)
+
+    def _read_meta(self, kind, key):
+        try:
+            with open(self._path(kind, key, 'json'), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def wait(self, recorded_elapsed):
+        """تأخیر تزریق‌شده replay"""
+        if self.latency == 'recorded':
+            time.sleep(recorded_elapsed or 0)
+        elif self.latency:
+            time.sleep(float(self.latency))
+
+    # ---- HTTP ----
+
+    def save_response(self, request, response, elapsed):
+        key = _key(f'{request.method} {request.url}')
+        meta = {
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {name: value for name, value in response.headers.items() if name.lower() not in _SKIPPED_HEADERS},
+            'encoding': response.encoding,
+            'elapsed': elapsed
+        }
+        self._write(self._path('http', key, 'body'), response.content)
+        self._write(self._path('http', key, 'json'), json.dumps(meta, ensure_ascii=False, indent=2))
+
+    def load_response(self, request):
+        """پاسخ ضبط‌شده درخواست؛ برای درخواست شرطی با همان validator پاسخ 304"""
+        key = _key(f'{request.method} {request.url}')
+        meta = self._read_meta('http', key)
+        if meta is None:
+            raise requests.ConnectionError(f"No recorded response for {request.method} {request.url}")
+        self.wait(meta['elapsed'])
+
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        headers = CaseInsensitiveDict(meta['headers'])
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if (etag and request.headers.get('If-None-Match') == etag) or \
+                (last_modified and request.headers.get('If-Modified-Since') == last_modified):
+            response.status_code = 304
+            response.reason = 'Not Modified'
+            response._content = b''
+        else:
+            response.status_code = meta['status']
+            response.reason = meta['reason']
+            with open(self._path('http', key, 'body'), 'rb') as f:
+                response._content = f.read()
+        response.headers = headers
+        response.encoding = meta['encoding']
+        return response
+
+    def http_session(self):
+        """session مخصوص این cassette به جای session مشترک chrome_config"""
+        with self._lock:
+            if self._session is None:
+                import chrome_config
+                if self.mode == 'record':
+                    session = chrome_config.create_http_session()
+                    for prefix, adapter in list(session.adapters.items()):
+                        session.mount(prefix, _RecordingAdapter(self, adapter))
+                else:
+                    session = requests.Session()
+                    session.headers.update(chrome_config.get_headers())
+                    adapter = _ReplayAdapter(self)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    def http_cache(self):
+        """کش HTTP مخصوص این cassette در یک پوشه موقت
+
+        کش اصلی data/http_cache نه با پاسخ‌های replay پر می‌شود و نه (با
+        پاسخ 304 یا بدنه تکراری) پارس منابع را در اجراهای replay حذف می‌کند.
+        """
+        with self._lock:
+            if self._http_cache is None:
+                import http_cache
+                self._http_cache_dir = tempfile.TemporaryDirectory(prefix='goldtrade-cassette-')
+                self._http_cache = http_cache.HttpCache(self._http_cache_dir.name)
+            return self._http_cache
+
+    def reset_http_cache(self):
+        """خالی کردن کش HTTP این cassette، تا اجرای بعدی همه پاسخ‌ها را دوباره پارس کند"""
+        with self._lock:
+            cache = self._http_cache
+        if cache is not None:
+            cache.invalidate()
+
+    def close(self):
+        """حذف پوشه موقت کش HTTP"""
+        with self._lock:
+            if self._http_cache_dir is not None:
+                self._http_cache_dir.cleanup()
+            self._http_cache = self._http_cache_dir = None
+
+    # ---- صفحات ----
+
+    def save_page(self, url, html, elapsed):
+        key = _key(url)
+        self._write(self._path('pages', key, 'html'), html)
+        self._write(self._path('pages', key, 'json'), json.dumps({'url': url, 'elapsed': elapsed}, ensure_ascii=False))
+
+    def load_page(self, url):
+        """(html، زمان بارگذاری ضبط‌شده) یک صفحه"""
+        key = _key(url)
+        meta = self._read_meta('pages', key)
+        if meta is None:
+            raise NoSuchElementError(f"No recorded page for {url}")
+        with open(self._path('pages', key, 'html'), encoding='utf-8') as f:
+            return f.read(), meta['elapsed']
+
+    def lease_driver(self, block_resources=False):
+        """جایگزین chrome_config.lease_driver"""
+        if self.mode == 'replay':
+            return contextlib.nullcontext(ReplayDriver(self))
+        return self._recording_lease(block_resources)
+
+    @contextmanager
+    def _recording_lease(self, block_resources):
+        import chrome_config
+        with chrome_config.get_driver_pool(block_resources).lease() as driver:
+            yield _RecordingDriver(driver, self)
+
+
+class _RecordingAdapter(BaseAdapter):
+    """ارسال درخواست با adapter اصلی و ذخیره پاسخ‌های موفق"""
+
+    def __init__(self, cassette, adapter):
+        super().__init__()
+        self.cassette = cassette
+        self.adapter = adapter
+
+    def send(self, request, **kwargs):
+        # بدون درخواست شرطی تا بدنه کامل ضبط شود
+        request.headers.pop('If-None-Match', None)
+        request.headers.pop('If-Modified-Since', None)
+        started = time.monotonic()
+        response = self.adapter.send(request, **kwargs)
+        if 200 <= response.status_code < 300:
+            try:
+                self.cassette.save_response(request, response, time.monotonic() - started)
+            except OSError as e:
+                log.warning("Error recording %s: %s", request.url, e)
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class _ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette):
+        super().__init__()
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        return self.cassette.load_response(request)
+
+    def close(self):
+        pass
+
+
+class _RecordingDriver:
+    """WebDriver واقعی که HTML صفحه را هنگام خواندن (بعد از آماده شدن جدول‌ها) ذخیره می‌کند"""
+
+    def __init__(self, driver, cassette):
+        self._driver = driver
+        self._cassette = cassette
+        self._url = None
+        self._elapsed = None
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def get(self, url):
+        started = time.monotonic()
+        self._driver.get(url)
+        self._url = url
+        self._elapsed = time.monotonic() - started
+
+    def _capture(self):
+        html = self._driver.page_source
+        if self._url is not None:
+            try:
+                self._cassette.save_page(self._url, html, self._elapsed)
+            except OSError as e:
+                log.warning("Error recording page %s: %s", self._url, e)
+        return html
+
+    @property
+    def page_source(self):
+        return self._capture()
+
+    def find_element(self, by, value):
+        self._capture()
+        return self._driver.find_element(by, value)
+
+    def find_elements(self, by, value):
+        self._capture()
+        return self._driver.find_elements(by, value)
+
+
+class InvalidSelectorError(ValueError):
+    """معادل InvalidSelectorException سلنیوم: locator خارج از زیرمجموعه پشتیبانی‌شده"""
+
+
+_XPATH_STEP = re.compile(r"(//|/)([\w*-]+)((?:\[[^\]]*\])*)")
+_XPATH_ATTRIBUTE = re.compile(r"""@([\w-]+)(?:\s*=\s*(['"])(.*?)\2)?""")
+_XPATH_CONTAINS = re.compile(r"""contains\(\s*@([\w-]+)\s*,\s*(['"])(.*?)\2\s*\)""")
+
+
+def _split_and(expression):
+    """جدا کردن بخش‌های 'and' در سطح بالای یک predicate (نه داخل پرانتز)"""
+    parts, depth, start = [], 0, 0
+    for match in re.finditer(r"[()]|\s+and\s+", expression):
+        token = match.group()
+        if token == '(':
+            depth += 1
+        elif token == ')':
+            depth -= 1
+        elif depth == 0:
+            parts.append(expression[start:match.start()])
+            start = match.end()
+    parts.append(expression[start:])
+    return [part.strip() for part in parts]
+
+
+def _xpath_predicate(expression):
+    css = ''
+    for part in _split_and(expression):
+        if part.startswith('not(') and part.endswith(')'):
+            css += f':not({_xpath_predicate(part[4:-1])})'
+            continue
+        match = _XPATH_CONTAINS.fullmatch(part)
+        if match:
+            css += f'[{match.group(1)}*="{match.group(3)}"]'
+            continue
+        match = _XPATH_ATTRIBUTE.fullmatch(part)
+        if match is None:
+            raise InvalidSelectorError(f"Unsupported XPath predicate {part!r}")
+        css += f'[{match.group(1)}]' if match.group(2) is None else f'[{match.group(1)}="{match.group(3)}"]'
+    return css
+
+
+def _xpath_to_css(xpath):
+    """تبدیل زیرمجموعه‌ای از XPath (مسیرهای / و //، [@attr]، [@attr='v']، contains و not/and) به CSS
+
+    XPath‌های WebDriver نسبت به عنصر فعلی ('.//' یا './') روی HTML ضبط‌شده با
+    همان CSS معادل اجرا می‌شوند؛ بدون نیاز به lxml.
+    """
+    path = xpath.strip()
+    if path.startswith('.'):
+        path = path[1:]
+    if not path.startswith('/'):
+        path = '/' + path
+    css, position = [], 0
+    for match in _XPATH_STEP.finditer(path):
+        if match.start() != position:
+            break
+        separator, name, predicates = match.groups()
+        if not css:
+            css.append('' if separator == '//' else ':scope > ')
+        else:
+            css.append(' ' if separator == '//' else ' > ')
+        css.append(name + ''.join(_xpath_predicate(predicate[1:-1]) for predicate in re.findall(r'\[[^\]]*\]', predicates)))
+        position = match.end()
+    if not css or position != len(path):
+        raise InvalidSelectorError(f"Unsupported XPath {xpath!r}")
+    return ''.join(css)
+
+
+def _find(tag, by, value, first):
+    if by == 'id':
+        return tag.find(id=value) if first else tag.find_all(id=value)
+    if by == 'tag name':
+        return tag.find(value) if first else tag.find_all(value)
+    if by == 'class name':
+        return tag.find(class_=value) if first else tag.find_all(class_=value)
+    if by == 'xpath':
+        by, value = 'css selector', _xpath_to_css(value)
+    if by == 'css selector':
+        return tag.select_one(value) if first else tag.select(value)
+    raise InvalidSelectorError(f"ReplayDriver cannot locate elements by {by!r}")
+
+
+class _ReplayElement:
+    """بخش کوچکی از WebElement روی HTML ضبط‌شده (BeautifulSoup)"""
+
+    __slots__ = ('_tag',)
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    def find_element(self, by, value):
+        found = _find(self._tag, by, value, True)
+        if found is None:
+            raise NoSuchElementError(f"No element {by}={value}")
+        return _ReplayElement(found)
+
+    def find_elements(self, by, value):
+        return [_ReplayElement(tag) for tag in _find(self._tag, by, value, False)]
+
+    @property
+    def text(self):
+        return ' '.join(self._tag.get_text(' ').split())
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+
+class ReplayDriver(_ReplayElement):
+    """جایگزین WebDriver در حالت replay: صفحات ضبط‌شده بدون مرورگر"""
+
+    __slots__ = ('_cassette', 'current_url', 'page_source')
+
+    def __init__(self, cassette):
+        super().__init__(None)
+        self._cassette = cassette
+        self.current_url = 'about:blank'
+        self.page_source = ''
+
+    def get(self, url):
+        html, elapsed = self._cassette.load_page(url)
+        self._cassette.wait(elapsed)
+        self.current_url = url
+        self.page_source = html
+        self._tag = None
+
+    def _soup(self):
+        if self._tag is None:
+            from bs4 import BeautifulSoup
+            self._tag = BeautifulSoup(self.page_source, 'html.parser')
+        return self._tag
+
+    def find_element(self, by, value):
+        self._soup()
+        return super().find_element(by, value)
+
+    def find_elements(self, by, value):
+        self._soup()
+        return super().find_elements(by, value)
+
+    def execute_script(self, script, *args):
+        import chrome_config
+        if script != chrome_config._TABLE_STATE_JS:
+            return None
+        # وضعیت جدول برای wait_for_table_ready؛ صفحه ضبط‌شده هیچ‌وقت تغییر نمی‌کند
+        table_id, cell_index = args
+        table = self._soup().find(id=table_id)
+        if table is None:
+            return {'rows': -1, 'cell': '', 'quiet': float('inf')}
+        rows = [row for row in table.select('tbody tr') if row.get('id') not in ('minrow', 'maxrow')]
+        cell = ''
+        if rows and cell_index is not None:
+            cells = rows[0].find_all('td')
+            if len(cells) > cell_index:
+                cell = cells[cell_index].get_text().strip()
+        return {'rows': len(rows), 'cell': cell, 'quiet': float('inf')}
+
+    def execute_cdp_cmd(self, command, params):
+        return {}
+
+    def quit(self):
+        pass
+
+
+def _from_environment():
+    directory = os.environ.get('GOLDTRADE_CASSETTE')
+    if not directory:
+        return None
+    latency = os.environ.get('GOLDTRADE_REPLAY_LATENCY') or None
+    if latency not in (None, 'recorded'):
+        latency = float(latency)
+    return Cassette(directory, os.environ.get('GOLDTRADE_CASSETTE_MODE', 'replay'), latency)
+
+
+_active = _from_environment()
+
+def active():
+    """cassette فعال یا None"""
+    return _active
+
+def activate(directory, mode='replay', latency=None):
+    """فعال کردن cassette برای کل پروسه"""
+    global _active
+    _active = Cassette(directory, mode, latency)
+    return _active
+
+def deactivate():
+    global _active
+    if _active is not None:
+        _active.close()
+    _active = None
+
+@contextmanager
+def use(directory, mode='replay', latency=None):
+    """فعال بودن cassette فقط داخل بلوک"""
+    global _active
+    previous = _active
+    cassette = activate(directory, mode, latency)
+    try:
+        yield cassette
+    finally:
+        _active = previous
+        cassette.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record the data sources once, then replay the pipeline offline")
+    parser.add_argument('mode', choices=MODES)
+    parser.add_argument('directory', help="cassette directory")
+    parser.add_argument('--repeat', type=int, default=1, help="pipeline runs in replay mode")
+    parser.add_argument('--latency', help="replay delay per request in seconds, or 'recorded'")
+    args = parser.parse_args()
+
+    import etf_analyzer
+    import fetch_orchestrator
+    import instrumentation
+    instrumentation.configure_logging()
+    latency = args.latency if args.latency in (None, 'recorded') else float(args.latency)
+
+    with use(args.directory, args.mode, latency) as cassette_in_use:
+        instrumentation.enable()
+        analyzer = etf_analyzer.GoldETFAnalyzer()
+        runs = 1 if args.mode == 'record' else args.repeat
+        elapsed = []
+        for _ in range(runs):
+            # هر اجرا با کش HTTP خالی: پارس bon-bast، Mexc و tsetmc در زمان‌ها حساب می‌شود
+            cassette_in_use.reset_http_cache()
+            started = time.perf_counter()
+            snapshot = fetch_orchestrator.refresh(analyzer)
+            elapsed.append(time.perf_counter() - started)
+
+    statuses = ', '.join(f"{name}={info['status']}" for name, info in snapshot['sources'].items())
+    print(f"{args.mode}: {runs} run(s), best {min(elapsed):.3f}s, mean {sum(elapsed) / runs:.3f}s ({statuses})")
+    print(json.dumps(instrumentation.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()
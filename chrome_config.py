@@ -1,9 +1,62 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from contextlib import contextmanager
+import requests
+import atexit
+import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
+import cassette
+import instrumentation
+
+log = logging.getLogger(__name__)
+
+# تنظیمات پیش‌فرض استخر مرورگرها
+POOL_MAX_SIZE = 2            # حداکثر تعداد مرورگرهای همزمان
+POOL_MAX_PAGE_LOADS = 50     # بعد از این تعداد بارگذاری صفحه، مرورگر بازسازی می‌شود
+POOL_MAX_RSS_MB = 800        # اگر مصرف حافظه از این مقدار بیشتر شود، مرورگر بازسازی می‌شود
+POOL_LEASE_TIMEOUT = 120     # حداکثر زمان انتظار برای گرفتن مرورگر (ثانیه)
+
+# تنظیمات پیش‌فرض انتظار برای آماده شدن جدول‌ها
+WAIT_BUDGET = 60             # حداکثر کل زمان انتظار برای آماده شدن صفحه (ثانیه)
+WAIT_POLL_INTERVAL = 0.25    # فاصله بررسی وضعیت صفحه (ثانیه)
+WAIT_STABLE_FOR = 1.0        # مدت ثابت ماندن جدول یا سکوت DOM برای آماده دانستن صفحه (ثانیه)
+
+# تنظیمات پیش‌فرض session مشترک HTTP
+HTTP_POOL_CONNECTIONS = 10   # تعداد hostهایی که pool اتصال جداگانه دارند
+HTTP_POOL_MAXSIZE = 10       # حداکثر اتصال باز برای هر host
+HTTP_TIMEOUT = 30            # timeout پیش‌فرض درخواست‌ها (ثانیه)
+HTTP_RETRIES = 3             # تعداد تلاش مجدد در خطای اتصال یا پاسخ 429/5xx
+HTTP_BACKOFF = 0.5           # ضریب backoff بین تلاش‌های مجدد (ثانیه)
+
+# آدرس‌هایی که در پروفایل سبک (block_resources) دانلود نمی‌شوند: تصاویر، فونت‌ها،
+# ویدیو، آمارگیرها و تبلیغات. فقط DOM جدول‌ها لازم است؛ CSS و اسکریپت‌های خود سایت
+# که جدول‌ها را پر می‌کنند مسدود نمی‌شوند.
+BLOCKED_URL_PATTERNS = (
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.mp4', '*.webm',
+    '*analytics*', '*googletagmanager.com*', '*doubleclick.net*', '*googlesyndication.com*',
+    '*hotjar.com*', '*clarity.ms*', '*facebook.net*',
+    '*yektanet.com*', '*najva.com*', '*mediaad.org*', '*tapsell.ir*'
+)
+
+
+def get_chrome_driver(user_data_dir=None, block_resources=False, extra_arguments=()):
+    """تنظیمات مشترک Chrome برای همه فایل‌ها
+
+    Args:
+        user_data_dir: پوشه پروفایل Chrome
+        block_resources: پروفایل سبک؛ تصاویر غیرفعال و BLOCKED_URL_PATTERNS مسدود می‌شوند
+        extra_arguments: آرگومان‌های اضافه خط فرمان Chrome
+    """
+    # selenium فقط وقتی واقعاً مرورگر لازم است بارگذاری می‌شود
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
 
-def get_chrome_driver():
-    """تنظیمات مشترک Chrome برای همه فایل‌ها"""
     chrome_options = Options()
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--no-sandbox')
@@ -14,17 +67,371 @@ def get_chrome_driver():
     chrome_options.add_argument('--single-process')
     chrome_options.add_argument('--ignore-certificate-errors')
     chrome_options.add_argument('--window-size=1920,1080')
-    chrome_options.add_argument(f'--user-data-dir=/tmp/chrome-data-{os.getpid()}')
+    chrome_options.add_argument(f'--user-data-dir={user_data_dir or f"/tmp/chrome-data-{os.getpid()}"}')
+    if block_resources:
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    for argument in extra_arguments:
+        chrome_options.add_argument(argument)
     chrome_options.binary_location = "/usr/bin/chromium"
-    
+
     # استفاده از selenium-manager
     driver = webdriver.Chrome(options=chrome_options)
     driver.set_page_load_timeout(300)  # افزایش timeout به 5 دقیقه
-    
+
+    if block_resources:
+        try:
+            block_urls(driver)
+        except Exception as e:
+            log.warning("Could not enable URL blocking: %s", e)
+
     return driver
 
+def block_urls(driver, patterns=BLOCKED_URL_PATTERNS):
+    """مسدود کردن درخواست‌های منطبق با patterns در مرورگر (CDP: Network.setBlockedURLs)"""
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+
 def get_headers():
     """تنظیمات مشترک headers برای درخواست‌ها"""
     return {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    } 
\ No newline at end of file
+    }
+
+
+class _TimeoutSession(requests.Session):
+    """Session با timeout پیش‌فرض برای درخواست‌هایی که timeout ندارند"""
+
+    def __init__(self, timeout):
+        super().__init__()
+        self.default_timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.default_timeout)
+        return super().request(method, url, **kwargs)
+
+
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                        timeout=HTTP_TIMEOUT, retries=HTTP_RETRIES, backoff=HTTP_BACKOFF):
+    """ساخت یک session جدید با pool اتصال، timeout پیش‌فرض و تلاش مجدد با backoff"""
+    session = _TimeoutSession(timeout)
+    session.headers.update(get_headers())
+
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """session مشترک HTTP برای کل پروسه
+
+    اتصال‌های keep-alive هر host (Mexc، tsetmc، bon-bast) بین درخواست‌ها و
+    threadها دوباره استفاده می‌شوند. pool اتصال‌های urllib3 thread-safe است.
+    اگر cassette فعال باشد درخواست‌ها ضبط یا از آن پخش می‌شوند.
+    """
+    global _http_session
+    recording = cassette.active()
+    if recording is not None:
+        return recording.http_session()
+    with _http_session_lock:
+        if _http_session is None:
+            _http_session = create_http_session()
+            atexit.register(_http_session.close)
+        return _http_session
+
+
+def _process_tree_rss(pid):
+    """مجموع حافظه RSS یک پروسه و همه زیرپروسه‌های آن (بایت)"""
+    try:
+        import psutil
+        root = psutil.Process(pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs if p.is_running())
+    except ImportError:
+        pass
+    except Exception:
+        return 0
+
+    # بدون psutil: خواندن مستقیم از /proc (فقط لینوکس)
+    try:
+        children = {}
+        rss = {}
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                with open(f'/proc/{entry}/statm') as f:
+                    rss[int(entry)] = int(f.read().split()[1]) * page_size
+                children.setdefault(ppid, []).append(int(entry))
+            except (OSError, ValueError, IndexError):
+                continue
+
+        total = 0
+        stack = [pid]
+        while stack:
+            current = stack.pop()
+            total += rss.get(current, 0)
+            stack.extend(children.get(current, []))
+        return total
+    except OSError:
+        return 0
+
+
+# وضعیت جدول و آخرین تغییر DOM را در یک رفت‌وبرگشت به WebDriver برمی‌گرداند.
+# یک MutationObserver در اولین فراخوانی روی صفحه نصب می‌شود.
+_TABLE_STATE_JS = """
+var table = document.getElementById(arguments[0]);
+if (!window.__goldtradeMutation) {
+    window.__goldtradeMutation = {last: performance.now()};
+    new MutationObserver(function () {
+        window.__goldtradeMutation.last = performance.now();
+    }).observe(document.documentElement || document, {
+        childList: true, subtree: true, characterData: true, attributes: true
+    });
+}
+var quiet = (performance.now() - window.__goldtradeMutation.last) / 1000;
+if (!table) {
+    return {rows: -1, cell: '', quiet: quiet};
+}
+var rows = table.querySelectorAll('tbody tr:not(#minrow):not(#maxrow)');
+var cell = '';
+if (rows.length && arguments[1] !== null) {
+    var cells = rows[0].querySelectorAll('td');
+    if (cells.length > arguments[1]) {
+        cell = cells[arguments[1]].textContent.trim();
+    }
+}
+return {rows: rows.length, cell: cell, quiet: quiet};
+"""
+
+def wait_for_table_ready(driver, table_id, cell_index=None, min_rows=1,
+                         budget=WAIT_BUDGET, poll_interval=WAIT_POLL_INTERVAL,
+                         stable_for=WAIT_STABLE_FOR):
+    """صبر تا آماده شدن جدول به جای sleep ثابت
+
+    جدول آماده است وقتی حداقل ``min_rows`` ردیف داشته باشد، سلول شماره
+    ``cell_index`` ردیف اول (اگر داده شده) خالی نباشد، و تعداد ردیف‌ها یا
+    کل DOM به مدت ``stable_for`` ثانیه تغییر نکرده باشد.
+
+    Returns:
+        (ready, waited): آماده شدن جدول و مدت زمان واقعی انتظار (ثانیه)
+    """
+    with instrumentation.span('readiness_wait', source=table_id):
+        start = time.monotonic()
+        deadline = start + budget
+        last_rows = None
+        rows_since = start
+
+        while True:
+            now = time.monotonic()
+            try:
+                state = driver.execute_script(_TABLE_STATE_JS, table_id, cell_index)
+            except Exception:
+                state = None
+
+            if state and state['rows'] >= min_rows:
+                if state['rows'] != last_rows:
+                    last_rows = state['rows']
+                    rows_since = now
+
+                cell_ready = cell_index is None or state['cell'] != ''
+                settled = now - rows_since >= stable_for or state['quiet'] >= stable_for
+                if cell_ready and settled:
+                    return True, now - start
+
+            if now >= deadline:
+                return False, now - start
+
+            time.sleep(min(poll_interval, deadline - now))
+
+
+class _PooledDriver:
+    """یک مرورگر داخل استخر به همراه آمار استفاده از آن"""
+
+    def __init__(self, driver, user_data_dir):
+        self.driver = driver
+        self.user_data_dir = user_data_dir
+        self.page_loads = 0
+
+        # شمارش بارگذاری صفحات برای بازسازی دوره‌ای مرورگر
+        original_get = driver.get
+        def counting_get(url):
+            self.page_loads += 1
+            return original_get(url)
+        driver.get = counting_get
+
+    def rss_bytes(self):
+        try:
+            return _process_tree_rss(self.driver.service.process.pid)
+        except Exception:
+            return 0
+
+    def is_alive(self):
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            log.warning("Error closing pooled driver: %s", e)
+        shutil.rmtree(self.user_data_dir, ignore_errors=True)
+
+
+class ChromeDriverPool:
+    """استخر مرورگرهای گرم Chrome
+
+    به جای راه‌اندازی یک Chromium جدید برای هر درخواست، تعداد محدودی مرورگر
+    باز نگه داشته می‌شوند و با ``lease()`` قرض داده می‌شوند. هر مرورگر بعد از
+    ``max_page_loads`` بارگذاری صفحه یا وقتی حافظه‌اش از ``max_rss_mb`` بیشتر
+    شود بسته و جایگزین می‌شود. با ``block_resources`` همه مرورگرهای استخر
+    پروفایل سبک get_chrome_driver را دارند.
+    """
+
+    def __init__(self, max_size=POOL_MAX_SIZE, max_page_loads=POOL_MAX_PAGE_LOADS,
+                 max_rss_mb=POOL_MAX_RSS_MB, lease_timeout=POOL_LEASE_TIMEOUT, block_resources=False):
+        self.max_size = max_size
+        self.block_resources = block_resources
+        self.max_page_loads = max_page_loads
+        self.max_rss_mb = max_rss_mb
+        self.lease_timeout = lease_timeout
+
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._idle = []
+        self._leased = set()
+        self._closed = False
+
+    def _create(self):
+        user_data_dir = tempfile.mkdtemp(prefix=f'chrome-data-{os.getpid()}-')
+        try:
+            with instrumentation.span('driver_start'):
+                driver = get_chrome_driver(user_data_dir=user_data_dir, block_resources=self.block_resources)
+        except Exception:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        return _PooledDriver(driver, user_data_dir)
+
+    def _needs_recycle(self, pooled):
+        if self.max_page_loads and pooled.page_loads >= self.max_page_loads:
+            log.info("Recycling driver after %d page loads", pooled.page_loads)
+            return True
+        if self.max_rss_mb:
+            rss_mb = pooled.rss_bytes() / (1024 * 1024)
+            if rss_mb > self.max_rss_mb:
+                log.info("Recycling driver using %.0f MB RSS", rss_mb)
+                return True
+        return False
+
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError(f"No Chrome driver available after {self.lease_timeout}s")
+
+        try:
+            while True:
+                with self._lock:
+                    if self._closed:
+                        raise RuntimeError("Chrome driver pool is shut down")
+                    pooled = self._idle.pop() if self._idle else None
+
+                if pooled is None:
+                    pooled = self._create()
+                elif not pooled.is_alive():
+                    pooled.close()
+                    continue
+
+                with self._lock:
+                    self._leased.add(pooled)
+                return pooled
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, pooled, discard=False):
+        with self._lock:
+            self._leased.discard(pooled)
+            keep = not (discard or self._closed)
+
+        if keep and not self._needs_recycle(pooled):
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(pooled)
+                    pooled = None
+
+        if pooled is not None:
+            pooled.close()
+        self._slots.release()
+
+    @contextmanager
+    def lease(self):
+        """قرض گرفتن یک مرورگر گرم؛ بعد از خروج از بلوک به استخر برمی‌گردد"""
+        pooled = self._acquire()
+        try:
+            yield pooled.driver
+        except BaseException:
+            # مرورگری که وسط کار خطا داده ممکن است در وضعیت نامعلومی باشد
+            self._release(pooled, discard=True)
+            raise
+        else:
+            self._release(pooled)
+
+    def warm_up(self, count=1):
+        """راه‌اندازی پیشاپیش چند مرورگر تا اولین درخواست منتظر نماند"""
+        count = min(count, self.max_size)
+        leased = []
+        try:
+            for _ in range(count):
+                leased.append(self._acquire())
+        finally:
+            for pooled in leased:
+                self._release(pooled)
+
+    def shutdown(self):
+        """بستن همه مرورگرهای استخر"""
+        with self._lock:
+            self._closed = True
+            drivers = self._idle + list(self._leased)
+            self._idle = []
+            self._leased.clear()
+
+        for pooled in drivers:
+            pooled.close()
+
+
+_pools = {}
+_pool_lock = threading.Lock()
+
+def get_driver_pool(block_resources=False):
+    """استخر مشترک مرورگرها برای کل پروسه (یک استخر برای هر پروفایل)"""
+    with _pool_lock:
+        pool = _pools.get(block_resources)
+        if pool is None or pool._closed:
+            pool = _pools[block_resources] = ChromeDriverPool(block_resources=block_resources)
+            atexit.register(pool.shutdown)
+        return pool
+
+def lease_driver(block_resources=False):
+    """میانبر برای ``get_driver_pool(block_resources).lease()``
+
+    اگر cassette فعال باشد صفحات ضبط یا (در replay بدون مرورگر) از آن پخش می‌شوند.
+    """
+    recording = cassette.active()
+    if recording is not None:
+        return recording.lease_driver(block_resources)
+    return get_driver_pool(block_resources).lease()
@@ -1,235 +1,248 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
-import requests
-from tabulate import tabulate
-import colorama
-from colorama import Fore, Style
 from bs4 import BeautifulSoup
-import os
+import argparse
+import json
+import logging
+import math
+import shutil
+import sys
+import time
 import chrome_config
+import http_cache
+import instrumentation
+import number_parser
+import records
+import valuation
+
+MEXC_TICKER_URL = 'https://www.mexc.com/open/api/v2/market/ticker?symbol={symbol}'
+
+log = logging.getLogger(__name__)
 
-colorama.init()
+def _parse_mexc_ticker(text):
+    return float(json.loads(text)['data'][0]['last'])
+
+def get_crypto_gold_price(symbol):
+    """دریافت قیمت یک توکن طلا (مثلاً PAXG_USDT) از Mexc"""
+    try:
+        # درخواست شرطی با session مشترک؛ پاسخ تکراری دوباره پارس نمی‌شود
+        with instrumentation.span('http_fetch', source=symbol.split('_')[0].lower()):
+            return http_cache.fetch(MEXC_TICKER_URL.format(symbol=symbol), _parse_mexc_ticker)
+    except Exception as e:
+        log.warning("Error getting %s price: %s", symbol, e)
+        return 0
 
 def get_crypto_gold_prices():
+    paxg_price = get_crypto_gold_price('PAXG_USDT')
+    xaut_price = get_crypto_gold_price('XAUT_USDT')
+    
+    if paxg_price and xaut_price:
+        log.info("Successfully got crypto prices - PAXG: $%s, XAUT: $%s", paxg_price, xaut_price)
+    return {'paxg': paxg_price, 'xaut': xaut_price}
+
+BONBAST_URL = "https://bon-bast.com"
+
+def _fetch_bonbast_with_browser():
+    """دریافت HTML صفحه bon-bast با مرورگر (فقط وقتی HTTP ساده شکست بخورد)"""
+    log.info("Falling back to headless Chrome for bon-bast...")
+    with chrome_config.lease_driver() as driver:
+        with instrumentation.span('page_load', source='bonbast'):
+            driver.get(BONBAST_URL)
+        return driver.page_source
+
+@instrumentation.timed('parse', source='bonbast')
+def parse_bonbast_prices(html):
+    """استخراج قیمت‌ها از HTML صفحه bon-bast با استفاده از element ID"""
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # بدون این المان‌ها صفحه ناقص است (مثلاً صفحه خطا یا captcha)
+    if not all(soup.find(id=element_id) for element_id in ("gol18", "usd1", "ounce_top")):
+        return None
+    
+    def get_element_text(element_id):
+        try:
+            element = soup.find(id=element_id)
+            return element.text.strip() if element else '0'
+        except Exception as e:
+            log.warning("Error getting %s: %s", element_id, e)
+            return '0'
+    
+    def get_number(element_id, required=False):
+        value = number_parser.parse_number(get_element_text(element_id))
+        if value is None:
+            if required:
+                raise ValueError(f"Invalid number in {element_id}")
+            return 0
+        return value
+    
+    return records.LocalPrices(
+        gold_per_gram=int(get_number("gol18", required=True)),
+        full_coin=int(get_number("emami1")),
+        half_coin=int(get_number("azadi1_2")),
+        quarter_coin=int(get_number("azadi1_4")),
+        usd=int(get_number("usd1", required=True)),
+        global_gold=get_number("ounce_top", required=True)
+    )
+
+def get_local_prices(allow_browser_fallback=True):
+    """دریافت قیمت‌های داخلی از bon-bast
+
+    ابتدا با یک درخواست HTTP ساده؛ مرورگر فقط در صورت شکست این مسیر و
+    فعال بودن ``allow_browser_fallback`` راه‌اندازی می‌شود.
+    """
     try:
-        # استفاده از headers مشترک
-        headers = chrome_config.get_headers()
-        
-        # Get PAXG price from Mexc
-        paxg_response = requests.get('https://www.mexc.com/open/api/v2/market/ticker?symbol=PAXG_USDT', headers=headers)
-        paxg_data = paxg_response.json()['data'][0]
-        paxg_price = float(paxg_data['last'])
-        
-        # Get XAUT price from Mexc
-        xaut_response = requests.get('https://www.mexc.com/open/api/v2/market/ticker?symbol=XAUT_USDT', headers=headers)
-        xaut_data = xaut_response.json()['data'][0]
-        xaut_price = float(xaut_data['last'])
+        # اگر صفحه تغییر نکرده باشد (304 یا همان بدنه) نتیجه پارس قبلی برمی‌گردد
+        with instrumentation.span('http_fetch', source='bonbast'):
+            local_prices = http_cache.fetch(BONBAST_URL, parse_bonbast_prices)
+        if local_prices:
+            return local_prices
+        log.warning("bon-bast HTTP response did not contain price elements")
+    except Exception as e:
+        log.warning("Error getting bon-bast over HTTP: %s", e)
+    
+    if not allow_browser_fallback:
+        return None
+    
+    try:
+        return parse_bonbast_prices(_fetch_bonbast_with_browser())
+    except Exception as e:
+        log.error("Error getting bon-bast with browser: %s", e)
+        return None
+
+def get_prices(allow_browser_fallback=True):
+    """دریافت قیمت‌های طلا از bon-bast و Mexc"""
+    try:
+        local_prices = get_local_prices(allow_browser_fallback)
+        if not local_prices:
+            return None
         
-        print(f"Successfully got crypto prices - PAXG: ${paxg_price}, XAUT: ${xaut_price}")
-        return {'paxg': paxg_price, 'xaut': xaut_price}
+        return build_prices(local_prices, get_crypto_gold_prices())
     except Exception as e:
-        print(f"Error getting crypto gold prices: {str(e)}")
-        print("Response content for debugging:")
-        try:
-            print("PAXG response:", paxg_response.text)
-            print("XAUT response:", xaut_response.text)
-        except:
-            pass
-        return {'paxg': 0, 'xaut': 0}
-
-def get_prices():
-    """دریافت قیمت‌های طلا از coingecko"""
+        log.error("Error: %s", e)
+        return None
+
+@instrumentation.timed('analysis', source='prices')
+def build_prices(local_prices, crypto_prices):
+    """محاسبه حباب‌ها، گزینه‌های سرمایه‌گذاری و توصیه‌ها از قیمت‌های خام"""
     try:
-        # استفاده از تنظیمات مشترک Chrome و headers
-        driver = chrome_config.get_chrome_driver()
-        headers = chrome_config.get_headers()
+        # Calculate theoretical gold price and coin bubbles in one vectorized pass
+        gold_price_difference = float(valuation.gold_price_difference(
+            local_prices['gold_per_gram'], local_prices['global_gold'], local_prices['usd']
+        ))
+        coin_values = valuation.value_prices(local_prices)
+        bubbles = {coin: values['bubble_18k'] for coin, values in coin_values.items()}
         
-        try:
-            driver.set_page_load_timeout(300)
-            response = requests.get("https://bon-bast.com", headers=headers)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            def get_element_text(element_id):
-                try:
-                    element = soup.find(id=element_id)
-                    return element.text.strip() if element else '0'
-                except Exception as e:
-                    print(f"Error getting {element_id}: {str(e)}")
-                    return '0'
-            
-            # Get prices using element IDs
-            local_prices = {
-                'gold_per_gram': int(''.join(filter(str.isdigit, get_element_text("gol18")))),
-                'full_coin': int(''.join(filter(str.isdigit, get_element_text("emami1")))),
-                'half_coin': int(''.join(filter(str.isdigit, get_element_text("azadi1_2")))),
-                'quarter_coin': int(''.join(filter(str.isdigit, get_element_text("azadi1_4")))),
-                'usd': int(''.join(filter(str.isdigit, get_element_text("usd1")))),
-                'global_gold': float(get_element_text("ounce_top").replace(',', ''))
-            }
-            
-            # Coin weights in grams
-            FULL_COIN_WEIGHT = 8.133
-            HALF_COIN_WEIGHT = 4.068
-            QUARTER_COIN_WEIGHT = 2.034
-            
-            # Constants for gold price calculation
-            GOLD_PURITY_18K = 0.750  # 18K gold is 75% pure
-            GRAM_TO_OUNCE = 31.1035  # 1 ounce = 31.1035 grams
-            
-            # Calculate theoretical gold price
-            theoretical_gold_gram = (local_prices['global_gold'] * local_prices['usd']) / GRAM_TO_OUNCE * GOLD_PURITY_18K
-            gold_price_difference = ((local_prices['gold_per_gram'] - theoretical_gold_gram) / theoretical_gold_gram) * 100
-            
-            # Calculate coin bubbles
-            full_coin_gold_value = local_prices['gold_per_gram'] * FULL_COIN_WEIGHT
-            half_coin_gold_value = local_prices['gold_per_gram'] * HALF_COIN_WEIGHT
-            quarter_coin_gold_value = local_prices['gold_per_gram'] * QUARTER_COIN_WEIGHT
-            
-            bubbles = {
-                'full_coin': ((local_prices['full_coin'] - full_coin_gold_value) / full_coin_gold_value) * 100,
-                'half_coin': ((local_prices['half_coin'] - half_coin_gold_value) / half_coin_gold_value) * 100,
-                'quarter_coin': ((local_prices['quarter_coin'] - quarter_coin_gold_value) / quarter_coin_gold_value) * 100
-            }
-            
-            # Return results instead of printing
-            result = {
-                'global_gold': local_prices['global_gold'],
-                'usd': local_prices['usd'],
-                'gold_per_gram': local_prices['gold_per_gram'],
-                'full_coin': local_prices['full_coin'],
-                'half_coin': local_prices['half_coin'],
-                'quarter_coin': local_prices['quarter_coin'],
-                'bubbles': bubbles,
-                'gold_price_difference': gold_price_difference
+        if not all(math.isfinite(value) for value in [gold_price_difference, *bubbles.values()]):
+            raise ValueError("Invalid prices for bubble calculation")
+        
+        # Return results instead of printing
+        result = {
+            'global_gold': local_prices['global_gold'],
+            'usd': local_prices['usd'],
+            'gold_per_gram': local_prices['gold_per_gram'],
+            'full_coin': local_prices['full_coin'],
+            'half_coin': local_prices['half_coin'],
+            'quarter_coin': local_prices['quarter_coin'],
+            'bubbles': bubbles,
+            'gold_price_difference': gold_price_difference
+        }
+        
+        # Add crypto gold prices
+        result['paxg'] = crypto_prices['paxg']
+        result['xaut'] = crypto_prices['xaut']
+
+        # Add investment options to result
+        investment_options = [
+            {
+                'name': '18k Gold',
+                'premium': gold_price_difference,
+                'liquidity': 'High',
+                'storage': 'Easy'
+            },
+            {
+                'name': 'Full Coin',
+                'premium': bubbles['full_coin'],
+                'liquidity': 'Very High',
+                'storage': 'Easy'
+            },
+            {
+                'name': 'Half Coin',
+                'premium': bubbles['half_coin'],
+                'liquidity': 'High',
+                'storage': 'Easy'
+            },
+            {
+                'name': 'Quarter Coin',
+                'premium': bubbles['quarter_coin'],
+                'liquidity': 'Medium',
+                'storage': 'Easy'
+            },
+            {
+                'name': 'PAXG',
+                'premium': ((crypto_prices['paxg'] - local_prices['global_gold']) / local_prices['global_gold']) * 100,
+                'liquidity': 'Medium',
+                'storage': 'Digital'
+            },
+            {
+                'name': 'XAUT',
+                'premium': ((crypto_prices['xaut'] - local_prices['global_gold']) / local_prices['global_gold']) * 100,
+                'liquidity': 'Medium',
+                'storage': 'Digital'
             }
+        ]
+        
+        def get_best_investment():
+            # Sort options by absolute premium value
+            sorted_opts = sorted(investment_options, key=lambda x: abs(x['premium']))
+            best_option = sorted_opts[0]
             
-            # Get crypto gold prices
-            crypto_prices = get_crypto_gold_prices()
-            result['paxg'] = crypto_prices['paxg']
-            result['xaut'] = crypto_prices['xaut']
-
-            # Add investment options to result
-            investment_options = [
-                {
-                    'name': '18k Gold',
-                    'premium': gold_price_difference,
-                    'liquidity': 'High',
-                    'storage': 'Easy'
-                },
-                {
-                    'name': 'Full Coin',
-                    'premium': bubbles['full_coin'],
-                    'liquidity': 'Very High',
-                    'storage': 'Easy'
-                },
-                {
-                    'name': 'Half Coin',
-                    'premium': bubbles['half_coin'],
-                    'liquidity': 'High',
-                    'storage': 'Easy'
-                },
-                {
-                    'name': 'Quarter Coin',
-                    'premium': bubbles['quarter_coin'],
-                    'liquidity': 'Medium',
-                    'storage': 'Easy'
-                },
-                {
-                    'name': 'PAXG',
-                    'premium': ((crypto_prices['paxg'] - local_prices['global_gold']) / local_prices['global_gold']) * 100,
-                    'liquidity': 'Medium',
-                    'storage': 'Digital'
-                },
-                {
-                    'name': 'XAUT',
-                    'premium': ((crypto_prices['xaut'] - local_prices['global_gold']) / local_prices['global_gold']) * 100,
-                    'liquidity': 'Medium',
-                    'storage': 'Digital'
-                }
-            ]
+            # Generate timing advice
+            if gold_price_difference < -5:
+                timing = "Good time to buy! Gold price is below global price."
+            else:
+                timing = "Not an ideal time to buy. Consider waiting."
             
-            def get_best_investment():
-                # Sort options by absolute premium value
-                sorted_opts = sorted(investment_options, key=lambda x: abs(x['premium']))
-                best_option = sorted_opts[0]
-                
-                # Generate timing advice
-                if gold_price_difference < -5:
-                    timing = "Good time to buy! Gold price is below global price."
+            # Generate detailed recommendation
+            if abs(best_option['premium']) < 5:
+                if best_option['name'] in ['PAXG', 'XAUT']:
+                    recommendation = f"{best_option['name']} is the best option with minimal premium ({best_option['premium']:.1f}%). Digital gold offers global liquidity but requires crypto knowledge."
+                elif best_option['name'] == '18k Gold':
+                    recommendation = f"18k Gold is the best option with low premium ({best_option['premium']:.1f}%). Most liquid and divisible."
                 else:
-                    timing = "Not an ideal time to buy. Consider waiting."
-                
-                # Generate detailed recommendation
-                if abs(best_option['premium']) < 5:
-                    if best_option['name'] in ['PAXG', 'XAUT']:
-                        recommendation = f"{best_option['name']} is the best option with minimal premium ({best_option['premium']:.1f}%). Digital gold offers global liquidity but requires crypto knowledge."
-                    elif best_option['name'] == '18k Gold':
-                        recommendation = f"18k Gold is the best option with low premium ({best_option['premium']:.1f}%). Most liquid and divisible."
-                    else:
-                        recommendation = f"{best_option['name']} has the lowest bubble ({best_option['premium']:.1f}%) among physical options."
+                    recommendation = f"{best_option['name']} has the lowest bubble ({best_option['premium']:.1f}%) among physical options."
+            else:
+                crypto_premiums = [opt['premium'] for opt in investment_options if opt['name'] in ['PAXG', 'XAUT']]
+                if crypto_premiums and min(abs(p) for p in crypto_premiums) < 10:
+                    recommendation = "Digital gold (PAXG/XAUT) might be safer due to lower premium, but requires crypto knowledge."
+                elif gold_price_difference < min(bubbles.values()):
+                    recommendation = "18k Gold is safest due to lower premium than coins."
                 else:
-                    crypto_premiums = [opt['premium'] for opt in investment_options if opt['name'] in ['PAXG', 'XAUT']]
-                    if crypto_premiums and min(abs(p) for p in crypto_premiums) < 10:
-                        recommendation = "Digital gold (PAXG/XAUT) might be safer due to lower premium, but requires crypto knowledge."
-                    elif gold_price_difference < min(bubbles.values()):
-                        recommendation = "18k Gold is safest due to lower premium than coins."
-                    else:
-                        recommendation = "All options have high premiums. Consider waiting for better prices."
-                
-                return timing, recommendation
-
-            result['investment_options'] = investment_options
-            timing_advice, investment_recommendation = get_best_investment()
-            result['advice'] = timing_advice
-            result['best_investment'] = investment_recommendation
-
-            return result
+                    recommendation = "All options have high premiums. Consider waiting for better prices."
             
-        except Exception as e:
-            print(f"Error: {str(e)}")
-            return None
+            return timing, recommendation
+
+        result['investment_options'] = investment_options
+        timing_advice, investment_recommendation = get_best_investment()
+        result['advice'] = timing_advice
+        result['best_investment'] = investment_recommendation
+
+        return result
+        
     except Exception as e:
-        print(f"Error: {str(e)}")
+        log.error("Error: %s", e)
         return None
 
 def calculate_coin_nav(gold_18_price, coin_type='bahar'):
     """محاسبه NAV سکه بر اساس قیمت طلای 18 عیار"""
-    # وزن سکه‌ها (گرم)
-    weights = {
-        'bahar': 8.133,    # سکه تمام
-        'half': 4.068,     # نیم سکه
-        'quarter': 2.034   # ربع سکه
-    }
-    
     try:
         if not gold_18_price or gold_18_price <= 0:
             return 0
-            
-        # تبدیل طلای 18 به 24
-        gold_24_price = (gold_18_price * 24) / 18
-        
-        # محاسبه NAV بر اساس وزن سکه
-        weight = weights.get(coin_type, weights['bahar'])
-        nav = gold_24_price * weight
         
-        # اضافه کردن اجرت ساخت (درصد متفاوت برای هر سکه)
-        premiums = {
-            'bahar': 9,      # 9 درصد برای سکه تمام
-            'half': 12,      # 12 درصد برای نیم سکه
-            'quarter': 15    # 15 درصد برای ربع سکه
-        }
-        
-        premium_percent = premiums.get(coin_type, premiums['bahar'])
-        nav = nav * (1 + premium_percent/100)
-        
-        return nav
+        # وزن و اجرت ساخت هر سکه (سکه تمام 9، نیم 12 و ربع 15 درصد)
+        coin = valuation.COIN_TYPE_ALIASES.get(coin_type, 'full_coin')
+        nav = valuation.coin_nav(gold_18_price, valuation.COIN_WEIGHTS[coin], valuation.COIN_NAV_PREMIUMS[coin])
+        return float(nav)
         
     except Exception as e:
-        print(f"Error calculating coin NAV: {str(e)}")
+        log.error("Error calculating coin NAV: %s", e)
         return 0
 
 def calculate_bubble(coin_price, coin_weight, gold_gram_price, global_gold_price, usd_price):
@@ -244,84 +257,243 @@ def calculate_bubble(coin_price, coin_weight, gold_gram_price, global_gold_price
     
     Returns:
         (local_bubble, global_bubble): حباب نسبت به طلای داخلی و جهانی (درصد)
+    
+    برای محاسبه چند سکه یا کل تاریخچه در یک فراخوانی از valuation.value_coins استفاده کنید.
     """
     try:
-        # محاسبه حباب نسبت به قیمت طلای داخلی
-        gold_24_price = (gold_gram_price * 24) / 18  # تبدیل طلای 18 به 24
-        coin_gold_value = gold_24_price * coin_weight
-        local_bubble = ((coin_price - coin_gold_value) / coin_gold_value) * 100
-        
-        # محاسبه حباب نسبت به قیمت جهانی
-        GRAM_TO_OUNCE = 31.1035  # هر انس = 31.1035 گرم
-        global_gold_gram = (global_gold_price * usd_price) / GRAM_TO_OUNCE  # قیمت هر گرم طلای 24 عیار
-        coin_global_value = global_gold_gram * coin_weight
-        global_bubble = ((coin_price - coin_global_value) / coin_global_value) * 100
+        values = valuation.value_coins(coin_price, coin_weight, gold_gram_price, global_gold_price, usd_price)
+        local_bubble = float(values['local_bubble'])
+        global_bubble = float(values['global_bubble'])
+        if not (math.isfinite(local_bubble) and math.isfinite(global_bubble)):
+            raise ValueError("Invalid prices for bubble calculation")
         
         return round(local_bubble, 1), round(global_bubble, 1)
         
     except Exception as e:
-        print(f"Error calculating bubble: {str(e)}")
+        log.error("Error calculating bubble: %s", e)
         return 0, 0
 
-if __name__ == "__main__":
-    prices = get_prices()
-    if prices:
-        # Market Overview Table
-        market_headers = ["Indicator", "Value", "Change"]
-        market_data = [
-            ["Global Gold", f"${prices['global_gold']:,.2f}/oz", ""],
-            ["PAXG", f"${prices['paxg']:,.2f}", f"{((prices['paxg'] - prices['global_gold']) / prices['global_gold']) * 100:+.2f}%"],
-            ["XAUT", f"${prices['xaut']:,.2f}", f"{((prices['xaut'] - prices['global_gold']) / prices['global_gold']) * 100:+.2f}%"],
-            ["USD/IRR", f"{prices['usd']:,} Tomans", ""],
-            ["18k Gold", f"{prices['gold_per_gram']:,} Tomans/g", f"{prices['gold_price_difference']:+.1f}%"]
-        ]
-        
-        # Coin Market Table
-        coin_headers = ["Coin Type", "Price (Tomans)", "Bubble"]
-        coin_data = [
-            ["Full Coin (Emami)", f"{prices['full_coin']:,}", f"{prices['bubbles']['full_coin']:+.1f}%"],
-            ["Half Coin", f"{prices['half_coin']:,}", f"{prices['bubbles']['half_coin']:+.1f}%"],
-            ["Quarter Coin", f"{prices['quarter_coin']:,}", f"{prices['bubbles']['quarter_coin']:+.1f}%"]
-        ]
-        
-        # Investment Options Table
-        options = sorted(prices['investment_options'], key=lambda x: abs(x['premium']))
-        investment_headers = ["Rank", "Type", "Premium", "Liquidity", "Storage", "Recommendation"]
-        investment_data = []
-        
-        for i, option in enumerate(options, 1):
-            premium = f"{option['premium']:+.1f}%"
-            if abs(option['premium']) < 5:
-                premium = Fore.GREEN + premium + Style.RESET_ALL
-            elif abs(option['premium']) > 15:
-                premium = Fore.RED + premium + Style.RESET_ALL
-                
-            recommendation = "✓" if i == 1 and abs(option['premium']) < 5 else ""
-            
-            investment_data.append([
-                i,
-                option['name'],
-                premium,
-                option['liquidity'],
-                option['storage'],
-                recommendation
-            ])
-
-        print(f"""
+WATCH_INTERVAL = 2   # فاصله بررسی کش و به‌روزرسانی صفحه در حالت --watch (ثانیه)
+POLL_SOURCES = ('bonbast', 'paxg', 'xaut')   # منابعی که --poll برای آن‌ها معتبر است
+
+
+def dashboard_tables(prices):
+    """جدول‌های داشبورد خط فرمان به صورت لیست (عنوان، سرستون‌ها، سطرها)"""
+    from colorama import Fore, Style
+
+    # Market Overview Table
+    market_headers = ["Indicator", "Value", "Change"]
+    market_data = [
+        ["Global Gold", f"${prices['global_gold']:,.2f}/oz", ""],
+        ["PAXG", f"${prices['paxg']:,.2f}", f"{((prices['paxg'] - prices['global_gold']) / prices['global_gold']) * 100:+.2f}%"],
+        ["XAUT", f"${prices['xaut']:,.2f}", f"{((prices['xaut'] - prices['global_gold']) / prices['global_gold']) * 100:+.2f}%"],
+        ["USD/IRR", f"{prices['usd']:,} Tomans", ""],
+        ["18k Gold", f"{prices['gold_per_gram']:,} Tomans/g", f"{prices['gold_price_difference']:+.1f}%"]
+    ]
+
+    # Coin Market Table
+    coin_headers = ["Coin Type", "Price (Tomans)", "Bubble"]
+    coin_data = [
+        ["Full Coin (Emami)", f"{prices['full_coin']:,}", f"{prices['bubbles']['full_coin']:+.1f}%"],
+        ["Half Coin", f"{prices['half_coin']:,}", f"{prices['bubbles']['half_coin']:+.1f}%"],
+        ["Quarter Coin", f"{prices['quarter_coin']:,}", f"{prices['bubbles']['quarter_coin']:+.1f}%"]
+    ]
+
+    # Investment Options Table
+    options = sorted(prices['investment_options'], key=lambda x: abs(x['premium']))
+    investment_headers = ["Rank", "Type", "Premium", "Liquidity", "Storage", "Recommendation"]
+    investment_data = []
+
+    for i, option in enumerate(options, 1):
+        premium = f"{option['premium']:+.1f}%"
+        if abs(option['premium']) < 5:
+            premium = Fore.GREEN + premium + Style.RESET_ALL
+        elif abs(option['premium']) > 15:
+            premium = Fore.RED + premium + Style.RESET_ALL
+
+        recommendation = "✓" if i == 1 and abs(option['premium']) < 5 else ""
+
+        investment_data.append([
+            i,
+            option['name'],
+            premium,
+            option['liquidity'],
+            option['storage'],
+            recommendation
+        ])
+
+    return [
+        ("Market Overview", market_headers, market_data),
+        ("Coin Market Status", coin_headers, coin_data),
+        ("Investment Options (Ranked)", investment_headers, investment_data)
+    ]
+
+
+def render_dashboard(prices, previous=None):
+    """متن داشبورد خط فرمان
+
+    Args:
+        prices: خروجی get_prices
+        previous: جدول‌های رسم قبلی؛ خانه‌هایی که نسبت به آن تغییر کرده‌اند برجسته می‌شوند
+
+    Returns:
+        (text, tables): متن کامل و جدول‌ها برای مقایسه در رسم بعدی
+    """
+    from tabulate import tabulate
+    from colorama import Back, Fore, Style
+
+    tables = dashboard_tables(prices)
+    sections = []
+    for index, (title, headers, rows) in enumerate(tables):
+        if previous is not None:
+            old_rows = previous[index][2]
+            rows = [
+                [
+                    cell if row_index < len(old_rows) and old_rows[row_index][column] == cell
+                    else Back.YELLOW + Fore.BLACK + str(cell) + Style.RESET_ALL
+                    for column, cell in enumerate(row)
+                ]
+                for row_index, row in enumerate(rows)
+            ]
+        sections.append(f"{Fore.YELLOW}{title}:{Style.RESET_ALL}\n{tabulate(rows, headers=headers, tablefmt='pretty')}")
+
+    text = f"""
 {Fore.CYAN}╔══════════════════ GOLD MARKET DASHBOARD ══════════════════╗{Style.RESET_ALL}
 
-{Fore.YELLOW}Market Overview:{Style.RESET_ALL}
-{tabulate(market_data, headers=market_headers, tablefmt="pretty")}
+{sections[0]}
 
-{Fore.YELLOW}Coin Market Status:{Style.RESET_ALL}
-{tabulate(coin_data, headers=coin_headers, tablefmt="pretty")}
+{sections[1]}
 
-{Fore.YELLOW}Investment Options (Ranked):{Style.RESET_ALL}
-{tabulate(investment_data, headers=investment_headers, tablefmt="pretty")}
+{sections[2]}
 
 {Fore.GREEN}Market Analysis:{Style.RESET_ALL}
 • Timing: {prices['advice']}
 • Best Choice: {prices['best_investment']}
 
 {Fore.CYAN}╚════════════════════════════════════════════════════════════╝{Style.RESET_ALL}
-""")
\ No newline at end of file
+"""
+    return text, tables
+
+
+class TerminalScreen:
+    """نوشتن متن روی ترمینال با بازنویسی فقط خطوط تغییرکرده (کدهای مکان‌نما ANSI)"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.lines = None
+        self.height = None
+
+    def draw(self, text):
+        """رسم text؛ تعداد خطوط نوشته‌شده را برمی‌گرداند
+
+        خروجی به ارتفاع ترمینال محدود می‌شود، چون خطوط اضافه صفحه را scroll
+        می‌کنند و شماره سطرهای بازنویسی بعدی دیگر درست نیست. بعد از تغییر
+        اندازه ترمینال کل صفحه دوباره رسم می‌شود.
+        """
+        lines = text.split('\n')
+        height = shutil.get_terminal_size(fallback=(80, 0)).lines   # 0: نامعلوم (مثلاً خروجی به فایل)
+        if height and len(lines) > height:
+            hidden = len(lines) - height + 1
+            lines = lines[:height - 1] + [f'... {hidden} more lines (enlarge the terminal to see them)']
+        if self.lines is None or height != self.height:
+            output = ['\x1b[2J\x1b[H', '\n'.join(line + '\x1b[K' for line in lines)]
+            written = len(lines)
+        else:
+            output = [
+                f'\x1b[{row + 1};1H{line}\x1b[K'
+                for row, line in enumerate(lines)
+                if row >= len(self.lines) or self.lines[row] != line
+            ]
+            written = len(output)
+            if len(lines) < len(self.lines):
+                output.append(f'\x1b[{len(lines) + 1};1H\x1b[J')
+            # مکان‌نما به انتهای متن برمی‌گردد
+            output.append(f'\x1b[{len(lines)};1H')
+        self.lines = lines
+        self.height = height
+        if written:
+            self.stream.write(''.join(output))
+            self.stream.flush()
+        return written
+
+
+def watch(interval=WATCH_INTERVAL, cache=None, screen=None, iterations=None):
+    """نمایش زنده داشبورد در یک پروسه تا زمان توقف
+
+    هر منبع طبق TTL خودش در cache به‌روز می‌شود (داده قدیمی در پس‌زمینه تازه
+    می‌شود)، پس بررسی هر interval ثانیه معمولاً بدون درخواست شبکه است. صفحه
+    فقط وقتی قیمت‌ها عوض شوند دوباره ساخته می‌شود و فقط خطوط تغییرکرده نوشته
+    می‌شوند؛ خانه‌های تغییرکرده تا رسم بعدی برجسته می‌مانند.
+    """
+    from datetime import datetime
+    import fetch_orchestrator
+    import source_cache
+
+    cache = cache or source_cache.get_default_cache()
+    screen = screen or TerminalScreen()
+    last_prices = tables = None
+    count = 0
+    while iterations is None or count < iterations:
+        count += 1
+        started = time.monotonic()
+        prices = fetch_orchestrator.refresh(cache=cache)['prices']
+        if prices and prices != last_prices:
+            text, tables = render_dashboard(prices, tables)
+            screen.draw(f"{text}Updated {datetime.now().strftime('%H:%M:%S')} (Ctrl+C to exit)")
+            last_prices = prices
+        time.sleep(max(0, interval - (time.monotonic() - started)))
+
+
+def positive_number(value):
+    """نوع argparse برای فاصله‌های زمانی (--interval): عدد متناهی بزرگ‌تر از صفر"""
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number {value!r}") from None
+    if not math.isfinite(number) or number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value!r}")
+    return number
+
+
+def poll_interval(value):
+    """نوع argparse برای --poll SOURCE=SECONDS"""
+    name, separator, seconds = value.partition('=')
+    if not separator:
+        raise argparse.ArgumentTypeError(f"expected SOURCE=SECONDS, got {value!r}")
+    if name not in POLL_SOURCES:
+        raise argparse.ArgumentTypeError(f"unknown source {name!r} (choose from {', '.join(POLL_SOURCES)})")
+    try:
+        seconds = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid number of seconds {seconds!r}") from None
+    if not math.isfinite(seconds) or seconds < 0:
+        raise argparse.ArgumentTypeError(f"seconds must be a non-negative number, got {seconds!r}")
+    return name, seconds
+
+
+if __name__ == "__main__":
+    import colorama
+    import fetch_orchestrator
+    import source_cache
+
+    parser = argparse.ArgumentParser(description="Gold market prices and coin bubbles")
+    parser.add_argument('--watch', action='store_true', help="keep running and redraw only values that change")
+    parser.add_argument('--interval', type=positive_number, default=WATCH_INTERVAL, help="seconds between checks in --watch mode")
+    parser.add_argument('--poll', action='append', default=[], type=poll_interval, metavar='SOURCE=SECONDS',
+                        help="refresh interval of one source (bonbast, paxg, xaut); default: source_cache.SOURCE_TTLS")
+    args = parser.parse_args()
+
+    colorama.init()
+    instrumentation.configure_logging()
+    ttls = dict(args.poll)
+    cache = source_cache.SourceCache(ttls=ttls) if ttls else source_cache.get_default_cache()
+
+    if args.watch:
+        try:
+            watch(args.interval, cache)
+        except KeyboardInterrupt:
+            print()
+    else:
+        prices = fetch_orchestrator.refresh(cache=cache)['prices']
+        if prices:
+            print(render_dashboard(prices)[0])
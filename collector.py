@@ -0,0 +1,124 @@
+import argparse
+import sys
+import time
+from datetime import datetime
+import alerts
+import coin_price_calculator as cpc
+import etf_analyzer as etf
+import fetch_orchestrator
+import instrumentation
+import live_server
+import snapshot_store
+import source_cache
+
+DEFAULT_INTERVAL = 300  # فاصله به‌روزرسانی (ثانیه)
+
+
+def collect_once(analyzer, store, cache=None):
+    """یک بار دریافت همه منابع و انتشار snapshot در store"""
+    started = time.monotonic()
+    snapshot = fetch_orchestrator.refresh(analyzer, store=store, cache=cache)
+    elapsed = time.monotonic() - started
+
+    statuses = ', '.join(f"{name}={info['status']}" for name, info in snapshot['sources'].items())
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Collected snapshot in {elapsed:.1f}s ({statuses})")
+    return snapshot
+
+
+def build_alert_engine(rules_path=None, log_path=alerts.DEFAULT_ALERT_LOG, webhook_url=None):
+    """موتور هشدار با قواعد فایل (یا پیش‌فرض) و sinkهای فایل، لاگ و webhook"""
+    sinks = [alerts.FileSink(log_path), alerts.LogSink()]
+    if webhook_url:
+        sinks.append(alerts.WebhookSink(webhook_url))
+    return alerts.AlertEngine(alerts.load_rules(rules_path), sinks)
+
+
+def run(interval=DEFAULT_INTERVAL, once=False, db_path=snapshot_store.DEFAULT_DB_PATH, trace_path=None,
+        live_port=None, alert_engine=None, live_host=live_server.DEFAULT_HOST):
+    """اجرای دوره‌ای جمع‌آوری داده تا زمان توقف
+
+    اگر trace_path داده شود زمان هر مرحله (راه‌اندازی مرورگر، بارگذاری صفحه،
+    انتظار، پارس و درخواست‌های HTTP) ثبت و خلاصه آن بعد از هر دور در این فایل
+    نوشته می‌شود. اگر live_port داده شود هر snapshot بلافاصله به صورت delta
+    برای داشبوردهای متصل (Server-Sent Events) فرستاده می‌شود؛ برای بینندگان
+    روی ماشین‌های دیگر live_host باید '0.0.0.0' یا آدرس شبکه این ماشین باشد. قواعد
+    alert_engine روی هر snapshot (فقط مسیرهای تغییرکرده) ارزیابی می‌شوند.
+    """
+    if trace_path:
+        instrumentation.enable()
+    hub = server = None
+    if live_port:
+        hub = live_server.LiveHub()
+        server = live_server.start_server(hub, host=live_host, port=live_port)
+        print(f"Streaming snapshot deltas on {live_server.public_url(live_host, live_port)}/events")
+    store = snapshot_store.SnapshotStore(db_path)
+    analyzer = etf.GoldETFAnalyzer()
+    analyzer.stats.warm_up(store)
+    # لیست صندوق‌ها از فایل خوانده می‌شود و فقط اگر کهنه باشد در پس‌زمینه به‌روز می‌شود
+    analyzer.refresh_universe_if_stale()
+    # هر منبع طبق TTL خودش به‌روز می‌شود، پس interval کوتاه هزینه اضافه ندارد
+    cache = source_cache.get_default_cache()
+
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                snapshot = collect_once(analyzer, store, cache)
+                if snapshot['prices'] or snapshot['analysis']:
+                    if hub is not None:
+                        hub.publish(snapshot['prices'], snapshot['analysis'])
+                    if alert_engine is not None:
+                        # delta پخش‌شده آمار analysis را ندارد، پس قواعد روی کل snapshot ارزیابی می‌شوند
+                        alert_engine.evaluate(snapshot['prices'], snapshot['analysis'])
+            except Exception as e:
+                print(f"Error collecting snapshot: {str(e)}")
+            if trace_path:
+                instrumentation.export_json(trace_path, include_spans=False)
+            analyzer.refresh_universe_if_stale()
+
+            if once:
+                break
+
+            # زمان‌بندی بر اساس شروع هر دور تا فاصله‌ها ثابت بمانند
+            time.sleep(max(0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("Collector stopped")
+    finally:
+        if server is not None:
+            server.stop()
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect gold market snapshots for the dashboard")
+    parser.add_argument('--interval', type=cpc.positive_number, default=DEFAULT_INTERVAL, help="seconds between refreshes")
+    parser.add_argument('--once', action='store_true', help="collect a single snapshot and exit")
+    parser.add_argument('--db', default=snapshot_store.DEFAULT_DB_PATH, help="path of the snapshot database")
+    parser.add_argument('--trace', metavar='FILE', help="record per-stage timings and write their JSON summary to FILE")
+    parser.add_argument('--live-port', type=int, help="stream snapshot deltas to dashboards on this port")
+    parser.add_argument('--live-host', default=live_server.DEFAULT_HOST,
+                        help="address the live server listens on (0.0.0.0 for viewers on other machines)")
+    parser.add_argument('--alert-rules', metavar='FILE', help="JSON alert rules (default: built-in bubble/premium rules)")
+    parser.add_argument('--alert-log', metavar='FILE', default=alerts.DEFAULT_ALERT_LOG, help="append alerts to this JSON-lines file")
+    parser.add_argument('--alert-webhook', metavar='URL', help="also POST every alert to this URL")
+    parser.add_argument('--refresh-universe', action='store_true', help="re-discover the gold ETF list now and exit")
+    parser.add_argument('--log-level', help="logging level (default: GOLDTRADE_LOG_LEVEL or WARNING)")
+    args = parser.parse_args()
+
+    instrumentation.configure_logging(args.log_level)
+    if args.refresh_universe:
+        analyzer = etf.GoldETFAnalyzer()
+        analyzer.load_saved_universe()
+        fetched_at = analyzer.universe_fetched_at
+        analyzer.refresh_universe()
+        # get_all_gold_etfs خطا را لاگ می‌کند و لیست قبلی را نگه می‌دارد؛ فایل فقط در صورت موفقیت نوشته می‌شود
+        if analyzer.universe_fetched_at is None or analyzer.universe_fetched_at == fetched_at:
+            sys.exit(f"Error: could not fetch the gold ETF list, {analyzer.universe_path} was not updated")
+        print(f"{len(analyzer.gold_etfs)} gold ETFs saved to {analyzer.universe_path}")
+        return
+    alert_engine = build_alert_engine(args.alert_rules, args.alert_log, args.alert_webhook)
+    run(interval=args.interval, once=args.once, db_path=args.db, trace_path=args.trace, live_port=args.live_port,
+        alert_engine=alert_engine, live_host=args.live_host)
+
+if __name__ == "__main__":
+    main()
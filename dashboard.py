@@ -1,4 +1,6 @@
 import streamlit as st
+import json
+import os
 import sys
 from pathlib import Path
 
@@ -6,8 +8,10 @@ from pathlib import Path
 current_dir = Path(__file__).parent
 sys.path.append(str(current_dir))
 
-import coin_price_calculator as cpc
-import etf_analyzer as etf
+import valuation
+import records
+import snapshot_store
+import source_cache
 import plotly.graph_objects as go
 import pandas as pd
 from datetime import datetime
@@ -19,23 +23,154 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize analyzer
-@st.cache_resource
-def get_analyzer():
-    return etf.GoldETFAnalyzer()
+# آدرس سرور زنده (python collector.py --live-port 8765 یا python live_server.py)
+# اگر GOLDTRADE_LIVE_URL تعیین نشده باشد، مرورگر هر بیننده به همان hostای که
+# داشبورد را از آن باز کرده روی GOLDTRADE_LIVE_PORT وصل می‌شود
+LIVE_URL = os.environ.get('GOLDTRADE_LIVE_URL')
+LIVE_PORT = int(os.environ.get('GOLDTRADE_LIVE_PORT', 8765))
+
+# پنل زنده: مستقیماً به جریان SSE وصل می‌شود و فقط مقادیری را که در هر delta
+# تغییر کرده‌اند دوباره رسم می‌کند؛ بدون اجرای دوباره اسکریپت streamlit
+LIVE_PANEL_HTML = """
+<div style="font-family: sans-serif; font-size: 14px">
+  <div id="status" style="color: #888; font-size: 12px">connecting...</div>
+  <div id="metrics" style="display: flex; flex-wrap: wrap; gap: 8px; margin-top: 6px"></div>
+  <div id="funds" style="margin-top: 10px"></div>
+</div>
+<script>
+const METRICS = [
+  ["prices/usd", "USD/IRR", v => fmt(v, 0) + " T"],
+  ["prices/gold_per_gram", "18k Gold", v => fmt(v, 0) + " T/g"],
+  ["prices/gold_price_difference", "18k Premium", v => pct(v)],
+  ["prices/global_gold", "Global Gold", v => "$" + fmt(v, 2)],
+  ["prices/paxg", "PAXG", v => "$" + fmt(v, 2)],
+  ["prices/xaut", "XAUT", v => "$" + fmt(v, 2)],
+  ["prices/bubbles/full_coin", "Full Coin Bubble", v => pct(v)],
+  ["prices/bubbles/half_coin", "Half Coin Bubble", v => pct(v)],
+  ["prices/bubbles/quarter_coin", "Quarter Coin Bubble", v => pct(v)]
+];
+const FUNDS = "analysis/all_funds/";
+const cells = {};
+const rows = new Map();   // نماد -> ردیف صندوق
+let state = {};
+
+const fmt = (v, digits) => Number(v).toLocaleString("en-US", {minimumFractionDigits: digits, maximumFractionDigits: digits});
+const pct = v => (v >= 0 ? "+" : "") + Number(v).toFixed(1) + "%";
+
+function flatten(value, prefix, out) {
+  if (value !== null && typeof value === "object" && !Array.isArray(value) && (!prefix || Object.keys(value).length)) {
+    for (const key of Object.keys(value)) flatten(value[key], prefix ? prefix + "/" + key : key, out);
+  } else {
+    out[prefix] = value;
+  }
+  return out;
+}
+
+function flash(element) {
+  element.style.background = "#fff3c4";
+  setTimeout(() => element.style.background = "", 600);
+}
+
+function metricCell(path, label) {
+  const box = document.createElement("div");
+  box.style.cssText = "border: 1px solid #ddd; border-radius: 6px; padding: 4px 10px; min-width: 120px";
+  box.innerHTML = "<div style='color:#666;font-size:11px'>" + label + "</div><b>-</b>";
+  document.getElementById("metrics").appendChild(box);
+  cells[path] = box;
+}
 
-@st.cache_data(ttl=300)
-def get_analysis():
-    analyzer = get_analyzer()
-    return analyzer.get_analysis()
+function fundRow(symbol) {
+  // نماد از صفحه tradersarena می‌آید: فقط با textContent نوشته می‌شود، نه innerHTML
+  let row = rows.get(symbol);
+  if (!row) {
+    row = document.createElement("div");
+    row.style.cssText = "display: flex; align-items: center; gap: 8px; margin: 2px 0";
+    const label = document.createElement("span");
+    label.style.width = "70px";
+    label.textContent = symbol;
+    const track = document.createElement("div");
+    track.style.cssText = "flex: 1; background: #eee; height: 10px";
+    const bar = document.createElement("div");
+    bar.className = "bar";
+    bar.style.cssText = "height: 10px; width: 0";
+    track.appendChild(bar);
+    const value = document.createElement("span");
+    value.className = "value";
+    value.style.cssText = "width: 60px; text-align: right";
+    value.textContent = "-";
+    row.append(label, track, value);
+    document.getElementById("funds").appendChild(row);
+    rows.set(symbol, row);
+  }
+  return row;
+}
 
-@st.cache_data(ttl=300)
-def get_prices():
-    return cpc.get_prices()
+function render(path) {
+  const value = state[path];
+  if (cells[path]) {
+    const spec = METRICS.find(metric => metric[0] === path);
+    cells[path].querySelector("b").textContent = value == null ? "-" : spec[2](value);
+    flash(cells[path]);
+  } else if (path === "ts") {
+    document.getElementById("status").textContent = "live - updated " + new Date(value * 1000).toLocaleTimeString();
+  } else if (path.startsWith(FUNDS) && path.endsWith("/bubble")) {
+    const symbol = path.slice(FUNDS.length, -"/bubble".length);
+    if (value == null) {
+      const row = rows.get(symbol);
+      if (row) { row.remove(); rows.delete(symbol); }
+      return;
+    }
+    const row = fundRow(symbol);
+    const bar = row.querySelector(".bar");
+    bar.style.width = Math.min(Math.abs(value), 20) * 5 + "%";
+    bar.style.background = value > 5 ? "#e74c3c" : value < 2 ? "#2ecc71" : "#f1c40f";
+    row.querySelector(".value").textContent = pct(value);
+    flash(row);
+  }
+}
+
+METRICS.forEach(metric => metricCell(metric[0], metric[1]));
+// EventSource در مرورگر بیننده باز می‌شود: localhost فقط روی خود سرور معتبر است
+function dashboardHost() {
+  let host = "";
+  try { host = window.parent.location.hostname; } catch (e) { host = location.hostname; }
+  host = host || "localhost";
+  return host.includes(":") ? "[" + host + "]" : host;
+}
+const liveUrl = __LIVE_URL__ || "http://" + dashboardHost() + ":" + __LIVE_PORT__;
+const source = new EventSource(liveUrl + "/events");
+source.addEventListener("snapshot", event => {
+  const snapshot = JSON.parse(event.data);
+  delete snapshot.seq;
+  const previous = state;
+  state = flatten(snapshot, "", {});
+  for (const path of new Set([...Object.keys(previous), ...Object.keys(state)])) render(path);
+});
+source.addEventListener("delta", event => {
+  const delta = JSON.parse(event.data);
+  for (const path of delta.unset) { delete state[path]; render(path); }
+  for (const [path, value] of Object.entries(delta.set)) { state[path] = value; render(path); }
+});
+source.onerror = () => document.getElementById("status").textContent = "live updates offline (retrying...)";
+</script>
+"""
+
+# داده‌ها توسط collector.py جمع‌آوری می‌شوند و داشبورد فقط از store می‌خواند
+@st.cache_resource
+def get_store():
+    return snapshot_store.SnapshotStore()
+
+def get_snapshot():
+    # خواندن از کش stale-while-revalidate؛ رندر هیچ‌وقت منتظر store نمی‌ماند مگر بار اول
+    return source_cache.get_default_cache().get('snapshot', get_store().get_latest)
 
 # Get data
-prices = get_prices()
-analysis = get_analysis()
+snapshot = get_snapshot()
+if snapshot:
+    updated_at, prices, analysis = snapshot
+else:
+    updated_at, prices, analysis = None, None, None
+    st.warning("No market snapshot available yet. Start the collector with `python collector.py`.")
 
 # Create tabs
 tab1, tab2, tab3, tab4 = st.tabs([
@@ -48,6 +183,13 @@ tab1, tab2, tab3, tab4 = st.tabs([
 # Tab 1: Market Prices
 with tab1:
     st.header("Gold Market Prices")
+    with st.expander("Live prices", expanded=True):
+        live_panel = LIVE_PANEL_HTML.replace('__LIVE_URL__', json.dumps(LIVE_URL)).replace('__LIVE_PORT__', str(LIVE_PORT))
+        if hasattr(st, 'iframe'):
+            st.iframe(live_panel, height=320)
+        else:
+            import streamlit.components.v1 as components
+            components.html(live_panel, height=320, scrolling=True)
     if prices:
         # Main metrics
         metric_col1, metric_col2, metric_col3 = st.columns(3)
@@ -104,19 +246,16 @@ with tab1:
 with tab2:
     st.header("Gold ETF Analysis")
     if analysis and analysis.get('all_funds'):
-        # ETF data table
-        funds_data = []
-        for symbol, data in analysis['all_funds'].items():
-            funds_data.append({
-                'Symbol': symbol,
-                'Name': data['name'],
-                'Price (IRR)': f"{data['price']:,.0f}",
-                'NAV (IRR)': f"{data['gold_value']:,.0f}",
-                'Bubble (%)': f"{data['bubble']:.1f}",
-                'Volume': f"{data['volume']:,}"
-            })
-        
-        df = pd.DataFrame(funds_data)
+        # ETF data table (ستونی؛ هر ستون یک بار فرمت می‌شود)
+        funds = records.funds_frame(analysis['all_funds'])
+        df = pd.DataFrame({
+            'Symbol': funds.index,
+            'Name': funds['name'].to_numpy(),
+            'Price (IRR)': funds['price'].map('{:,.0f}'.format).to_numpy(),
+            'NAV (IRR)': funds['gold_value'].map('{:,.0f}'.format).to_numpy(),
+            'Bubble (%)': funds['bubble'].map('{:.1f}'.format).to_numpy(),
+            'Volume': funds['volume'].map('{:,}'.format).to_numpy()
+        })
         st.dataframe(df, use_container_width=True)
         
         # Best options and recommendations
@@ -267,54 +406,19 @@ with tab3:
         other_instruments = []
         
         if prices:
-            # سکه بهار آزادی
-            if 'full_coin' in prices:
-                local_bubble, global_bubble = cpc.calculate_bubble(
-                    coin_price=prices['full_coin'],
-                    coin_weight=8.133,
-                    gold_gram_price=prices['gold_per_gram'],
-                    global_gold_price=prices['global_gold'],
-                    usd_price=prices['usd']
-                )
-                other_instruments.append({
-                    'name': 'Full Coin',
-                    'price': prices['full_coin'],
-                    'local_bubble': local_bubble,
-                    'global_bubble': global_bubble,
-                    'type': 'Coin'
-                })
-            
-            # نیم سکه
-            if 'half_coin' in prices:
-                local_bubble, global_bubble = cpc.calculate_bubble(
-                    coin_price=prices['half_coin'],
-                    coin_weight=4.068,
-                    gold_gram_price=prices['gold_per_gram'],
-                    global_gold_price=prices['global_gold'],
-                    usd_price=prices['usd']
-                )
-                other_instruments.append({
-                    'name': 'Half Coin',
-                    'price': prices['half_coin'],
-                    'local_bubble': local_bubble,
-                    'global_bubble': global_bubble,
-                    'type': 'Coin'
-                })
-            
-            # ربع سکه
-            if 'quarter_coin' in prices:
-                local_bubble, global_bubble = cpc.calculate_bubble(
-                    coin_price=prices['quarter_coin'],
-                    coin_weight=2.034,
-                    gold_gram_price=prices['gold_per_gram'],
-                    global_gold_price=prices['global_gold'],
-                    usd_price=prices['usd']
-                )
+            # حباب همه سکه‌ها در یک محاسبه برداری
+            coin_names = {
+                'full_coin': 'Full Coin',
+                'half_coin': 'Half Coin',
+                'quarter_coin': 'Quarter Coin'
+            }
+            coin_values = valuation.value_prices(prices, coins=coin_names)
+            for coin, values in coin_values.items():
                 other_instruments.append({
-                    'name': 'Quarter Coin',
-                    'price': prices['quarter_coin'],
-                    'local_bubble': local_bubble,
-                    'global_bubble': global_bubble,
+                    'name': coin_names[coin],
+                    'price': prices[coin],
+                    'local_bubble': round(values['local_bubble'], 1),
+                    'global_bubble': round(values['global_bubble'], 1),
                     'type': 'Coin'
                 })
             
@@ -425,4 +529,7 @@ with tab4:
 
 # Sidebar
 st.sidebar.title("Gold Market Analysis")
-st.sidebar.write(f"Last update: {datetime.now().strftime('%H:%M:%S')}") 
\ No newline at end of file
+if updated_at:
+    st.sidebar.write(f"Last update: {datetime.fromtimestamp(updated_at).strftime('%H:%M:%S')}")
+else:
+    st.sidebar.write("Last update: -") 
\ No newline at end of file
@@ -1,18 +1,83 @@
-import requests
 from bs4 import BeautifulSoup
-import pandas as pd
-import coin_price_calculator as cpc
-import streamlit as st
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import time
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
 import os
+import threading
+import time
 import chrome_config
+import fetch_orchestrator
+import http_cache
+import instrumentation
+import number_parser
+import records
+import source_cache
+import streaming_stats
+
+TSETMC_PRICE_URL = "http://cdn.tsetmc.com/api/Instrument/GetInstrumentPriceData/{symbol}"
+SNAPSHOT_WORKERS = 8  # حداکثر درخواست همزمان به tsetmc
+
+# لیست صندوق‌های طلا روی دیسک ذخیره و فقط هر چند وقت یک بار دوباره دریافت می‌شود
+UNIVERSE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'etf_universe.json')
+UNIVERSE_REFRESH_INTERVAL = 7 * 86400   # فاصله به‌روزرسانی لیست صندوق‌ها (ثانیه)
+UNIVERSE_RETRY_INTERVAL = 3600          # فاصله تلاش دوباره بعد از دریافت ناموفق (ثانیه)
+
+log = logging.getLogger(__name__)
+
+
+def _fetch_instrument_snapshot(symbol):
+    # درخواست شرطی با session مشترک؛ پاسخ تکراری دوباره پارس نمی‌شود
+    with instrumentation.span('http_fetch', source='tsetmc'):
+        data = http_cache.fetch(TSETMC_PRICE_URL.format(symbol=symbol), json.loads)
+    if not data or 'closingPriceData' not in data:
+        raise ValueError(f"No closingPriceData for {symbol}")
+    return data['closingPriceData']
+
+def fetch_instrument_snapshot(symbol):
+    """دریافت closingPriceData یک نماد از tsetmc (کش فقط بر اساس نماد)"""
+    return source_cache.get_default_cache().get(
+        f'tsetmc:{symbol}', lambda: _fetch_instrument_snapshot(symbol), source='tsetmc'
+    )
+
+
+def load_universe(path=UNIVERSE_PATH):
+    """خواندن لیست ذخیره‌شده صندوق‌ها
+
+    Returns:
+        (fetched_at, funds) یا None اگر فایل وجود نداشته باشد یا خراب باشد
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return float(data['fetched_at']), dict(data['funds'])
+    except FileNotFoundError:
+        return None
+    except (ValueError, KeyError, TypeError) as e:
+        log.warning("Ignoring invalid ETF universe file %s: %s", path, e)
+        return None
+
+def save_universe(funds, path=UNIVERSE_PATH, fetched_at=None):
+    """ذخیره لیست صندوق‌ها به همراه زمان دریافت (جایگزینی اتمیک فایل)"""
+    fetched_at = fetched_at or time.time()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'fetched_at': fetched_at, 'funds': funds}, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return fetched_at
 
 
 class GoldETFAnalyzer:
-    def __init__(self):
+    def __init__(self, wait_budget=chrome_config.WAIT_BUDGET, universe_path=UNIVERSE_PATH,
+                 universe_refresh=UNIVERSE_REFRESH_INTERVAL, block_resources=True):
+        # حداکثر زمان انتظار برای آماده شدن جدول‌های tradersarena (ثانیه)
+        self.wait_budget = wait_budget
+        # بارگذاری tradersarena بدون تصاویر، فونت‌ها و آمارگیرها (فقط DOM جدول‌ها لازم است)
+        self.block_resources = block_resources
+        # مدت زمان واقعی انتظار در آخرین اجرای هر مرحله (ثانیه)
+        self.wait_times = {}
+        # آمار افزایشی حباب و حجم معاملات در طول زمان
+        self.stats = streaming_stats.MarketStatistics()
         # اطلاعات پایه صندوق‌های طلا
         self.gold_etf_info = {
             'طلا': {  # لوتوس
@@ -71,29 +136,105 @@ class GoldETFAnalyzer:
                 'gold_purity': 1.000
             }
         }
-        self.gold_etfs = {}  # این دیکشنری با اطلاعات صندوق‌ها پر خواهد شد
+        # لیست صندوق‌ها از فایل خوانده و فقط وقتی کهنه شود در پس‌زمینه دوباره دریافت می‌شود
+        self.universe_path = universe_path
+        self.universe_refresh = universe_refresh
+        self.universe_fetched_at = None
+        self._universe_attempted_at = None
+        self._universe_thread = None
+        self._universe_lock = threading.Lock()
+        self._gold_etfs = None
+    
+    def load_saved_universe(self):
+        """خواندن لیست ذخیره‌شده صندوق‌ها (فقط بار اول) و زمان دریافت آن
+
+        اگر فایلی نباشد فقط صندوق‌های پایه gold_etf_info برمی‌گردند.
+        """
+        if self._gold_etfs is None:
+            cached = load_universe(self.universe_path)
+            if cached:
+                self.universe_fetched_at, funds = cached
+            else:
+                funds = {}
+            self._gold_etfs = self._merge_universe(funds)
+        return self._gold_etfs
+
+    @property
+    def gold_etfs(self):
+        """لیست همه صندوق‌های طلا (از فایل ذخیره‌شده، بدون راه‌اندازی مرورگر)"""
+        self.load_saved_universe()
+        self.refresh_universe_if_stale()
+        return self._gold_etfs
+    
+    @gold_etfs.setter
+    def gold_etfs(self, value):
+        self._gold_etfs = value
+    
+    def _merge_universe(self, funds):
+        """ترکیب صندوق‌های دریافت‌شده با اطلاعات پایه gold_etf_info (اطلاعات پایه اولویت دارد)"""
+        merged = {symbol: dict(info) for symbol, info in funds.items()}
+        for symbol, info in self.gold_etf_info.items():
+            merged[symbol] = {**merged.get(symbol, {}), **info}
+        return merged
+    
+    def refresh_universe_if_stale(self):
+        """شروع دریافت دوباره لیست صندوق‌ها در پس‌زمینه اگر از universe_refresh قدیمی‌تر باشد
+        
+        Returns:
+            True اگر به‌روزرسانی شروع شده باشد
+        """
+        # زمان دریافت از فایل خوانده می‌شود؛ بدون آن هر شروع برنامه یک دریافت با مرورگر بود
+        self.load_saved_universe()
+        now = time.time()
+        if self.universe_fetched_at and now - self.universe_fetched_at < self.universe_refresh:
+            return False
+        if self._universe_attempted_at and now - self._universe_attempted_at < UNIVERSE_RETRY_INTERVAL:
+            return False
+        return self.refresh_universe(background=True)
+    
+    def refresh_universe(self, background=False):
+        """دریافت دوباره لیست صندوق‌ها از tradersarena و ذخیره آن روی دیسک
+        
+        در حالت background فقط یک دریافت همزمان انجام می‌شود و بلافاصله برمی‌گردد.
+        """
+        with self._universe_lock:
+            if self._universe_thread is not None and self._universe_thread.is_alive():
+                return False
+            self._universe_attempted_at = time.time()
+            if background:
+                self._universe_thread = threading.Thread(
+                    target=self.get_all_gold_etfs, name='etf-universe', daemon=True
+                )
+                self._universe_thread.start()
+                return True
         self.get_all_gold_etfs()
+        return True
     
     def get_all_gold_etfs(self):
         """دریافت لیست همه صندوق‌های طلا از tradersarena"""
+        from selenium.webdriver.common.by import By
+        
+        gold_etfs = {}
         try:
-            print("Getting ETF list from tradersarena...")
+            log.info("Getting ETF list from tradersarena...")
             
-            # استفاده از تنظیمات مشترک Chrome و headers
-            driver = chrome_config.get_chrome_driver()
-            headers = chrome_config.get_headers()
-            
-            try:
-                driver.get('https://tradersarena.ir/industries/68f')
+            # استفاده از مرورگرهای گرم استخر مشترک Chrome
+            with chrome_config.lease_driver(self.block_resources) as driver:
+                with instrumentation.span('page_load', source='tradersarena'):
+                    driver.get('https://tradersarena.ir/industries/68f')
                 
-                # افزایش زمان انتظار
-                wait = WebDriverWait(driver, 60)  # افزایش به 60 ثانیه
-                table = wait.until(EC.presence_of_element_located((By.ID, 'navTable')))
-                time.sleep(10)  # افزایش به 10 ثانیه
+                # صبر تا ثابت شدن جدول به جای sleep ثابت
+                ready, waited = chrome_config.wait_for_table_ready(
+                    driver, 'navTable', budget=self.wait_budget
+                )
+                self.wait_times['etf_list'] = waited
+                log.info("navTable %s after %.2fs", 'ready' if ready else 'not ready', waited)
+                
+                table = driver.find_element(By.ID, 'navTable')
                 
                 # پیدا کردن ردیف‌های جدول
                 rows = table.find_elements(By.TAG_NAME, 'tr')
-                print(f"Found {len(rows)} rows")
+                log.debug("Found %d rows", len(rows))
                 
                 for row in rows[1:]:
                     try:
@@ -103,67 +244,38 @@ class GoldETFAnalyzer:
                             symbol = symbol_element.text.strip()
                             
                             if symbol and symbol not in ['حداقل', 'حداکثر']:
-                                self.gold_etfs[symbol] = {
+                                gold_etfs[symbol] = {
                                     'name': symbol_element.get_attribute('href').split('/')[-1],
                                     'gold_weight': 0.01,
                                     'gold_purity': 1.000
                                 }
-                                print(f"Added ETF: {symbol}")
+                                log.debug("Added ETF: %s", symbol)
                                 
                     except Exception as e:
-                        print(f"Error parsing row: {str(e)}")
+                        log.warning("Error parsing row: %s", e)
                         continue
                 
-            finally:
-                driver.quit()
-                
-            print(f"Total gold ETFs found: {len(self.gold_etfs)}")
+            log.info("Total gold ETFs found: %d", len(gold_etfs))
+            if not gold_etfs:
+                raise Exception("No ETFs found in navTable")
+            
+            self.gold_etfs = self._merge_universe(gold_etfs)
+            self.universe_fetched_at = save_universe(gold_etfs, self.universe_path)
             
         except Exception as e:
-            print(f"Error getting ETF list: {str(e)}")
-            # اگر خطا رخ داد، از لیست پیش‌فرض استفاده کنیم
-            self.gold_etfs = self.gold_etf_info
+            log.error("Error getting ETF list: %s", e)
+            # اگر خطا رخ داد، لیست قبلی (از حافظه یا فایل، وگرنه لیست پیش‌فرض) حفظ می‌شود
+            self.load_saved_universe()
+        return self._gold_etfs
     
     def convert_volume(self, volume_text):
         """تبدیل متن حجم معاملات به عدد"""
-        try:
-            print(f"Converting volume: '{volume_text}'")  # Debug
-            
-            if not volume_text or volume_text == '-':
-                return 0
-                
-            # حذف همه فاصله‌ها و کاماها
-            volume_text = volume_text.replace(',', '').replace(' ', '')
-            
-            # تبدیل B به میلیارد
-            if 'B' in volume_text:
-                number = float(volume_text.replace('B', ''))
-                result = int(number * 1000000000)
-                print(f"Converted B: {volume_text} -> {result}")
-                return result
-                
-            # تبدیل K به هزار
-            if 'K' in volume_text:
-                number = float(volume_text.replace('K', ''))
-                result = int(number * 1000)
-                print(f"Converted K: {volume_text} -> {result}")
-                return result
-                
-            # تبدیل M به میلیون
-            if 'M' in volume_text:
-                number = float(volume_text.replace('M', ''))
-                result = int(number * 1000000)
-                print(f"Converted M: {volume_text} -> {result}")
-                return result
-                
-            # اگر عدد ساده باشد
-            result = int(float(volume_text))
-            print(f"Converted plain: {volume_text} -> {result}")
-            return result
-            
-        except (ValueError, TypeError) as e:
-            print(f"Error converting volume '{volume_text}': {str(e)}")
+        volume = number_parser.parse_number(volume_text)
+        if volume is None:
+            if volume_text and volume_text.strip() != '-':
+                log.warning("Error converting volume '%s'", volume_text)
             return 0
+        return int(volume)
 
     def test_volume_conversion(self):
         """تست تبدیل حجم معاملات"""
@@ -181,226 +293,273 @@ class GoldETFAnalyzer:
             print(f"Input: {test} -> Output: {result:,}")
             
     def clean_number(self, text):
-        """تمیز کردن متن عددی از کاما، فاصله و پسوندها"""
-        if not text or text == '-':
+        """تبدیل متن عددی (با کاما، فاصله و پسوند) به float؛ برای '-' یا متن نامعتبر None"""
+        number = number_parser.parse_number(text)
+        if number is None and text and text.strip() != '-':
+            log.warning("Error cleaning number '%s'", text)
+        return number
+        
+    def _build_etf_entry(self, symbol, name, volume_text, price_text, nav_text, bubble_text):
+        """ساخت رکورد یک صندوق از متن خام سلول‌های جدول"""
+        log.debug("Processing row - Symbol: %s, Volume: %s, Price: %s, NAV: %s", symbol, volume_text, price_text, nav_text)
+        
+        if not symbol or symbol in ['حداقل', 'حداکثر']:
             return None
             
-        # حذف کاما و فاصله
-        text = text.replace(',', '').replace(' ', '').strip()
+        volume = self.convert_volume(volume_text)
+        price = self.clean_number(price_text)
+        nav = self.clean_number(nav_text)
         
-        try:
-            # حذف پسوندها
-            for suffix in ['B', 'M', 'K']:
-                if suffix in text:
-                    number = float(text.replace(suffix, ''))
-                    if suffix == 'B':
-                        return str(number * 1000000000)
-                    elif suffix == 'M':
-                        return str(number * 1000000)
-                    elif suffix == 'K':
-                        return str(number * 1000)
-            
-            return text
-            
-        except Exception as e:
-            print(f"Error cleaning number '{text}': {str(e)}")
+        if price is None or nav is None:
             return None
-        
-    def get_market_data(self):
-        """دریافت اطلاعات صندوق‌ها از tradersarena با استفاده از selenium"""
-        try:
-            print("\nGetting market data from tradersarena...")
             
-            driver = chrome_config.get_chrome_driver()
+        bubble = number_parser.parse_number(bubble_text, 0)
             
+        if nav > 0 and price > 0:  # اطمینان از معتبر بودن اعداد
+            log.debug("Added data for %s: Price=%s, NAV=%s, Volume=%s", symbol, price, nav, volume)
+            return records.FundQuote(name, price * 10, nav * 10, bubble, volume)
+            
+        log.warning("Invalid numbers for %s: Price=%s, NAV=%s", symbol, price, nav)
+        return None
+
+    def parse_market_table(self, html):
+        """استخراج اطلاعات صندوق‌ها از HTML صفحه در یک مرحله (بدون فراخوانی WebDriver)"""
+        soup = BeautifulSoup(html, 'html.parser')
+        table = soup.find(id='industriesTable')
+        if table is None:
+            raise Exception("industriesTable not found in page source")
+            
+        body = table.find('tbody') or table
+        etf_data = {}
+        
+        for row in body.find_all('tr'):
             try:
-                driver.get('https://tradersarena.ir/industries/68f')
-                
-                # صبر برای لود شدن جدول
-                wait = WebDriverWait(driver, 60)
-                
-                # صبر برای لود شدن کل صفحه
-                wait.until(EC.presence_of_element_located((By.TAG_NAME, 'body')))
-                time.sleep(3)
-                
-                # صبر برای لود شدن جدول
-                table = wait.until(EC.presence_of_element_located((By.ID, 'industriesTable')))
-                time.sleep(3)
-                
-                # صبر برای لود شدن محتوای جدول
-                wait.until(EC.presence_of_element_located((By.XPATH, "//table[@id='industriesTable']//tbody//tr[1]//td[1]//a")))
-                time.sleep(3)
+                if row.get('id') in ('minrow', 'maxrow'):
+                    continue
+                    
+                cells = row.find_all('td', recursive=False)
+                if len(cells) < 10:
+                    continue
+                    
+                link = cells[0].find('a')
+                if link is None:
+                    continue
+                    
+                symbol = link.get_text(strip=True)
+                entry = self._build_etf_entry(
+                    symbol,
+                    link.get('title') or symbol,
+                    cells[1].get_text(strip=True),
+                    cells[3].get_text(strip=True),  # قیمت آخرین معامله
+                    cells[4].get_text(strip=True),  # NAV
+                    cells[5].get_text(strip=True)  # حباب
+                )
+                if entry:
+                    etf_data[symbol] = entry
+                    
+            except Exception as e:
+                log.warning("Error parsing row: %s", e)
+                continue
                 
-                # پیدا کردن ردیف‌ها
-                rows = table.find_elements(By.XPATH, ".//tbody//tr[not(@id='minrow') and not(@id='maxrow')]")
+        return etf_data
+
+    def _parse_market_rows(self, table, wait):
+        """استخراج اطلاعات صندوق‌ها با خواندن تک‌تک سلول‌ها از WebDriver (روش قدیمی)"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        # پیدا کردن ردیف‌ها
+        rows = table.find_elements(By.XPATH, ".//tbody//tr[not(@id='minrow') and not(@id='maxrow')]")
+        
+        if len(rows) <= 0:
+            raise Exception("No rows found in table")
+            
+        log.debug("Found %d rows", len(rows))
+        
+        etf_data = {}
+        
+        for row in rows:
+            try:
+                # صبر برای لود شدن هر ردیف
+                wait.until(EC.presence_of_element_located((By.TAG_NAME, 'td')))
+                cells = row.find_elements(By.TAG_NAME, 'td')
                 
-                if len(rows) <= 0:
-                    raise Exception("No rows found in table")
+                if len(cells) < 10 or not cells[0].find_elements(By.TAG_NAME, 'a'):
+                    continue
                     
-                print(f"Found {len(rows)} rows")
+                symbol = cells[0].find_element(By.TAG_NAME, 'a').text.strip()
+                entry = self._build_etf_entry(
+                    symbol,
+                    cells[0].find_element(By.TAG_NAME, 'a').get_attribute('title') or symbol,
+                    cells[1].text.strip(),
+                    cells[3].text.strip(),  # قیمت آخرین معامله
+                    cells[4].text.strip(),  # NAV
+                    cells[5].text.strip()  # حباب
+                )
+                if entry:
+                    etf_data[symbol] = entry
+                    
+            except Exception as e:
+                log.warning("Error parsing row: %s", e)
+                continue
                 
-                etf_data = {}
+        return etf_data
+        
+    def get_market_data(self, use_page_source=True):
+        """دریافت اطلاعات صندوق‌ها از tradersarena با استفاده از selenium
+        
+        Args:
+            use_page_source: اگر True باشد، HTML صفحه یک بار گرفته و به صورت محلی
+                پارس می‌شود؛ در غیر این صورت هر سلول جداگانه از WebDriver خوانده می‌شود.
+        """
+        try:
+            log.info("Getting market data from tradersarena...")
+            
+            with chrome_config.lease_driver(self.block_resources) as driver:
+                with instrumentation.span('page_load', source='tradersarena'):
+                    driver.get('https://tradersarena.ir/industries/68f')
                 
-                for row in rows:
-                    try:
-                        # صبر برای لود شدن هر ردیف
-                        wait.until(EC.presence_of_element_located((By.TAG_NAME, 'td')))
-                        cells = row.find_elements(By.TAG_NAME, 'td')
-                        
-                        if len(cells) < 10 or not cells[0].find_elements(By.TAG_NAME, 'a'):
-                            continue
-                            
-                        symbol = cells[0].find_element(By.TAG_NAME, 'a').text.strip()
-                        name = cells[0].find_element(By.TAG_NAME, 'a').get_attribute('title') or symbol
-                        volume_text = cells[1].text.strip()
-                        price_text = cells[3].text.strip()  # قیمت آخرین معامله
-                        nav_text = cells[4].text.strip()  # NAV
-                        bubble_text = cells[5].text.strip().replace('%', '')  # حباب
-                        
-                        print(f"Processing row - Symbol: {symbol}, Volume: {volume_text}, Price: {price_text}, NAV: {nav_text}")
+                # صبر تا پر شدن ستون NAV ردیف اول و ثابت شدن جدول
+                ready, waited = chrome_config.wait_for_table_ready(
+                    driver, 'industriesTable', cell_index=4, budget=self.wait_budget
+                )
+                self.wait_times['market_data'] = waited
+                log.info("industriesTable %s after %.2fs", 'ready' if ready else 'not ready', waited)
+                
+                with instrumentation.span('parse', source='tradersarena'):
+                    if use_page_source:
+                        etf_data = self.parse_market_table(driver.page_source)
+                    else:
+                        from selenium.webdriver.common.by import By
+                        from selenium.webdriver.support.ui import WebDriverWait
                         
-                        if symbol and symbol not in ['حداقل', 'حداکثر']:
-                            volume = self.convert_volume(volume_text)
-                            
-                            # تمیز کردن اعداد
-                            price_text = self.clean_number(price_text)
-                            nav_text = self.clean_number(nav_text)
-                            
-                            if nav_text and price_text:
-                                try:
-                                    price = float(price_text)
-                                    nav = float(nav_text)
-                                    bubble = float(bubble_text) if bubble_text and bubble_text != '-' else 0
-                                    
-                                    if nav > 0 and price > 0:  # اطمینان از معتبر بودن اعداد
-                                        etf_data[symbol] = {
-                                            'name': name,
-                                            'price': price * 10,
-                                            'nav': nav * 10,
-                                            'bubble': bubble,
-                                            'volume': volume
-                                        }
-                                        print(f"Added data for {symbol}: Price={price:,}, NAV={nav:,}, Volume={volume:,}")
-                                    else:
-                                        print(f"Invalid numbers for {symbol}: Price={price}, NAV={nav}")
-                                    
-                                except ValueError as e:
-                                    print(f"Error converting numbers for {symbol}: {str(e)}, Raw Price: '{price_text}', Raw NAV: '{nav_text}'")
-                                    continue
-                                
-                    except Exception as e:
-                        print(f"Error parsing row: {str(e)}")
-                        continue
+                        table = driver.find_element(By.ID, 'industriesTable')
+                        wait = WebDriverWait(driver, self.wait_budget)
+                        etf_data = self._parse_market_rows(table, wait)
                 
                 if not etf_data:
                     raise Exception("No ETF data could be extracted")
                     
-            finally:
-                driver.quit()
-                
             return etf_data
             
         except Exception as e:
-            print(f"Error getting market data: {str(e)}")
+            log.error("Error getting market data: %s", e)
             return {}
 
-    def calculate_gold_value(self, gold_prices):
+    def calculate_gold_value(self, gold_prices, market_data=None):
         """محاسبه حباب صندوق‌ها با استفاده از NAV"""
         try:
-            market_data = self.get_market_data()
+            if market_data is None:
+                market_data = self.get_market_data()
             if not market_data:
                 return None
             
-            print("\nProcessing market data:")  # Debug
-            for symbol, data in market_data.items():
-                print(f"{symbol}: Volume={data['volume']:,}, Name={data['name']}")  # Debug
+            if log.isEnabledFor(logging.DEBUG):
+                for symbol, data in market_data.items():
+                    log.debug("%s: Volume=%s, Name=%s", symbol, data['volume'], data['name'])
             
-            etf_data = {}
-            for symbol, data in market_data.items():
-                if data['nav'] > 0:  # فقط صندوق‌های فعال
-                    etf_data[symbol] = {
-                        'name': data['name'],
-                        'price': data['price'],
-                        'gold_value': data['nav'],
-                        'bubble': data['bubble'],
-                        'volume': data['volume']
-                    }
-                    print(f"Added to etf_data: {symbol} with volume {data['volume']:,}")  # Debug
-            
-            return etf_data
+            # فقط صندوق‌های فعال؛ رکوردها بدون کپی به مرحله بعد می‌روند
+            return {symbol: quote for symbol, quote in market_data.items() if quote.gold_value > 0}
             
         except Exception as e:
-            print(f"Error calculating values: {str(e)}")
+            log.error("Error calculating values: %s", e)
             return None
     
-    @st.cache_data(ttl=300)
-    def get_market_price(self, symbol):
-        try:
-            # استفاده از headers مشترک
-            headers = chrome_config.get_headers()
-            
-            url = f"http://cdn.tsetmc.com/api/Instrument/GetInstrumentPriceData/{symbol}"
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and 'closingPriceData' in data:
-                    return float(data['closingPriceData']['finalPrice'])
+    def get_instrument_snapshots(self, symbols, max_workers=SNAPSHOT_WORKERS):
+        """دریافت همزمان اطلاعات معاملاتی چند صندوق از tsetmc با یک درخواست برای هر نماد
+        
+        Returns:
+            دیکشنری نماد -> همه فیلدهای closingPriceData به علاوه price و volume؛
+            برای نمادهایی که دریافت نشدند price و volume برابر صفر است.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
             
-            return 0
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(symbols))) as executor:
+            futures = {symbol: executor.submit(fetch_instrument_snapshot, symbol) for symbol in symbols}
+        
+        snapshots = {}
+        for symbol, future in futures.items():
+            try:
+                data = dict(future.result())
+            except Exception as e:
+                log.warning("Error getting instrument data for %s: %s", symbol, e)
+                data = {}
+                
+            data['price'] = float(data.get('finalPrice') or 0)
+            data['volume'] = int(data.get('volume') or 0)
+            snapshots[symbol] = data
             
-        except Exception as e:
-            print(f"Error getting market price for {symbol}: {str(e)}")
-            return 0
+        return snapshots
+    
+    def get_market_price(self, symbol):
+        return self.get_instrument_snapshots([symbol])[symbol]['price']
     
-    @st.cache_data(ttl=300)
     def get_trading_volume(self, symbol):
-        try:
-            # استفاده از headers مشترک
-            headers = chrome_config.get_headers()
-            
-            url = f"http://cdn.tsetmc.com/api/Instrument/GetInstrumentPriceData/{symbol}"
-            response = requests.get(url, headers=headers)
-            
-            if response.status_code == 200:
-                data = response.json()
-                if data and 'closingPriceData' in data:
-                    return int(data['closingPriceData']['volume'])
-            
-            return 0
-            
-        except Exception as e:
-            print(f"Error getting volume for {symbol}: {str(e)}")
-            return 0
+        return self.get_instrument_snapshots([symbol])[symbol]['volume']
     
-    def get_analysis(self):
-        """تحلیل جامع صندوق‌های طلا"""
-        # دریافت قیمت‌های طلا
-        gold_prices = cpc.get_prices()
-        if not gold_prices:
-            return None
-        
-        # محاسبه ارزش و حباب صندوق‌ها
-        etf_data = self.calculate_gold_value(gold_prices)
+    def get_analysis(self, columnar=False):
+        """تحلیل جامع صندوق‌های طلا
+
+        Args:
+            columnar: اگر True باشد (frame, meta) برمی‌گردد: frame یک DataFrame
+                ستونی از رکوردهای FundQuote (records.funds_frame) و meta بقیه
+                تحلیل بدون all_funds است؛ در صورت خطا (None, None)
+        """
+        # دریافت همزمان قیمت‌های طلا و اطلاعات صندوق‌ها
+        snapshot = fetch_orchestrator.refresh(self)
+        analysis = snapshot['analysis']
+        if not columnar:
+            return analysis
+        if analysis is None:
+            return None, None
+        # meta جدا از frame: pandas محتوای attrs را در هر عملیات کپی می‌کند
+        meta = {key: value for key, value in analysis.items() if key != 'all_funds'}
+        return records.funds_frame(snapshot['funds']), meta
+
+    @instrumentation.timed('analysis', source='etf')
+    def build_analysis(self, etf_data):
+        """ساخت خروجی تحلیل از رکوردهای FundQuote صندوق‌ها
+
+        all_funds (دیکشنری قابل تبدیل به JSON) فقط یک بار اینجا از رکوردها ساخته می‌شود.
+        """
         if not etf_data:
             return None
         
         # یافتن بهترین گزینه‌ها
+        all_funds = records.funds_json(etf_data)
+        lowest = min(etf_data, key=lambda symbol: etf_data[symbol].bubble)
+        highest = max(etf_data, key=lambda symbol: etf_data[symbol].volume)
         analysis = {
-            'lowest_bubble': min(etf_data.items(), key=lambda x: x[1]['bubble']),
-            'highest_volume': max(etf_data.items(), key=lambda x: x[1]['volume']),
-            'all_funds': etf_data
+            'lowest_bubble': (lowest, all_funds[lowest]),
+            'highest_volume': (highest, all_funds[highest]),
+            'all_funds': all_funds
         }
         
         # تولید توصیه‌ها
         recommendations = self.get_recommendations(etf_data)
         
         analysis['recommendations'] = recommendations
+        
+        # آمار snapshot فعلی در یک گذر (Welford)
+        bubble_stats = streaming_stats.Welford()
+        total_volume = 0
+        for quote in etf_data.values():
+            bubble_stats.update(quote.bubble)
+            total_volume += quote.volume
+        
+        # به‌روزرسانی افزایشی آمار 1h/1d/1w بدون مرور دوباره تاریخچه
+        self.stats.update(etf_data)
+        summary = self.stats.summary()
+        
         analysis['market_stats'] = {
-            'avg_bubble': sum(data['bubble'] for data in etf_data.values()) / len(etf_data),
-            'std_bubble': (sum((data['bubble'] - sum(data['bubble'] for data in etf_data.values()) / len(etf_data)) ** 2 for data in etf_data.values()) / len(etf_data)) ** 0.5,
-            'avg_volume': sum(data['volume'] for data in etf_data.values()) / len(etf_data)
+            'avg_bubble': bubble_stats.mean,
+            'std_bubble': bubble_stats.std,
+            'avg_volume': total_volume / len(etf_data),
+            'history': summary['market']
         }
+        analysis['fund_stats'] = summary['funds']
         return analysis
 
     def get_recommendations(self, funds_data):
@@ -474,6 +633,7 @@ class GoldETFAnalyzer:
 
 def main():
     """اجرای مستقل تحلیل صندوق‌های طلا"""
+    instrumentation.configure_logging()
     try:
         print("تحلیل صندوق‌های طلا")
         print("-" * 50)
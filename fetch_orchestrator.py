@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from collections import namedtuple
+import logging
+import time
+import coin_price_calculator as cpc
+
+log = logging.getLogger(__name__)
+
+# یک منبع داده: تابع دریافت، مهلت (ثانیه) و مقدار جایگزین در صورت خطا یا اتمام مهلت
+Source = namedtuple('Source', ['name', 'fetch', 'timeout', 'fallback'])
+
+# مهلت پیش‌فرض هر منبع (ثانیه)
+SOURCE_TIMEOUTS = {
+    'bonbast': 30,
+    'paxg': 10,
+    'xaut': 10,
+    'tradersarena': 120
+}
+
+
+def fetch_all(sources, max_workers=None):
+    """اجرای همزمان همه منابع با مهلت جداگانه برای هر کدام
+
+    مهلت هر منبع از لحظه شروع کل دریافت حساب می‌شود، پس زمان کل برابر با
+    کندترین منبع (یا مهلت آن) است نه مجموع همه. منبعی که خطا بدهد یا از
+    مهلتش بگذرد مقدار ``fallback`` خود را برمی‌گرداند و بقیه را معطل نمی‌کند.
+
+    Returns:
+        (results, report): مقدار هر منبع و گزارش وضعیت/زمان هر منبع بر اساس نام
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(sources), thread_name_prefix='fetch')
+    started = time.monotonic()
+    futures = {source.name: executor.submit(source.fetch) for source in sources}
+
+    results = {}
+    report = {}
+    try:
+        for source in sources:
+            remaining = max(0, started + source.timeout - time.monotonic())
+            try:
+                results[source.name] = futures[source.name].result(timeout=remaining)
+                status = 'ok'
+            except FutureTimeoutError:
+                log.warning("%s timed out after %ss, using fallback", source.name, source.timeout)
+                results[source.name] = source.fallback
+                status = 'timeout'
+            except Exception as e:
+                log.warning("Error fetching %s: %s", source.name, e)
+                results[source.name] = source.fallback
+                status = 'error'
+            report[source.name] = {
+                'status': status,
+                'elapsed': time.monotonic() - started
+            }
+    finally:
+        # منابع کند در پس‌زمینه تمام می‌شوند و منتظرشان نمی‌مانیم
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results, report
+
+
+def _non_empty(source):
+    """خطا به جای نتیجه خالی، تا نتیجه ناموفق در کش ذخیره نشود"""
+    def load():
+        value = source.fetch()
+        if not value:
+            raise ValueError(f"{source.name} returned no data")
+        return value
+    return load
+
+
+def refresh(analyzer=None, timeouts=None, allow_browser_fallback=True, store=None, cache=None):
+    """دریافت همزمان bon-bast، Mexc و tradersarena و ساخت prices و analysis
+
+    Args:
+        analyzer: نمونه GoldETFAnalyzer؛ اگر None باشد فقط prices ساخته می‌شود
+        timeouts: دیکشنری مهلت منابع برای جایگزینی مقادیر SOURCE_TIMEOUTS
+        allow_browser_fallback: اجازه استفاده از مرورگر در صورت شکست HTTP برای bon-bast
+        store: نمونه SnapshotStore برای ذخیره snapshot در تاریخچه (اختیاری)
+        cache: نمونه SourceCache؛ اگر داده شود هر منبع طبق TTL خودش به‌روز می‌شود
+
+    Returns:
+        دیکشنری با کلیدهای prices، analysis، funds ({نماد: FundQuote} که analysis از آن
+        ساخته شده) و sources (گزارش هر منبع)
+    """
+    limits = dict(SOURCE_TIMEOUTS, **(timeouts or {}))
+
+    sources = [
+        Source('bonbast', lambda: cpc.get_local_prices(allow_browser_fallback), limits['bonbast'], None),
+        Source('paxg', lambda: cpc.get_crypto_gold_price('PAXG_USDT'), limits['paxg'], 0),
+        Source('xaut', lambda: cpc.get_crypto_gold_price('XAUT_USDT'), limits['xaut'], 0)
+    ]
+    if analyzer is not None:
+        sources.append(Source('tradersarena', analyzer.get_market_data, limits['tradersarena'], {}))
+
+    if cache is not None:
+        sources = [
+            source._replace(fetch=lambda source=source: cache.get(source.name, _non_empty(source)))
+            for source in sources
+        ]
+
+    results, report = fetch_all(sources)
+
+    prices = None
+    if results['bonbast']:
+        prices = cpc.build_prices(results['bonbast'], {
+            'paxg': results['paxg'],
+            'xaut': results['xaut']
+        })
+
+    analysis = etf_data = None
+    if analyzer is not None and prices:
+        etf_data = analyzer.calculate_gold_value(prices, market_data=results['tradersarena'])
+        analysis = analyzer.build_analysis(etf_data)
+
+    if store is not None and (prices or analysis):
+        try:
+            ts = time.time()
+            store.append(prices, analysis, ts=ts)
+            store.publish_latest(prices, analysis, ts=ts)
+        except Exception as e:
+            log.error("Error saving snapshot: %s", e)
+
+    return {
+        'prices': prices,
+        'analysis': analysis,
+        'funds': etf_data,
+        'sources': report
+    }
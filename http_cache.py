@@ -0,0 +1,254 @@
+"""کش HTTP روی دیسک با درخواست شرطی (ETag / Last-Modified)
+
+هر پاسخ به همراه ETag و Last-Modified آن ذخیره می‌شود و درخواست بعدی همان
+آدرس با If-None-Match و If-Modified-Since فرستاده می‌شود. اگر سرور 304
+برگرداند (یا بدنه پاسخ دقیقاً همان قبلی باشد) نتیجه پارس قبلی دوباره
+استفاده می‌شود و پارس تکرار نمی‌شود. حجم کل فایل‌ها محدود است و قدیمی‌ترین
+آدرس‌های استفاده‌شده (LRU) حذف می‌شوند.
+"""
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import cassette
+import chrome_config
+
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'http_cache')
+HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024   # حداکثر حجم بدنه‌های ذخیره‌شده روی دیسک
+
+log = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class HttpCache:
+    """کش LRU روی دیسک برای پاسخ‌های GET و نتیجه پارس آن‌ها
+
+    هر آدرس دو فایل دارد: ``<key>.body`` (بدنه خام) و ``<key>.json`` (آدرس،
+    validatorها، encoding و hash بدنه). ترتیب LRU از زمان تغییر فایل‌ها
+    خوانده می‌شود، پس بعد از اجرای دوباره برنامه هم حفظ می‌شود.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_bytes=HTTP_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = None          # OrderedDict کلید -> metadata، قدیمی‌ترین اول
+        self._size = 0
+        self._parsed = {}             # کلید -> (hash بدنه، نتیجه پارس)
+        self._stats = {'not_modified': 0, 'unchanged': 0, 'misses': 0, 'evictions': 0}
+
+    # ---- فایل‌ها ----
+
+    def _path(self, key, suffix):
+        return os.path.join(self.directory, f'{key}.{suffix}')
+
+    def _load_index(self):
+        if self._entries is not None:
+            return
+        entries = []
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    with open(path, encoding='utf-8') as f:
+                        meta = json.load(f)
+                    entries.append((os.path.getmtime(path), name[:-5], meta))
+                except (OSError, ValueError) as e:
+                    log.debug("Ignoring cache entry %s: %s", name, e)
+        except OSError as e:
+            log.warning("Cannot read HTTP cache directory %s: %s", self.directory, e)
+
+        self._entries = OrderedDict((key, meta) for _, key, meta in sorted(entries, key=lambda item: item[0]))
+        self._size = sum(meta['size'] for meta in self._entries.values())
+
+    def _touch(self, key):
+        if key not in self._entries:
+            return
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key, 'json'))
+        except OSError:
+            pass
+
+    def _remove(self, key):
+        meta = self._entries.pop(key, None)
+        if meta is not None:
+            self._size -= meta['size']
+        self._parsed.pop(key, None)
+        for suffix in ('json', 'body'):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def _write(self, path, data, mode):
+        temp_path = f'{path}.tmp'
+        with open(temp_path, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _store(self, key, meta, body=None):
+        """ذخیره metadata (و بدنه اگر داده شود) و حذف LRU تا رسیدن به max_bytes"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            if body is not None:
+                self._write(self._path(key, 'body'), body, 'wb')
+            self._write(self._path(key, 'json'), json.dumps(meta), 'w')
+        except OSError as e:
+            log.warning("Error writing HTTP cache entry for %s: %s", meta['url'], e)
+            self._remove(key)
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= old['size']
+        self._entries[key] = meta
+        self._size += meta['size']
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            log.debug("Evicting %s from HTTP cache", self._entries[oldest]['url'])
+            self._remove(oldest)
+            self._stats['evictions'] += 1
+
+    # ---- دریافت ----
+
+    def _cached_value(self, key, meta, parse):
+        """نتیجه پارس بدنه ذخیره‌شده؛ از حافظه یا (بعد از اجرای دوباره) از فایل
+
+        بدون نگه داشتن قفل صدا زده می‌شود: قفل فقط برای خواندن و ثبت نتیجه
+        گرفته می‌شود تا پارس منابع مختلف (در threadهای fetch_orchestrator) همزمان اجرا شود.
+        """
+        with self._lock:
+            parsed = self._parsed.get(key)
+        if parsed is not None and parsed[0] == meta['digest']:
+            return parsed[1]
+        try:
+            with open(self._path(key, 'body'), 'rb') as f:
+                body = f.read()
+        except OSError:
+            return _MISSING
+        value = parse(body.decode(meta['encoding'], errors='replace'))
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current['digest'] == meta['digest']:
+                self._parsed[key] = (meta['digest'], value)
+        return value
+
+    def fetch(self, url, parse, session=None, **kwargs):
+        """GET شرطی url و برگرداندن parse(متن بدنه)
+
+        parse برای هر آدرس باید همیشه همان تابع باشد، چون نتیجه آن برای
+        پاسخ‌های 304 یا بدنه‌های تکراری دوباره استفاده می‌شود.
+
+        Args:
+            url: آدرس
+            parse: تابعی که متن بدنه را می‌گیرد
+            session: پیش‌فرض session مشترک chrome_config
+            kwargs: آرگومان‌های اضافه session.get
+
+        Raises:
+            خطای شبکه، HTTPError برای پاسخ‌های ناموفق، یا خطای parse
+        """
+        session = session or chrome_config.get_http_session()
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        with self._lock:
+            self._load_index()
+            meta = self._entries.get(key)
+
+        request_headers = kwargs.pop('headers', None)
+        headers = dict(request_headers or {})
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        response = session.get(url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            value = self._cached_value(key, meta, parse)
+            with self._lock:
+                self._stats['not_modified'] += 1
+                if value is not _MISSING:
+                    self._touch(key)
+                else:
+                    # بدنه از دیسک حذف شده است: درخواست کامل
+                    self._remove(key)
+            if value is not _MISSING:
+                return copy.deepcopy(value)
+            return self.fetch(url, parse, session, headers=request_headers, **kwargs)
+
+        response.raise_for_status()
+        body = response.content
+        digest = hashlib.sha1(body).hexdigest()
+        response_headers = response.headers
+        new_meta = {
+            'url': url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'encoding': response.encoding or response.apparent_encoding or 'utf-8',
+            'digest': digest,
+            'size': len(body)
+        }
+        no_store = 'no-store' in response_headers.get('Cache-Control', '').lower()
+
+        if meta is not None and meta['digest'] == digest:
+            # سرور validator نمی‌فرستد ولی محتوا تغییر نکرده است
+            value = self._cached_value(key, meta, parse)
+            if value is not _MISSING:
+                with self._lock:
+                    self._stats['unchanged'] += 1
+                    if new_meta != meta:
+                        self._store(key, new_meta)
+                    else:
+                        self._touch(key)
+                return copy.deepcopy(value)
+
+        value = parse(body.decode(new_meta['encoding'], errors='replace'))
+        with self._lock:
+            self._stats['misses'] += 1
+            if no_store:
+                self._remove(key)
+            else:
+                self._store(key, new_meta, body)
+                self._parsed[key] = (digest, value)
+        return copy.deepcopy(value)
+
+    def invalidate(self, url=None):
+        """حذف یک آدرس یا کل کش"""
+        with self._lock:
+            self._load_index()
+            keys = list(self._entries) if url is None else [hashlib.sha1(url.encode('utf-8')).hexdigest()]
+            for key in keys:
+                self._remove(key)
+
+    def stats(self):
+        """تعداد پاسخ‌های 304، بدنه‌های تکراری، دریافت کامل و حذف‌های LRU"""
+        with self._lock:
+            self._load_index()
+            return dict(self._stats, entries=len(self._entries), bytes=self._size)
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache():
+    """کش HTTP مشترک برای کل پروسه (یا کش جداگانه cassette فعال)"""
+    global _default_cache
+    recording = cassette.active()
+    if recording is not None:
+        return recording.http_cache()
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = HttpCache()
+        return _default_cache
+
+def fetch(url, parse, **kwargs):
+    """میانبر برای ``get_default_cache().fetch(url, parse)``"""
+    return get_default_cache().fetch(url, parse, **kwargs)
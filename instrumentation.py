@@ -0,0 +1,140 @@
+from collections import deque
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# حداکثر تعداد spanهای نگه‌داشته‌شده در حافظه
+MAX_SPANS = 10000
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+_enabled = os.environ.get('GOLDTRADE_TRACE', '') not in ('', '0')
+_lock = threading.Lock()
+_spans = deque(maxlen=MAX_SPANS)
+_NOOP = contextlib.nullcontext()
+
+
+def configure_logging(level=None):
+    """تنظیم سطح لاگ برنامه‌های خط فرمان
+
+    اگر level داده نشود از متغیر محیطی GOLDTRADE_LOG_LEVEL خوانده می‌شود
+    (پیش‌فرض WARNING، یعنی پیام‌های debug هیچ هزینه‌ای ندارند).
+    """
+    level = level or os.environ.get('GOLDTRADE_LOG_LEVEL', 'WARNING')
+    logging.basicConfig(level=level.upper() if isinstance(level, str) else level, format=LOG_FORMAT)
+
+
+class _Span:
+    __slots__ = ('name', 'source', 'started_at', '_start')
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+
+    def __enter__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record = {
+            'name': self.name,
+            'source': self.source,
+            'started_at': self.started_at,
+            'duration_s': time.perf_counter() - self._start,
+            'error': exc_type.__name__ if exc_type else None,
+            'thread': threading.current_thread().name
+        }
+        with _lock:
+            _spans.append(record)
+        return False
+
+
+def span(name, source=None):
+    """زمان‌سنجی یک مرحله: ``with span('page_load', source='tradersarena'):``
+
+    وقتی instrumentation غیرفعال است یک context manager بدون هزینه برمی‌گرداند.
+    """
+    if not _enabled:
+        return _NOOP
+    return _Span(name, source)
+
+
+def timed(name, source=None):
+    """دکوراتور معادل span برای کل یک تابع"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    with _lock:
+        _spans.clear()
+
+
+def get_spans():
+    """همه spanهای ثبت‌شده به ترتیب پایان"""
+    with _lock:
+        return list(_spans)
+
+
+def _key(record):
+    return f"{record['name']}:{record['source']}" if record['source'] else record['name']
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summary():
+    """خلاصه آماری هر مرحله (و منبع): تعداد، مجموع، میانگین، p50، p95، بیشینه و خطاها"""
+    groups = {}
+    for record in get_spans():
+        groups.setdefault(_key(record), []).append(record)
+
+    result = {}
+    for key, records in sorted(groups.items()):
+        durations = sorted(record['duration_s'] for record in records)
+        result[key] = {
+            'count': len(durations),
+            'total_s': sum(durations),
+            'mean_s': sum(durations) / len(durations),
+            'p50_s': _percentile(durations, 0.5),
+            'p95_s': _percentile(durations, 0.95),
+            'max_s': durations[-1],
+            'errors': sum(1 for record in records if record['error'])
+        }
+    return result
+
+
+def export_json(path=None, include_spans=True):
+    """خروجی JSON از خلاصه و (به صورت اختیاری) همه spanها؛ اگر path داده شود در فایل نوشته می‌شود"""
+    report = {'summary': summary()}
+    if include_spans:
+        report['spans'] = get_spans()
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return text
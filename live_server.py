@@ -0,0 +1,285 @@
+"""انتشار زنده snapshotها به صورت Server-Sent Events
+
+هر snapshot جدید فقط یک بار با snapshot قبلی مقایسه و به یک delta فشرده
+(فقط مسیرهای تغییرکرده) تبدیل می‌شود و همان بایت‌ها برای همه بینندگان
+فرستاده می‌شود، پس تعداد بینندگان هزینه‌ای برای دریافت یا محاسبه ندارد.
+
+اجرا (خواندن از SnapshotStore که collector پر می‌کند):
+    python live_server.py [--host 0.0.0.0] [--port 8765] [--interval 0.5]
+
+یا داخل خود collector بدون فاصله polling:
+    python collector.py --live-port 8765 [--live-host 0.0.0.0]
+
+پیش‌فرض فقط 127.0.0.1 است؛ برای بینندگانی که داشبورد را از ماشین دیگری باز
+می‌کنند سرور باید روی 0.0.0.0 (یا آدرس شبکه) اجرا شود.
+
+پروتکل:
+    GET /events    جریان SSE: یک رویداد snapshot (کامل) و سپس رویدادهای delta
+    GET /snapshot  آخرین snapshot کامل به صورت JSON
+
+فرمت delta: {"seq": 12, "ts": ..., "set": {"prices/usd": 81300}, "unset": ["analysis/all_funds/X"]}
+
+از analysis فقط کلیدهای STREAMED_ANALYSIS_KEYS پخش می‌شوند.
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import logging
+import queue
+import socket
+import threading
+import time
+import instrumentation
+import snapshot_store
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+POLL_INTERVAL = 0.5          # فاصله بررسی store در حالت مستقل (ثانیه)
+HEARTBEAT_INTERVAL = 15      # فاصله پیام keep-alive برای اتصال‌های بی‌کار (ثانیه)
+SUBSCRIBER_QUEUE_SIZE = 64   # بیننده‌ای که این تعداد پیام عقب بیفتد دوباره snapshot کامل می‌گیرد
+
+PATH_SEPARATOR = '/'
+
+# بخش‌هایی از analysis که پخش می‌شوند (پنل زنده فقط همین‌ها را می‌خواند)؛
+# آمار market_stats و fund_stats در هر snapshot تغییر می‌کنند و delta را چند برابر می‌کنند
+STREAMED_ANALYSIS_KEYS = ('all_funds',)
+
+log = logging.getLogger(__name__)
+
+
+def flatten(value, prefix=''):
+    """تبدیل دیکشنری تو در تو به {مسیر: مقدار}؛ لیست‌ها مقدار نهایی حساب می‌شوند"""
+    if not isinstance(value, dict) or (prefix and not value):
+        return {prefix: value}
+    flat = {}
+    for key, item in value.items():
+        flat.update(flatten(item, f'{prefix}{PATH_SEPARATOR}{key}' if prefix else str(key)))
+    return flat
+
+
+_MISSING = object()
+
+
+def compute_delta(old_flat, new_flat):
+    """مسیرهای تغییرکرده یا حذف‌شده بین دو snapshot مسطح"""
+    changed = {path: value for path, value in new_flat.items() if old_flat.get(path, _MISSING) != value}
+    removed = [path for path in old_flat if path not in new_flat]
+    return changed, removed
+
+
+def streamed_analysis(analysis):
+    """بخش پخش‌شونده analysis (بدون آمار تاریخچه)"""
+    if not analysis:
+        return analysis
+    return {key: analysis[key] for key in STREAMED_ANALYSIS_KEYS if key in analysis}
+
+
+def _sse(event, seq, payload):
+    data = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    return f'id: {seq}\nevent: {event}\ndata: {data}\n\n'.encode('utf-8')
+
+
+class LiveHub:
+    """نگهداری آخرین snapshot و پخش deltaها برای همه مشترک‌ها"""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._snapshot = None
+        self._flat = {}
+        self._snapshot_message = None
+
+    def publish(self, prices, analysis, ts=None):
+        """ثبت snapshot جدید و ارسال delta آن
+
+        Returns:
+            delta ارسال‌شده، یا None اگر چیزی تغییر نکرده باشد
+        """
+        snapshot = {'ts': ts or time.time(), 'prices': prices, 'analysis': streamed_analysis(analysis)}
+        with instrumentation.span('live_publish'):
+            flat = flatten(snapshot)
+            with self._lock:
+                changed, removed = compute_delta(self._flat, flat)
+                if not changed and not removed:
+                    return None
+
+                self.seq += 1
+                delta = {'seq': self.seq, 'ts': snapshot['ts'], 'set': changed, 'unset': removed}
+                message = _sse('delta', self.seq, delta)
+                self._snapshot = snapshot
+                self._flat = flat
+                self._snapshot_message = None
+
+                for subscriber in self._subscribers:
+                    self._offer(subscriber, message)
+        return delta
+
+    def snapshot(self):
+        """آخرین snapshot کامل (یا None)"""
+        with self._lock:
+            return self._snapshot
+
+    def _full_message(self):
+        if self._snapshot_message is None:
+            self._snapshot_message = _sse('snapshot', self.seq, dict(self._snapshot, seq=self.seq))
+        return self._snapshot_message
+
+    def _offer(self, subscriber, message):
+        try:
+            subscriber.put_nowait(message)
+        except queue.Full:
+            # بیننده کند: پیام‌های عقب‌افتاده دور ریخته و snapshot کامل جایگزین می‌شود
+            while not subscriber.empty():
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    break
+            subscriber.put_nowait(self._full_message())
+
+    def subscribe(self):
+        """ثبت یک بیننده؛ اولین پیام صف، snapshot کامل فعلی است"""
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if self._snapshot is not None:
+                subscriber.put_nowait(self._full_message())
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+
+class _LiveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        log.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_headers(self, content_type, length=None):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Cache-Control', 'no-cache')
+        # داشبورد streamlit از origin دیگری وصل می‌شود
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if length is not None:
+            self.send_header('Content-Length', str(length))
+        self.end_headers()
+
+    def do_GET(self):
+        hub = self.server.hub
+        path = self.path.split('?', 1)[0]
+        if path == '/snapshot':
+            body = json.dumps(hub.snapshot(), ensure_ascii=False).encode('utf-8')
+            self._send_headers('application/json; charset=utf-8', len(body))
+            self.wfile.write(body)
+        elif path == '/events':
+            self._stream(hub)
+        else:
+            self.send_error(404)
+
+    def _stream(self, hub):
+        subscriber = hub.subscribe()
+        try:
+            self.close_connection = True
+            self._send_headers('text/event-stream; charset=utf-8')
+            self.wfile.write(b'retry: 2000\n\n')
+            self.wfile.flush()
+            while not self.server.stopping.is_set():
+                try:
+                    message = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    message = b': ping\n\n'
+                self.wfile.write(message)
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            hub.unsubscribe(subscriber)
+
+
+class LiveServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128   # اتصال همزمان بسیاری از بینندگان بعد از راه‌اندازی دوباره
+
+    def __init__(self, address, hub):
+        super().__init__(address, _LiveHandler)
+        self.hub = hub
+        self.stopping = threading.Event()
+
+    def stop(self):
+        """توقف سرور و بستن همه جریان‌های باز"""
+        self.stopping.set()
+        self.shutdown()
+        self.server_close()
+
+
+def public_url(host, port):
+    """آدرسی که مرورگر بینندگان برای اتصال به سرور استفاده می‌کند
+
+    برای آدرس‌های wildcard (0.0.0.0، ::) نام این ماشین برگردانده می‌شود، چون
+    EventSource داشبورد در مرورگر هر بیننده باز می‌شود، نه روی این ماشین.
+    """
+    if host in ('', '0.0.0.0', '::'):
+        host = socket.getfqdn()
+    elif ':' in host:
+        host = f'[{host}]'
+    return f'http://{host}:{port}'
+
+
+def start_server(hub, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """اجرای سرور SSE در یک thread پس‌زمینه
+
+    Returns:
+        LiveServer؛ با server.stop() متوقف می‌شود
+    """
+    server = LiveServer((host, port), hub)
+    threading.Thread(target=server.serve_forever, name='live-server', daemon=True).start()
+    return server
+
+
+def watch_store(hub, store, interval=POLL_INTERVAL, stop_event=None):
+    """انتشار هر snapshot جدید SnapshotStore (برای اجرای مستقل از collector)"""
+    stop_event = stop_event or threading.Event()
+    last_ts = None
+    while not stop_event.is_set():
+        try:
+            latest = store.get_latest()
+            if latest and latest[0] != last_ts:
+                last_ts, prices, analysis = latest
+                hub.publish(prices, analysis, ts=last_ts)
+        except Exception as e:
+            log.warning("Error reading latest snapshot: %s", e)
+        stop_event.wait(interval)
+
+
+def main():
+    import coin_price_calculator as cpc
+
+    parser = argparse.ArgumentParser(description="Stream snapshot deltas to dashboards over Server-Sent Events")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument('--db', default=snapshot_store.DEFAULT_DB_PATH, help="path of the snapshot database")
+    parser.add_argument('--interval', type=cpc.positive_number, default=POLL_INTERVAL, help="seconds between store checks")
+    args = parser.parse_args()
+
+    instrumentation.configure_logging()
+    hub = LiveHub()
+    server = start_server(hub, args.host, args.port)
+    print(f"Streaming snapshots on {public_url(args.host, args.port)}/events")
+    try:
+        watch_store(hub, snapshot_store.SnapshotStore(args.db), args.interval)
+    except KeyboardInterrupt:
+        print("Live server stopped")
+    finally:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
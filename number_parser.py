@@ -0,0 +1,180 @@
+import re
+import numpy as np
+
+# ضریب پسوندهای اختصاری (حروف کوچک هم پذیرفته می‌شوند)
+SUFFIXES = {
+    'K': 1e3,
+    'M': 1e6,
+    'B': 1e9
+}
+
+# جداکننده‌های هزارگان، فاصله‌ها و نویسه‌های نامرئی جهت متن که نادیده گرفته می‌شوند
+SEPARATORS = ',\u066c\u060c \t\n\u00a0\u202f\u200c\u200e\u200f'
+
+# تعداد متن‌هایی که parse_array در هر مرحله پردازش می‌کند (برای محدود کردن حافظه)
+CHUNK_SIZE = 65536
+
+_PERSIAN_DIGITS = '۰۱۲۳۴۵۶۷۸۹'
+_ARABIC_DIGITS = '٠١٢٣٤٥٦٧٨٩'
+_DECIMAL_POINTS = '.\u066b'     # نقطه و ممیز عربی
+_MINUS_SIGNS = '-\u2212'        # خط تیره و علامت منفی یونیکد
+_PERCENT_SIGNS = '%\u066a'      # درصد لاتین و فارسی (٪)
+
+# بیشترین تعداد رقمی که نسخه برداری دقیقاً مانند float() حساب می‌کند؛
+# مانتیس بزرگ‌تر از 2**53 در float دقیق نیست و به parse_number سپرده می‌شود
+_EXACT_DIGITS = 15
+
+# ---- نسخه تکی: ترجمه به ASCII و یک regex ----
+
+_TRANSLATION = str.maketrans({
+    **{digit: str(i) for i, digit in enumerate(_PERSIAN_DIGITS)},
+    **{digit: str(i) for i, digit in enumerate(_ARABIC_DIGITS)},
+    '\u066b': '.',
+    '\u2212': '-',
+    '\u066a': '%',
+    **dict.fromkeys(SEPARATORS)
+})
+_NUMBER_RE = re.compile(r'([+-]?)(\d+(?:\.\d*)?|\.\d+)([KMBkmb]?)%?', re.ASCII)
+_SUFFIX_SCALE = {**SUFFIXES, **{suffix.lower(): scale for suffix, scale in SUFFIXES.items()}, '': 1.0}
+
+
+def parse_number(text, default=None):
+    """تبدیل متن عددی سایت‌ها به float
+
+    ارقام فارسی/عربی، جداکننده هزارگان، پسوندهای K/M/B، علامت % (یا ٪) و اعداد منفی
+    را می‌پذیرد. برای متن خالی، '-' یا متن نامعتبر ``default`` برمی‌گردد.
+
+    مثال: '19.4 M' -> 19400000.0، '۱۲٬۳۴۵' -> 12345.0، '-2.5%' -> -2.5
+    """
+    if text is None:
+        return default
+    if not isinstance(text, str):
+        return float(text)
+
+    match = _NUMBER_RE.fullmatch(text.translate(_TRANSLATION))
+    if match is None:
+        return default
+    sign, digits, suffix = match.groups()
+    value = float(digits) * _SUFFIX_SCALE[suffix]
+    return -value if sign == '-' else value
+
+
+# ---- نسخه برداری: همان دستور زبان به صورت ماشین حالت روی کدهای یونیکد ----
+#
+# نویسه i ام همه متن‌ها با هم و با چند عمل نامپای پردازش می‌شود، پس تعداد
+# مراحل به طول متن‌ها بستگی دارد نه به تعداد آن‌ها.
+
+_SKIP, _DIGIT, _DOT, _SIGN, _SUFFIX, _PERCENT, _OTHER = range(7)
+_START, _SIGNED, _INT, _LEAD_DOT, _FRAC, _SCALED, _PCT, _ERROR = range(8)
+
+_CODE_LIMIT = max(map(ord, SEPARATORS + _MINUS_SIGNS + _DECIMAL_POINTS + _PERCENT_SIGNS + _PERSIAN_DIGITS)) + 1
+_CLASSES = np.full(_CODE_LIMIT + 1, _OTHER, dtype=np.intp)   # کدهای بزرگ‌تر همه _OTHER هستند
+_VALUES = np.zeros(_CODE_LIMIT + 1, dtype=float)
+
+for _digits in ('0123456789', _PERSIAN_DIGITS, _ARABIC_DIGITS):
+    for _i, _digit in enumerate(_digits):
+        _CLASSES[ord(_digit)] = _DIGIT
+        _VALUES[ord(_digit)] = _i
+for _char in '\0' + SEPARATORS:   # '\0' پرکننده انتهای متن‌های کوتاه‌تر است
+    _CLASSES[ord(_char)] = _SKIP
+for _char in _DECIMAL_POINTS:
+    _CLASSES[ord(_char)] = _DOT
+for _char in _MINUS_SIGNS + '+':
+    _CLASSES[ord(_char)] = _SIGN
+    _VALUES[ord(_char)] = 1 if _char == '+' else -1
+for _suffix, _scale in SUFFIXES.items():
+    for _char in (_suffix, _suffix.lower()):
+        _CLASSES[ord(_char)] = _SUFFIX
+        _VALUES[ord(_char)] = _scale
+for _char in _PERCENT_SIGNS:
+    _CLASSES[ord(_char)] = _PERCENT
+
+# جدول انتقال معادل _NUMBER_RE: [+-]? (digits [. digits?] | . digits) [KMB]? %?
+_TRANSITIONS = np.full((8, 7), _ERROR, dtype=np.intp)
+_TRANSITIONS[:, _SKIP] = np.arange(8)
+for _state, _class, _next in (
+    (_START, _SIGN, _SIGNED), (_START, _DIGIT, _INT), (_START, _DOT, _LEAD_DOT),
+    (_SIGNED, _DIGIT, _INT), (_SIGNED, _DOT, _LEAD_DOT),
+    (_INT, _DIGIT, _INT), (_INT, _DOT, _FRAC), (_INT, _SUFFIX, _SCALED), (_INT, _PERCENT, _PCT),
+    (_LEAD_DOT, _DIGIT, _FRAC),
+    (_FRAC, _DIGIT, _FRAC), (_FRAC, _SUFFIX, _SCALED), (_FRAC, _PERCENT, _PCT),
+    (_SCALED, _PERCENT, _PCT)
+):
+    _TRANSITIONS[_state, _class] = _next
+_TRANSITIONS = _TRANSITIONS.ravel()
+_ACCEPTING = np.isin(np.arange(8), [_INT, _FRAC, _SCALED, _PCT])
+
+
+def _parse_chunk(texts, default):
+    width = texts.dtype.itemsize // 4
+    codes = np.minimum(texts.view(np.uint32).reshape(len(texts), width), _CODE_LIMIT).T.copy()
+
+    state = np.full(len(texts), _START, dtype=np.intp)
+    mantissa = np.zeros(len(texts))
+    decimals = np.zeros(len(texts))
+    digits = np.zeros(len(texts), dtype=np.intp)
+    scale = np.ones(len(texts))
+    sign = np.ones(len(texts))
+    for column in codes:
+        classes = _CLASSES[column]
+        values = _VALUES[column]
+        state = _TRANSITIONS[state * 7 + classes]
+        digit = classes == _DIGIT
+        mantissa = np.where(digit, mantissa * 10 + values, mantissa)
+        decimals += digit & (state == _FRAC)
+        digits += digit
+        scale = np.where(classes == _SUFFIX, values, scale)
+        sign = np.where(classes == _SIGN, values, sign)
+
+    # مانند float(text): مانتیس صحیح (تا 15 رقم) تقسیم بر توان 10 دقیقاً گرد می‌شود
+    with np.errstate(over='ignore', invalid='ignore'):
+        result = np.where(_ACCEPTING[state], mantissa / 10.0 ** decimals * scale * sign, default)
+
+    # ارقام بیشتر در مانتیس float گرد شده‌اند: همان متن‌ها با parse_number
+    inexact = np.flatnonzero(_ACCEPTING[state] & (digits > _EXACT_DIGITS))
+    if len(inexact):
+        result[inexact] = [parse_number(str(text), default) for text in texts[inexact]]
+    return result
+
+
+def parse_array(texts, default=np.nan):
+    """نسخه برداری parse_number برای آرایه‌ای از متن‌ها (بیش از یک میلیون مقدار در ثانیه)
+
+    نتیجه دقیقاً برابر parse_number است؛ متن‌هایی با بیش از 15 رقم (که در
+    مانتیس float دقیق نمی‌مانند) تک‌تک با parse_number تبدیل می‌شوند.
+
+    Returns:
+        آرایه float با همان طول؛ مقادیر نامعتبر برابر ``default``
+    """
+    texts = np.asarray(texts, dtype=str).ravel()
+    if not len(texts):
+        return np.empty(0)
+    if texts.dtype.itemsize == 0:
+        return np.full(len(texts), default, dtype=float)
+    return np.concatenate([
+        _parse_chunk(texts[begin:begin + CHUNK_SIZE], default)
+        for begin in range(0, len(texts), CHUNK_SIZE)
+    ])
+
+
+def parse_series(values, default=np.nan):
+    """نسخه برداری parse_number برای یک pandas Series (یا هر iterable)
+
+    Returns:
+        Series از نوع float64 با همان index؛ مقادیر نامعتبر برابر ``default``
+    """
+    import pandas as pd
+
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+
+    if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+        result = parse_array(series.fillna('').to_numpy(dtype=str), default)
+    else:
+        # ترکیب متن و عدد: هر مقدار جداگانه
+        result = np.fromiter(
+            (default if pd.isna(value) else parse_number(value, default) for value in series),
+            dtype=float, count=len(series)
+        )
+    return pd.Series(result, index=series.index, dtype=float, name=series.name)
@@ -0,0 +1,71 @@
+"""رکوردهای فشرده قیمت‌ها و صندوق‌ها و خروجی ستونی آن‌ها
+
+رکوردها namedtuple هستند (بدون دیکشنری جداگانه برای هر نمونه) و مانند
+دیکشنری‌های قبلی با نام فیلد هم خوانده می‌شوند (``quote['bubble']``)، پس
+کدهایی که روی دیکشنری کار می‌کردند بدون تغییر روی رکوردها هم کار می‌کنند.
+خروجی JSON (snapshot، SSE، هشدارها) همچنان دیکشنری است و فقط یک بار در
+انتهای تحلیل از رکوردها ساخته می‌شود.
+"""
+from collections import namedtuple
+
+
+class _FieldAccess:
+    """خواندن فیلد با نام (record['field']، 'field' in record) علاوه بر اندیس"""
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        # مانند دیکشنری: بررسی نام فیلد، نه مقدار
+        return key in self._fields if isinstance(key, str) else super().__contains__(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self._fields else default
+
+
+class FundQuote(_FieldAccess, namedtuple('FundQuote', ['name', 'price', 'gold_value', 'bubble', 'volume'])):
+    """یک صندوق طلا: قیمت و NAV (gold_value) به ریال، حباب به درصد و حجم معاملات"""
+
+    __slots__ = ()
+
+
+class LocalPrices(_FieldAccess, namedtuple('LocalPrices', [
+    'gold_per_gram', 'usd', 'full_coin', 'half_coin', 'quarter_coin', 'global_gold'
+])):
+    """قیمت‌های bon-bast: طلای 18 عیار، دلار و سکه‌ها به تومان و انس جهانی به دلار"""
+
+    __slots__ = ()
+
+
+def funds_json(funds):
+    """{نماد: FundQuote} به شکل all_funds خروجی get_analysis (قابل تبدیل به JSON)"""
+    return {symbol: quote._asdict() for symbol, quote in funds.items()}
+
+
+def funds_frame(funds):
+    """صندوق‌ها به صورت یک DataFrame ستونی با index نماد
+
+    Args:
+        funds: {نماد: FundQuote} یا all_funds خروجی get_analysis (دیکشنری)
+
+    هر ستون یک بار و مستقیم ساخته می‌شود، بدون ساختن دیکشنری برای هر سطر.
+    """
+    import pandas as pd
+
+    values = list(funds.values())
+    if values and isinstance(values[0], FundQuote):
+        columns = zip(*values)
+    else:
+        columns = ([data[field] for data in values] for field in FundQuote._fields)
+    frame = pd.DataFrame(
+        {field: list(column) for field, column in zip(FundQuote._fields, columns)},
+        index=pd.Index(list(funds), name='symbol')
+    )
+    return frame.reindex(columns=FundQuote._fields) if not values else frame
@@ -0,0 +1,199 @@
+from collections import namedtuple
+from datetime import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'snapshots.db')
+
+# هر سطر: قیمت یک ابزار در یک لحظه
+Quote = namedtuple('Quote', ['ts', 'instrument', 'kind', 'price', 'nav', 'bubble', 'volume'])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    ts REAL NOT NULL,
+    instrument TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    price REAL,
+    nav REAL,
+    bubble REAL,
+    volume REAL
+);
+CREATE INDEX IF NOT EXISTS quotes_instrument_ts ON quotes (instrument, ts);
+CREATE INDEX IF NOT EXISTS quotes_ts ON quotes (ts);
+CREATE TABLE IF NOT EXISTS latest (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    ts REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+"""
+
+# ابزارهای خروجی get_prices: (نام ابزار، نوع، کلید قیمت)
+_PRICE_INSTRUMENTS = [
+    ('global_gold', 'gold', 'global_gold'),
+    ('usd', 'fx', 'usd'),
+    ('gold_18k', 'gold', 'gold_per_gram'),
+    ('full_coin', 'coin', 'full_coin'),
+    ('half_coin', 'coin', 'half_coin'),
+    ('quarter_coin', 'coin', 'quarter_coin'),
+    ('paxg', 'digital', 'paxg'),
+    ('xaut', 'digital', 'xaut')
+]
+
+
+def _to_timestamp(value):
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    raise TypeError(f"Unsupported timestamp: {value!r}")
+
+
+def price_rows(prices, ts):
+    """تبدیل خروجی get_prices به سطرهای Quote"""
+    rows = []
+    if not prices:
+        return rows
+
+    bubbles = dict(prices.get('bubbles') or {})
+    bubbles['gold_18k'] = prices.get('gold_price_difference')
+    global_gold = prices.get('global_gold')
+    for token in ('paxg', 'xaut'):
+        if prices.get(token) and global_gold:
+            bubbles[token] = ((prices[token] - global_gold) / global_gold) * 100
+
+    for instrument, kind, key in _PRICE_INSTRUMENTS:
+        if key in prices:
+            rows.append(Quote(ts, instrument, kind, prices[key], None, bubbles.get(instrument), None))
+    return rows
+
+
+def analysis_rows(analysis, ts):
+    """تبدیل خروجی get_analysis به سطرهای Quote (یک سطر برای هر صندوق)"""
+    if not analysis or not analysis.get('all_funds'):
+        return []
+    return [
+        Quote(ts, symbol, 'etf', data['price'], data['gold_value'], data['bubble'], data['volume'])
+        for symbol, data in analysis['all_funds'].items()
+    ]
+
+
+class SnapshotStore:
+    """ذخیره‌سازی افزایشی (append-only) تاریخچه قیمت‌ها در SQLite با حالت WAL
+
+    هر snapshot با یک timestamp ذخیره می‌شود و پرس‌وجوی بازه‌ای بر اساس
+    ابزار و زمان از روی index انجام می‌شود. نتایج به صورت iterator برگردانده
+    می‌شوند تا برای میلیون‌ها سطر کل داده در حافظه بارگذاری نشود.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, prices=None, analysis=None, ts=None):
+        """ذخیره یک snapshot از get_prices و/یا get_analysis؛ تعداد سطرهای ذخیره‌شده را برمی‌گرداند"""
+        ts = _to_timestamp(ts) or time.time()
+        rows = price_rows(prices, ts) + analysis_rows(analysis, ts)
+        return self.append_rows(rows)
+
+    def append_rows(self, rows):
+        rows = list(rows)
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT INTO quotes VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def _select(self, sql, params, chunk_size):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                chunk = cursor.fetchmany(chunk_size)
+            if not chunk:
+                return
+            for row in chunk:
+                yield Quote(*row)
+
+    def query(self, instrument=None, start=None, end=None, kind=None, chunk_size=10000):
+        """پرس‌وجوی بازه‌ای به ترتیب زمان
+
+        Args:
+            instrument: نام ابزار یا لیستی از نام‌ها (None یعنی همه)
+            start, end: بازه زمانی (timestamp یا datetime)؛ start شامل و end غیرشامل
+            kind: فیلتر نوع ابزار (gold، fx، coin، digital، etf)
+
+        Returns:
+            iterator از Quote
+        """
+        clauses = []
+        params = []
+        if instrument is not None:
+            instruments = [instrument] if isinstance(instrument, str) else list(instrument)
+            clauses.append(f"instrument IN ({', '.join('?' * len(instruments))})")
+            params.extend(instruments)
+        if kind is not None:
+            clauses.append('kind = ?')
+            params.append(kind)
+        if start is not None:
+            clauses.append('ts >= ?')
+            params.append(_to_timestamp(start))
+        if end is not None:
+            clauses.append('ts < ?')
+            params.append(_to_timestamp(end))
+
+        sql = 'SELECT * FROM quotes'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY ts'
+        return self._select(sql, params, chunk_size)
+
+    def query_frame(self, instrument=None, start=None, end=None, kind=None):
+        """مانند query ولی خروجی به صورت DataFrame پانداس"""
+        import pandas as pd
+        return pd.DataFrame.from_records(
+            self.query(instrument, start, end, kind), columns=Quote._fields
+        )
+
+    def latest(self, instrument):
+        """آخرین سطر ذخیره‌شده یک ابزار"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM quotes WHERE instrument = ? ORDER BY ts DESC LIMIT 1', (instrument,)
+            ).fetchone()
+        return Quote(*row) if row else None
+
+    def instruments(self):
+        """لیست همه ابزارهای ذخیره‌شده"""
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT DISTINCT instrument FROM quotes ORDER BY instrument')]
+
+    def publish_latest(self, prices, analysis, ts=None):
+        """جایگزینی آخرین snapshot کامل (prices و analysis) برای خوانندگان مثل داشبورد"""
+        ts = _to_timestamp(ts) or time.time()
+        payload = json.dumps({'prices': prices, 'analysis': analysis}, ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO latest (id, ts, payload) VALUES (1, ?, ?)', (ts, payload))
+        return ts
+
+    def get_latest(self):
+        """آخرین snapshot منتشرشده به صورت (ts, prices, analysis)؛ اگر وجود نداشته باشد None"""
+        with self._lock:
+            row = self._conn.execute('SELECT ts, payload FROM latest WHERE id = 1').fetchone()
+        if not row:
+            return None
+        data = json.loads(row[1])
+        return row[0], data['prices'], data['analysis']
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,151 @@
+from concurrent.futures import Future
+import threading
+import time
+
+# مدت تازه ماندن داده هر منبع (ثانیه)
+SOURCE_TTLS = {
+    'paxg': 30,
+    'xaut': 30,
+    'bonbast': 60,
+    'tsetmc': 120,
+    'tradersarena': 300,
+    'snapshot': 10
+}
+DEFAULT_TTL = 300
+
+# حداکثر عمر داده‌ای که هنوز (به صورت stale) برگردانده می‌شود (ثانیه)؛
+# بعد از آن خواننده منتظر دریافت داده تازه می‌ماند
+SOURCE_MAX_STALENESS = {
+    'paxg': 300,
+    'xaut': 300,
+    'bonbast': 600,
+    'tsetmc': 900,
+    'tradersarena': 1800,
+    'snapshot': 300
+}
+DEFAULT_MAX_STALENESS = 1800
+
+
+class _Entry:
+    __slots__ = ('value', 'loaded_at', 'inflight')
+
+    def __init__(self):
+        self.value = None
+        self.loaded_at = None
+        self.inflight = None
+
+
+class SourceCache:
+    """کش stale-while-revalidate مستقل از Streamlit با TTL جداگانه برای هر منبع
+
+    - داده تازه‌تر از TTL مستقیماً برگردانده می‌شود (hit).
+    - داده قدیمی‌تر از TTL ولی جوان‌تر از حداکثر عمر، فوراً برگردانده می‌شود و
+      فقط یک به‌روزرسانی در پس‌زمینه برای آن کلید اجرا می‌شود (stale).
+    - اگر داده‌ای نباشد یا از حداکثر عمر گذشته باشد، خواننده منتظر دریافت
+      می‌ماند (miss)؛ خواننده‌های همزمان منتظر همان یک دریافت می‌مانند.
+    """
+
+    def __init__(self, ttls=None, max_staleness=None):
+        self.ttls = dict(SOURCE_TTLS, **(ttls or {}))
+        self.max_staleness = dict(SOURCE_MAX_STALENESS, **(max_staleness or {}))
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._stats = {}
+
+    def _count(self, source, event):
+        counters = self._stats.setdefault(source, {
+            'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'errors': 0
+        })
+        counters[event] += 1
+
+    def _run_loader(self, key, source, entry, future, loader):
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                entry.inflight = None
+                self._count(source, 'errors')
+            future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+
+        with self._lock:
+            entry.value = value
+            entry.loaded_at = time.monotonic()
+            entry.inflight = None
+            self._count(source, 'refreshes')
+        future.set_result(value)
+
+    def get(self, key, loader, source=None):
+        """خواندن کلید از کش؛ ``loader`` بدون آرگومان داده تازه را برمی‌گرداند
+
+        Args:
+            key: کلید کش (مثلاً 'paxg' یا 'tsetmc:طلا')
+            loader: تابع دریافت داده
+            source: نام منبع برای TTL و آمار؛ پیش‌فرض خود key
+        """
+        source = source or key
+        ttl = self.ttls.get(source, DEFAULT_TTL)
+        max_stale = self.max_staleness.get(source, DEFAULT_MAX_STALENESS)
+
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry())
+            age = None if entry.loaded_at is None else time.monotonic() - entry.loaded_at
+
+            if age is not None and age <= ttl:
+                self._count(source, 'hits')
+                return entry.value
+
+            start_refresh = entry.inflight is None
+            if start_refresh:
+                entry.inflight = Future()
+            future = entry.inflight
+
+            serve_stale = age is not None and age <= max_stale
+            self._count(source, 'stale' if serve_stale else 'misses')
+
+        if serve_stale:
+            if start_refresh:
+                threading.Thread(
+                    target=self._run_loader,
+                    args=(key, source, entry, future, loader),
+                    name=f'cache-refresh-{key}',
+                    daemon=True
+                ).start()
+            return entry.value
+
+        if start_refresh:
+            self._run_loader(key, source, entry, future, loader)
+        return future.result()
+
+    def invalidate(self, key=None):
+        """حذف یک کلید یا کل کش"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """آمار hit/miss/stale/refresh/error برای هر منبع و مجموع آن‌ها"""
+        with self._lock:
+            per_source = {source: dict(counters) for source, counters in self._stats.items()}
+
+        total = {'hits': 0, 'misses': 0, 'stale': 0, 'refreshes': 0, 'errors': 0}
+        for counters in per_source.values():
+            for name, value in counters.items():
+                total[name] += value
+        return {'sources': per_source, 'total': total}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_default_cache():
+    """کش مشترک برای کل پروسه"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = SourceCache()
+        return _default_cache
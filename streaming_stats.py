@@ -0,0 +1,209 @@
+from collections import deque
+import math
+import time
+
+# پنجره‌های زمانی و نیمه‌عمر EWMA (ثانیه)
+WINDOWS = {
+    '1h': 3600,
+    '1d': 86400,
+    '1w': 604800
+}
+EWMA_HALFLIVES = {
+    '1h': 3600,
+    '1d': 86400
+}
+
+FIELDS = ('bubble', 'volume')
+
+
+class Welford:
+    """میانگین و واریانس افزایشی (الگوریتم Welford) با به‌روزرسانی O(1)"""
+
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """واریانس جامعه (مانند std_bubble قبلی)"""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class RollingWindow:
+    """میانگین و انحراف معیار داده‌های یک بازه زمانی لغزان
+
+    هر مقدار یک بار اضافه و یک بار حذف می‌شود، پس هزینه هر به‌روزرسانی
+    به طور سرشکن O(1) است.
+    """
+
+    __slots__ = ('window', '_items', '_sum', '_sumsq')
+
+    def __init__(self, window):
+        self.window = window
+        self._items = deque()
+        self._sum = 0.0
+        self._sumsq = 0.0
+
+    def expire(self, now):
+        while self._items and now - self._items[0][0] > self.window:
+            _, old = self._items.popleft()
+            self._sum -= old
+            self._sumsq -= old * old
+        if not self._items:
+            # جلوگیری از انباشت خطای ممیز شناور
+            self._sum = 0.0
+            self._sumsq = 0.0
+
+    def update(self, ts, value):
+        self._items.append((ts, value))
+        self._sum += value
+        self._sumsq += value * value
+        self.expire(ts)
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    @property
+    def mean(self):
+        return self._sum / len(self._items) if self._items else None
+
+    @property
+    def std(self):
+        if not self._items:
+            return None
+        mean = self._sum / len(self._items)
+        return math.sqrt(max(0.0, self._sumsq / len(self._items) - mean * mean))
+
+
+class EWMA:
+    """میانگین متحرک نمایی با نیمه‌عمر زمانی (برای snapshotهای با فاصله نامنظم)"""
+
+    __slots__ = ('halflife', 'value', '_last_ts')
+
+    def __init__(self, halflife):
+        self.halflife = halflife
+        self.value = None
+        self._last_ts = None
+
+    def update(self, ts, value):
+        if self.value is None:
+            self.value = value
+        else:
+            alpha = 1 - math.exp(-math.log(2) * max(0.0, ts - self._last_ts) / self.halflife)
+            self.value += alpha * (value - self.value)
+        self._last_ts = ts
+
+
+class SeriesStats:
+    """همه آمارهای یک سری (مثلاً حباب یک صندوق)"""
+
+    __slots__ = ('total', 'windows', 'ewmas')
+
+    def __init__(self):
+        self.total = Welford()
+        self.windows = {label: RollingWindow(seconds) for label, seconds in WINDOWS.items()}
+        self.ewmas = {label: EWMA(halflife) for label, halflife in EWMA_HALFLIVES.items()}
+
+    def update(self, ts, value):
+        self.total.update(value)
+        for window in self.windows.values():
+            window.update(ts, value)
+        for ewma in self.ewmas.values():
+            ewma.update(ts, value)
+
+    def summary(self, now=None):
+        result = {
+            'count': self.total.count,
+            'mean': self.total.mean if self.total.count else None,
+            'std': self.total.std if self.total.count else None
+        }
+        for label, window in self.windows.items():
+            if now is not None:
+                window.expire(now)
+            result[label] = {'count': window.count, 'mean': window.mean, 'std': window.std}
+        for label, ewma in self.ewmas.items():
+            result[f'ewma_{label}'] = ewma.value
+        return result
+
+
+class MarketStatistics:
+    """آمار افزایشی حباب و حجم معاملات برای هر صندوق و کل بازار
+
+    هر snapshot جدید با هزینه O(1) برای هر صندوق به آمارها اضافه می‌شود و
+    نیازی به مرور دوباره تاریخچه نیست. برای کل بازار میانگین حباب و میانگین
+    حجم صندوق‌ها در هر snapshot به عنوان یک نمونه ثبت می‌شود.
+    """
+
+    def __init__(self):
+        self.funds = {}
+        self.market = {field: SeriesStats() for field in FIELDS}
+        self.last_ts = None
+        self._last_funds = None
+
+    def update(self, funds, ts=None):
+        """افزودن یک snapshot (دیکشنری نماد -> FundQuote یا {'bubble', 'volume', ...})
+
+        Returns:
+            False اگر snapshot تکراری یا خالی باشد و ثبت نشود
+        """
+        if not funds or funds == self._last_funds:
+            return False
+        ts = ts or time.time()
+
+        market_sums = dict.fromkeys(FIELDS, 0.0)
+        for symbol, data in funds.items():
+            series = self.funds.get(symbol)
+            if series is None:
+                series = self.funds[symbol] = {field: SeriesStats() for field in FIELDS}
+            for field in FIELDS:
+                series[field].update(ts, data[field])
+                market_sums[field] += data[field]
+
+        for field in FIELDS:
+            self.market[field].update(ts, market_sums[field] / len(funds))
+
+        self.last_ts = ts
+        # رکوردهای FundQuote تغییرناپذیرند و کپی نمی‌شوند
+        self._last_funds = {
+            symbol: data if isinstance(data, tuple) else dict(data) for symbol, data in funds.items()
+        }
+        return True
+
+    def warm_up(self, store, now=None):
+        """بارگذاری یک‌باره آخرین هفته تاریخچه از SnapshotStore (فقط هنگام شروع)"""
+        now = now or time.time()
+        current_ts = None
+        current = {}
+        for quote in store.query(kind='etf', start=now - max(WINDOWS.values()), end=now):
+            if quote.ts != current_ts and current:
+                self.update(current, current_ts)
+                current = {}
+            current_ts = quote.ts
+            current[quote.instrument] = {'bubble': quote.bubble or 0.0, 'volume': quote.volume or 0.0}
+        if current:
+            self.update(current, current_ts)
+
+    def summary(self, now=None):
+        """آمار بازار و هر صندوق برای افزودن به market_stats"""
+        now = now or self.last_ts
+        return {
+            'market': {field: stats.summary(now) for field, stats in self.market.items()},
+            'funds': {
+                symbol: {field: stats.summary(now) for field, stats in series.items()}
+                for symbol, series in self.funds.items()
+            }
+        }
@@ -0,0 +1,61 @@
+import alerts
+import live_server
+
+PATH = 'prices/usd'
+
+
+def engine(**kwargs):
+    return alerts.AlertEngine([alerts.Threshold(PATH, '>', 100, **kwargs)])
+
+
+def test_debounce_fires_when_value_holds_steady():
+    rules = engine(debounce=2)
+    assert rules.evaluate_delta({PATH: 110}, 1) == []
+    # مقدار تغییر نکرده است ولی شرط هنوز برقرار است
+    fired = rules.evaluate_delta({}, 2)
+    assert [alert.value for alert in fired] == [110]
+    assert rules.evaluate_delta({}, 3) == []
+
+
+def test_debounce_holds_steady_through_snapshots():
+    rules = engine(debounce=3)
+    prices = {'usd': 110}
+    fired = [rules.evaluate(prices, None, ts) for ts in range(1, 5)]
+    assert [len(alerts_) for alerts_ in fired] == [0, 0, 1, 0]
+
+
+def test_debounce_holds_steady_through_hub_deltas():
+    rules = engine(debounce=2)
+    hub = live_server.LiveHub()
+    fired = []
+    for ts in (1, 2):
+        delta = hub.publish({'usd': 110}, None, ts=1)
+        fired += rules.evaluate_delta(delta['set'] if delta else {}, ts)
+    assert len(fired) == 1
+
+
+def test_debounce_resets_when_condition_clears():
+    rules = engine(debounce=2)
+    assert rules.evaluate_delta({PATH: 110}, 1) == []
+    assert rules.evaluate_delta({PATH: 90}, 2) == []
+    assert rules.evaluate_delta({}, 3) == []
+    assert rules.evaluate_delta({PATH: 110}, 4) == []
+    assert len(rules.evaluate_delta({}, 5)) == 1
+
+
+def test_cooldown_fires_after_it_expires_while_holding():
+    rules = engine(cooldown=10, hysteresis=5)
+    assert len(rules.evaluate_delta({PATH: 110}, 0)) == 1
+    assert rules.evaluate_delta({PATH: 90}, 1) == []
+    assert rules.evaluate_delta({PATH: 110}, 2) == []
+    assert rules.evaluate_delta({}, 5) == []
+    assert len(rules.evaluate_delta({}, 12)) == 1
+
+
+def test_hysteresis_and_edge_trigger():
+    rules = engine(hysteresis=5)
+    assert len(rules.evaluate_delta({PATH: 110}, 1)) == 1
+    assert rules.evaluate_delta({PATH: 97}, 2) == []    # هنوز در محدوده hysteresis
+    assert rules.evaluate_delta({PATH: 110}, 3) == []
+    assert rules.evaluate_delta({PATH: 90}, 4) == []
+    assert len(rules.evaluate_delta({PATH: 110}, 5)) == 1
@@ -0,0 +1,35 @@
+from pathlib import Path
+
+import pytest
+
+import cassette
+import etf_analyzer
+
+FIXTURES = Path(__file__).resolve().parent.parent / 'benchmarks' / 'fixtures'
+MARKET_URL = 'https://tradersarena.ir/industries/68f'
+
+
+@pytest.mark.parametrize('xpath, css', [
+    (".//tbody//tr[not(@id='minrow') and not(@id='maxrow')]", 'tbody tr:not([id="minrow"]):not([id="maxrow"])'),
+    ('./td', ':scope > td'),
+    ('//div[@class]/span', 'div[class] > span'),
+    ("//a[contains(@href, '68f')]", 'a[href*="68f"]'),
+])
+def test_xpath_to_css(xpath, css):
+    assert cassette._xpath_to_css(xpath) == css
+
+
+@pytest.mark.parametrize('xpath', ['.//tr[position()=1]', '//tr/..', 'count(//tr)'])
+def test_unsupported_xpath_is_rejected(xpath):
+    with pytest.raises(cassette.InvalidSelectorError):
+        cassette._xpath_to_css(xpath)
+
+
+def test_legacy_market_rows_replay(tmp_path):
+    html = (FIXTURES / 'tradersarena_industries.html').read_text(encoding='utf-8')
+    cassette.Cassette(str(tmp_path), 'record').save_page(MARKET_URL, html, 0)
+    with cassette.use(str(tmp_path)):
+        analyzer = etf_analyzer.GoldETFAnalyzer(block_resources=False)
+        legacy = analyzer.get_market_data(use_page_source=False)
+        fast = analyzer.get_market_data(use_page_source=True)
+    assert legacy and legacy == fast
@@ -0,0 +1,82 @@
+import threading
+import time
+
+import http_cache
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b'', headers=None):
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+        self.encoding = 'utf-8'
+        self.apparent_encoding = 'utf-8'
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    """پاسخ 304 برای ETag تکراری، در غیر این صورت بدنه کامل"""
+
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requests = 0
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests += 1
+        etag = f'"{len(self.bodies[url])}"'
+        if (headers or {}).get('If-None-Match') == etag:
+            return FakeResponse(304)
+        return FakeResponse(200, self.bodies[url], {'ETag': etag})
+
+
+def test_not_modified_reuses_parse(tmp_path):
+    session = FakeSession({'http://a': b'{"x": 1}'})
+    cache = http_cache.HttpCache(str(tmp_path))
+    parses = []
+
+    def parse(text):
+        parses.append(text)
+        return {'text': text}
+
+    first = cache.fetch('http://a', parse, session=session)
+    second = cache.fetch('http://a', parse, session=session)
+    assert first == second == {'text': '{"x": 1}'}
+    assert len(parses) == 1 and session.requests == 2
+    assert cache.stats()['not_modified'] == 1
+
+    # بعد از اجرای دوباره برنامه: بدنه از دیسک خوانده و یک بار پارس می‌شود
+    reopened = http_cache.HttpCache(str(tmp_path))
+    assert reopened.fetch('http://a', parse, session=session) == first
+    assert len(parses) == 2
+
+
+def test_parses_of_different_urls_run_concurrently(tmp_path):
+    urls = [f'http://source/{i}' for i in range(4)]
+    session = FakeSession({url: url.encode() for url in urls})
+    for url in urls:
+        http_cache.HttpCache(str(tmp_path)).fetch(url, str, session=session)
+
+    # کش تازه روی همان پوشه: هر پاسخ 304 است و بدنه از دیسک دوباره پارس می‌شود
+    cache = http_cache.HttpCache(str(tmp_path))
+    running = []
+    overlap = threading.Event()
+
+    def slow_parse(text):
+        running.append(text)
+        if len(running) > 1:
+            overlap.set()
+        overlap.wait(1)
+        return text
+
+    threads = [threading.Thread(target=cache.fetch, args=(url, slow_parse), kwargs={'session': session}) for url in urls]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert overlap.is_set()
+    assert time.monotonic() - started < 1
+    assert cache.stats()['not_modified'] == len(urls)
@@ -0,0 +1,27 @@
+import live_server
+
+
+def analysis(price, stats_count):
+    return {
+        'all_funds': {'طلا': {'price': price, 'bubble': 1.5}},
+        'lowest_bubble': ('طلا', {'price': price, 'bubble': 1.5}),
+        'market_stats': {'avg_bubble': 1.5, 'history': {'1h': {'count': stats_count}}},
+        'fund_stats': {'طلا': {'1h': {'count': stats_count}}}
+    }
+
+
+def test_delta_only_streams_prices_and_funds():
+    hub = live_server.LiveHub()
+    first = hub.publish({'usd': 81300}, analysis(100, 1), ts=1)
+    assert all(path == 'ts' or path.startswith(('prices/', 'analysis/all_funds/')) for path in first['set'])
+
+    delta = hub.publish({'usd': 81300}, analysis(110, 2), ts=2)
+    assert delta['set'] == {'ts': 2, 'analysis/all_funds/طلا/price': 110}
+    assert delta['unset'] == []
+
+
+def test_stats_only_change_publishes_nothing():
+    hub = live_server.LiveHub()
+    hub.publish({'usd': 81300}, analysis(100, 1), ts=1)
+    assert hub.publish({'usd': 81300}, analysis(100, 2), ts=1) is None
+    assert set(hub.snapshot()['analysis']) == {'all_funds'}
@@ -0,0 +1,127 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import number_parser
+
+# (متن، مقدار مورد انتظار)؛ None یعنی متن نامعتبر
+CASES = [
+    # ارقام لاتین، فارسی و عربی
+    ('42', 42.0),
+    ('۴۲', 42.0),
+    ('٤٢', 42.0),
+    ('۱۲٫۵', 12.5),
+    ('3.75', 3.75),
+    ('.5', 0.5),
+    ('7.', 7.0),
+    # جداکننده‌های هزارگان، فاصله‌ها و نویسه‌های جهت متن
+    ('1,234,567', 1234567.0),
+    ('۱۲٬۳۴۵', 12345.0),
+    ('۱۲،۳۴۵', 12345.0),
+    ('1 234', 1234.0),
+    ('‏39,410‎', 39410.0),
+    ('1 000', 1000.0),
+    # پسوندهای K/M/B (کوچک و بزرگ)
+    ('19.4 M', 19400000.0),
+    ('980.3 K', 980300.0),
+    ('2.15 B', 2150000000.0),
+    ('1.5k', 1500.0),
+    ('۳ M', 3000000.0),
+    # درصد لاتین و فارسی
+    ('-2.5%', -2.5),
+    ('8.43%', 8.43),
+    ('۱۲٫۵٪', 12.5),
+    ('-۱٫۳۶٪', -1.36),
+    ('1.2 K%', 1200.0),
+    # علامت‌ها
+    ('-1,200', -1200.0),
+    ('−3.5', -3.5),
+    ('+7', 7.0),
+    # نامعتبر
+    ('-', None),
+    ('', None),
+    ('   ', None),
+    ('abc', None),
+    ('1.2.3', None),
+    ('12 MB', None),
+    ('%5', None),
+    ('--5', None),
+    ('5-', None),
+    ('K', None),
+    ('1e5', None),
+]
+
+# بیش از 15 رقم: مانتیس در float دقیق نمی‌ماند و نتیجه باید همان float() باشد
+LONG_NUMBERS = [
+    '12345678901234567891',
+    '123456789.123456789',
+    '9007199254740993',
+    '-98765432109876543.21',
+    '0.12345678901234567890123',
+]
+
+
+@pytest.mark.parametrize('text, expected', CASES)
+def test_parse_number(text, expected):
+    assert number_parser.parse_number(text) == expected
+
+
+@pytest.mark.parametrize('text, expected', CASES)
+def test_parse_array_matches_expected(text, expected):
+    result = number_parser.parse_array([text])[0]
+    if expected is None:
+        assert math.isnan(result)
+    else:
+        assert result == expected
+
+
+def test_default_for_invalid_input():
+    assert number_parser.parse_number('-', 0) == 0
+    assert number_parser.parse_number(None, -1) == -1
+    assert number_parser.parse_array(['-', 'x'], default=0).tolist() == [0.0, 0.0]
+
+
+def test_non_string_input():
+    assert number_parser.parse_number(5) == 5.0
+    assert number_parser.parse_number(2.5) == 2.5
+
+
+@pytest.mark.parametrize('text', LONG_NUMBERS)
+def test_long_digit_runs_match_float(text):
+    assert number_parser.parse_number(text) == float(text)
+    assert number_parser.parse_array([text, '1'])[0] == float(text)
+
+
+def test_long_digit_runs_with_separators_and_suffix():
+    text = '۱۲٬۳۴۵٬۶۷۸٬۹۰۱٬۲۳۴٬۵۶۷٫۸۹ K'
+    expected = float('12345678901234567.89') * 1e3
+    assert number_parser.parse_number(text) == expected
+    assert number_parser.parse_array([text])[0] == expected
+
+
+def test_parse_array_chunks(monkeypatch):
+    monkeypatch.setattr(number_parser, 'CHUNK_SIZE', 3)
+    texts = [text for text, _ in CASES]
+    expected = np.array([np.nan if value is None else value for _, value in CASES])
+    np.testing.assert_array_equal(number_parser.parse_array(texts), expected)
+
+
+def test_parse_array_empty():
+    assert number_parser.parse_array([]).shape == (0,)
+    assert np.isnan(number_parser.parse_array(['', ''])).all()
+
+
+def test_parse_series_keeps_index_and_handles_mixed_values():
+    series = pd.Series(['1.5 K', None, '۲٪'], index=['a', 'b', 'c'], name='volume')
+    result = number_parser.parse_series(series)
+    assert result.index.tolist() == ['a', 'b', 'c']
+    assert result.name == 'volume'
+    assert result['a'] == 1500.0 and np.isnan(result['b']) and result['c'] == 2.0
+
+    mixed = number_parser.parse_series(['3', 4, None, '-'])
+    np.testing.assert_array_equal(mixed.to_numpy(), [3.0, 4.0, np.nan, np.nan])
+
+    numeric = number_parser.parse_series(pd.Series([1, 2]))
+    assert numeric.dtype == float and numeric.tolist() == [1.0, 2.0]
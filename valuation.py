@@ -0,0 +1,142 @@
+import numpy as np
+
+GRAM_TO_OUNCE = 31.1035      # هر انس = 31.1035 گرم
+GOLD_PURITY_18K = 0.750      # طلای 18 عیار 75 درصد طلای خالص است
+
+# وزن سکه‌ها (گرم)
+COIN_WEIGHTS = {
+    'full_coin': 8.133,      # سکه تمام
+    'half_coin': 4.068,      # نیم سکه
+    'quarter_coin': 2.034    # ربع سکه
+}
+
+# اجرت ساخت هر سکه برای محاسبه NAV (درصد)
+COIN_NAV_PREMIUMS = {
+    'full_coin': 9,
+    'half_coin': 12,
+    'quarter_coin': 15
+}
+
+# نام‌های قدیمی calculate_coin_nav
+COIN_TYPE_ALIASES = {
+    'bahar': 'full_coin',
+    'half': 'half_coin',
+    'quarter': 'quarter_coin'
+}
+
+_FRAME_INPUTS = ('coin_price', 'coin_weight', 'gold_gram_price', 'global_gold_price', 'usd_price')
+
+
+def _percent_diff(price, value):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (price - value) / value * 100
+
+
+def theoretical_gram_18k(global_gold_price, usd_price):
+    """قیمت نظری هر گرم طلای 18 عیار از انس جهانی و دلار"""
+    return np.asarray(global_gold_price, dtype=float) * np.asarray(usd_price, dtype=float) / GRAM_TO_OUNCE * GOLD_PURITY_18K
+
+
+def gold_price_difference(gold_gram_price, global_gold_price, usd_price):
+    """اختلاف قیمت طلای 18 عیار داخلی با قیمت نظری جهانی (درصد)"""
+    return _percent_diff(np.asarray(gold_gram_price, dtype=float), theoretical_gram_18k(global_gold_price, usd_price))
+
+
+def coin_nav(gold_gram_price, coin_weight, nav_premium):
+    """NAV سکه بر اساس قیمت طلای 18 عیار، وزن و اجرت ساخت (درصد)"""
+    gold_24_price = np.asarray(gold_gram_price, dtype=float) * 24 / 18
+    return gold_24_price * np.asarray(coin_weight, dtype=float) * (1 + np.asarray(nav_premium, dtype=float) / 100)
+
+
+def value_coins(coin_price, coin_weight, gold_gram_price, global_gold_price, usd_price, nav_premium=None):
+    """ارزش‌گذاری برداری سکه‌ها در یک فراخوانی
+
+    همه ورودی‌ها عدد یا آرایه هستند و طبق قواعد broadcasting نامپای ترکیب
+    می‌شوند (مثلاً سه سکه در یک لحظه یا یک سکه در طول ماه‌ها تاریخچه).
+
+    Args:
+        coin_price: قیمت سکه (تومان)
+        coin_weight: وزن سکه (گرم)
+        gold_gram_price: قیمت هر گرم طلای 18 عیار (تومان)
+        global_gold_price: قیمت انس جهانی (دلار)
+        usd_price: قیمت دلار (تومان)
+        nav_premium: اجرت ساخت برای محاسبه NAV (درصد)؛ اگر None باشد NAV محاسبه نمی‌شود
+
+    Returns:
+        دیکشنری آرایه‌ها:
+            local_bubble: حباب نسبت به طلای 24 عیار داخلی (مانند calculate_bubble)
+            global_bubble: حباب نسبت به قیمت جهانی (مانند calculate_bubble)
+            bubble_18k: حباب نسبت به وزن سکه با قیمت طلای 18 عیار (مانند get_prices)
+            theoretical_gram_18k: قیمت نظری هر گرم طلای 18 عیار
+            gold_price_difference: اختلاف طلای 18 عیار داخلی با قیمت نظری (درصد)
+            nav: NAV سکه (فقط اگر nav_premium داده شده باشد)
+    """
+    coin_price = np.asarray(coin_price, dtype=float)
+    coin_weight = np.asarray(coin_weight, dtype=float)
+    gold_gram_price = np.asarray(gold_gram_price, dtype=float)
+
+    global_gold_gram = np.asarray(global_gold_price, dtype=float) * np.asarray(usd_price, dtype=float) / GRAM_TO_OUNCE
+    theoretical = global_gold_gram * GOLD_PURITY_18K
+
+    result = {
+        'local_bubble': _percent_diff(coin_price, gold_gram_price * 24 / 18 * coin_weight),
+        'global_bubble': _percent_diff(coin_price, global_gold_gram * coin_weight),
+        'bubble_18k': _percent_diff(coin_price, gold_gram_price * coin_weight),
+        'theoretical_gram_18k': theoretical,
+        'gold_price_difference': _percent_diff(gold_gram_price, theoretical)
+    }
+    if nav_premium is not None:
+        result['nav'] = coin_nav(gold_gram_price, coin_weight, nav_premium)
+    return result
+
+
+def value_frame(frame):
+    """ارزش‌گذاری برداری یک DataFrame
+
+    ستون‌های لازم: coin_price، coin_weight، gold_gram_price، global_gold_price،
+    usd_price و به صورت اختیاری nav_premium. اگر coin_weight یا nav_premium
+    نباشد ولی ستون coin (مثلاً full_coin) باشد، از مقادیر پیش‌فرض پر می‌شوند.
+
+    Returns:
+        کپی DataFrame با ستون‌های خروجی value_coins
+    """
+    frame = frame.copy()
+    if 'coin' in frame.columns:
+        coins = frame['coin'].replace(COIN_TYPE_ALIASES)
+        if 'coin_weight' not in frame.columns:
+            frame['coin_weight'] = coins.map(COIN_WEIGHTS)
+        if 'nav_premium' not in frame.columns:
+            frame['nav_premium'] = coins.map(COIN_NAV_PREMIUMS)
+
+    missing = [column for column in _FRAME_INPUTS if column not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing columns for valuation: {', '.join(missing)}")
+
+    values = value_coins(
+        *(frame[column].to_numpy(dtype=float) for column in _FRAME_INPUTS),
+        nav_premium=frame['nav_premium'].to_numpy(dtype=float) if 'nav_premium' in frame.columns else None
+    )
+    for column, array in values.items():
+        frame[column] = array
+    return frame
+
+
+def value_prices(prices, coins=tuple(COIN_WEIGHTS)):
+    """ارزش‌گذاری همه سکه‌های یک خروجی get_prices در یک فراخوانی
+
+    Returns:
+        دیکشنری نام سکه -> دیکشنری مقادیر value_coins برای آن سکه (float)
+    """
+    coins = [coin for coin in coins if coin in prices]
+    values = value_coins(
+        [prices[coin] for coin in coins],
+        [COIN_WEIGHTS[coin] for coin in coins],
+        prices['gold_per_gram'],
+        prices['global_gold'],
+        prices['usd'],
+        nav_premium=[COIN_NAV_PREMIUMS[coin] for coin in coins]
+    )
+    return {
+        coin: {name: float(np.broadcast_to(array, (len(coins),))[i]) for name, array in values.items()}
+        for i, coin in enumerate(coins)
+    }